@@ -0,0 +1,186 @@
+"""Time-bucketed donation totals behind /api/admin/analytics/donations.
+
+Every completed donation bumps one ``donation_buckets`` document per
+granularity (UTC day and month) and scope (global, school, mandal, as in
+``stats``) for its purpose, with an atomic ``$inc``. ``rebuild_buckets``
+recomputes all of them from one aggregation over donations grouped by
+school, purpose and day; months and mandals are summed from those rows.
+It is not run at startup: run it from the admin endpoint or as
+``python analytics.py`` once after deploying, and after bulk corrections.
+
+``series`` reads one scope's buckets for a date range and scatters them into
+dense NumPy arrays, one slot per period, so range totals, per-purpose totals
+and trailing moving averages are a few vectorized passes however long the
+range is. The moving average also reads the ``window - 1`` periods before
+the range, so its first points average full windows too.
+"""
+import asyncio
+import os
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Optional
+
+import numpy as np
+from pymongo import ReplaceOne, UpdateOne
+
+from stats import scope_keys
+
+GRANULARITIES = {"day": "D", "month": "M"}  # NumPy datetime64 unit per granularity
+MAX_PERIODS = {"day": 3660, "month": 1200}
+UNSPECIFIED = "unspecified"  # purpose of donations given without one
+
+def utc(at: datetime) -> datetime:
+    return at.astimezone(timezone.utc) if at.tzinfo else at.replace(tzinfo=timezone.utc)
+
+def bucket_start(at: datetime, granularity: str) -> datetime:
+    at = utc(at)
+    return datetime(at.year, at.month, 1 if granularity == "month" else at.day, tzinfo=timezone.utc)
+
+def _key(granularity: str, period: datetime, scope: str, purpose: str) -> str:
+    return f"{granularity}:{period:%Y-%m-%d}:{scope}:{purpose}"
+
+def _fields(granularity: str, period: datetime, scope: str, purpose: str) -> dict:
+    return {"granularity": granularity, "period": period, "scope": scope, "purpose": purpose}
+
+async def record_donation(db, doc: dict, mandal_id: Optional[str] = None) -> None:
+    if doc.get("payment_status") != "completed":
+        return
+    purpose = doc.get("purpose") or UNSPECIFIED
+    ops = []
+    for scope in scope_keys(doc.get("school_id"), mandal_id):
+        for granularity in GRANULARITIES:
+            period = bucket_start(doc["created_at"], granularity)
+            ops.append(UpdateOne(
+                {"_id": _key(granularity, period, scope, purpose)},
+                {"$inc": {"count": 1, "amount": doc["amount"]},
+                 "$setOnInsert": _fields(granularity, period, scope, purpose)},
+                upsert=True,
+            ))
+    await db.donation_buckets.bulk_write(ops, ordered=False)
+
+class UnmigratedTimestamps(RuntimeError):
+    pass
+
+async def rebuild_buckets(db) -> int:
+    # Like stats.reconcile_stats: donations landing while this runs can be
+    # lost or double counted, so run it during a quiet period.
+    if await db.donations.count_documents({"created_at": {"$type": "string"}}, limit=1):
+        raise UnmigratedTimestamps("Some donations still have string created_at values; run migrate_timestamps.py first")
+    school_mandals = {
+        school["id"]: school.get("mandal_id")
+        async for school in db.schools.find({}, {"_id": 0, "id": 1, "mandal_id": 1})
+    }
+    totals = defaultdict(lambda: [0, 0.0])
+    async for row in db.donations.aggregate([
+        {"$match": {"payment_status": "completed"}},
+        {"$group": {
+            "_id": {
+                "school_id": "$school_id",
+                "purpose": "$purpose",
+                "day": {"$dateToString": {"format": "%Y-%m-%d", "date": "$created_at"}},
+            },
+            "count": {"$sum": 1},
+            "amount": {"$sum": "$amount"},
+        }},
+    ], allowDiskUse=True):
+        day = datetime.strptime(row["_id"]["day"], "%Y-%m-%d").replace(tzinfo=timezone.utc)
+        school_id = row["_id"].get("school_id")
+        purpose = row["_id"].get("purpose") or UNSPECIFIED
+        for scope in scope_keys(school_id, school_mandals.get(school_id)):
+            for granularity in GRANULARITIES:
+                bucket = totals[(granularity, bucket_start(day, granularity), scope, purpose)]
+                bucket[0] += row["count"]
+                bucket[1] += row["amount"]
+
+    rebuilt_at = datetime.now(timezone.utc)
+    ops = [
+        ReplaceOne(
+            {"_id": _key(*bucket)},
+            {**_fields(*bucket), "count": count, "amount": amount, "rebuilt_at": rebuilt_at},
+            upsert=True,
+        )
+        for bucket, (count, amount) in totals.items()
+    ]
+    if ops:
+        await db.donation_buckets.bulk_write(ops, ordered=False)
+    # Buckets whose donations are gone were not rewritten above. Buckets that
+    # record_donation created meanwhile have no rebuilt_at and are kept.
+    await db.donation_buckets.delete_many({"rebuilt_at": {"$lt": rebuilt_at}})
+    return len(ops)
+
+def periods(start: datetime, end: datetime, granularity: str) -> tuple:
+    """First period and the number of periods starting before ``end``."""
+    unit = GRANULARITIES[granularity]
+    first = np.datetime64(bucket_start(start, granularity).replace(tzinfo=None), unit)
+    last = bucket_start(end, granularity)
+    stop = np.datetime64(last.replace(tzinfo=None), unit) + (last < utc(end))
+    return first, int((stop - first).astype(int))
+
+async def series(
+    db,
+    scope: str,
+    granularity: str,
+    start: datetime,
+    end: datetime,
+    purpose: Optional[str] = None,
+    window: int = 7,
+) -> dict:
+    unit = GRANULARITIES[granularity]
+    start, end = utc(start), utc(end)
+    first, count = periods(start, end, granularity)
+    lookback = window - 1
+    origin = first - lookback
+    n = lookback + count
+
+    since = origin.astype("datetime64[s]").astype(datetime).replace(tzinfo=timezone.utc)
+    query = {"scope": scope, "granularity": granularity, "period": {"$gte": since, "$lt": end}}
+    if purpose:
+        query["purpose"] = purpose
+    docs = await db.donation_buckets.find(
+        query, {"_id": 0, "period": 1, "purpose": 1, "count": 1, "amount": 1},
+    ).to_list(None)
+
+    starts = np.array([doc["period"].replace(tzinfo=None) for doc in docs], dtype=f"datetime64[{unit}]")
+    index = (starts - origin).astype(np.int64)
+    counts = np.array([doc["count"] for doc in docs], dtype=np.float64)
+    amounts = np.array([doc["amount"] for doc in docs], dtype=np.float64)
+    dense_counts = np.bincount(index, weights=counts, minlength=n)[:n]
+    dense_amounts = np.bincount(index, weights=amounts, minlength=n)[:n]
+
+    # trailing mean over `window` periods from one cumulative sum
+    cumulative = np.concatenate(([0.0], np.cumsum(dense_amounts)))
+    ends = np.arange(lookback + 1, n + 1)
+    moving = (cumulative[ends] - cumulative[ends - window]) / window
+
+    in_range = index >= lookback
+    names, inverse = np.unique(np.array([doc["purpose"] for doc in docs], dtype=object)[in_range],
+                               return_inverse=True)
+    purpose_counts = np.bincount(inverse, weights=counts[in_range], minlength=len(names))
+    purpose_amounts = np.bincount(inverse, weights=amounts[in_range], minlength=len(names))
+
+    return {
+        "periods": (first + np.arange(count)).astype("datetime64[D]").tolist(),  # dates
+        "counts": dense_counts[lookback:].astype(np.int64).tolist(),
+        "amounts": np.round(dense_amounts[lookback:], 2).tolist(),
+        "moving_average": np.round(moving, 2).tolist(),
+        "total_count": int(dense_counts[lookback:].sum()),
+        "total_amount": round(float(dense_amounts[lookback:].sum()), 2),
+        "by_purpose": {
+            name: (int(c), round(float(a), 2)) for name, c, a in zip(names, purpose_counts, purpose_amounts)
+        },
+    }
+
+if __name__ == "__main__":
+    from motor.motor_asyncio import AsyncIOMotorClient
+    from dotenv import load_dotenv
+    from pathlib import Path
+
+    load_dotenv(Path(__file__).parent / '.env')
+
+    async def main():
+        client = AsyncIOMotorClient(os.environ['MONGO_URL'], tz_aware=True)
+        rebuilt = await rebuild_buckets(client[os.environ['DB_NAME']])
+        print(f"✓ Rebuilt {rebuilt} donation buckets")
+        client.close()
+
+    asyncio.run(main())
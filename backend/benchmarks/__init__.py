@@ -0,0 +1,9 @@
+"""Benchmarks and load generators, run as ``cd backend && python -m benchmarks.<name>``.
+
+Importing the package points MONGO_URL and DB_NAME at a local ``benchmarks``
+database unless they are set, before any benchmark imports ``server``.
+"""
+import os
+
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "benchmarks")
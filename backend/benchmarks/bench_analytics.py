@@ -0,0 +1,95 @@
+"""Donation analytics queries over the bucket collection, checked against donations.
+
+Rebuilds ``donation_buckets`` from the donations collection, then times
+``analytics.series`` for a ``--days`` long daily range and an all-time
+monthly range, globally and per school and mandal. Each result's totals must
+equal a direct aggregation over the completed donations in the same range;
+the report says which checks failed and the exit status is 1 if any did. Run
+it against the benchmark dataset (``python -m benchmarks.datagen``), or with
+``--mock-db`` to generate one in process.
+
+    cd backend && python -m benchmarks.bench_analytics --days 365 --repeat 50
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+
+from benchmarks.datagen import percentile
+
+async def expected(db, match: dict, start, end) -> tuple:
+    rows = await db.donations.aggregate([
+        {"$match": {**match, "payment_status": "completed", "created_at": {"$gte": start, "$lt": end}}},
+        {"$group": {"_id": None, "count": {"$sum": 1}, "amount": {"$sum": "$amount"}}},
+    ]).to_list(1)
+    return (rows[0]["count"], round(rows[0]["amount"], 2)) if rows else (0, 0.0)
+
+async def main(args) -> int:
+    from datetime import datetime, timedelta, timezone
+
+    import analytics
+    import server
+    import stats
+    from benchmarks.datagen import DatasetSpec, generate, in_process_database
+
+    if args.mock_db:
+        server.db = in_process_database()
+        await generate(server.db, DatasetSpec(mandals=5, schools=50, users=50, alumni=50, donations=5000,
+                                              content=10), log=lambda *_: None)
+    db = server.db
+    await server.ensure_indexes(db)
+    started = time.perf_counter()
+    buckets = await analytics.rebuild_buckets(db)
+    rebuild_ms = (time.perf_counter() - started) * 1000
+
+    school = await db.schools.find_one({"mandal_id": {"$ne": None}}, {"_id": 0, "id": 1, "mandal_id": 1})
+    school_ids = [s["id"] async for s in db.schools.find({"mandal_id": school["mandal_id"]}, {"_id": 0, "id": 1})]
+    scopes = {
+        "global": (stats.GLOBAL_KEY, {}),
+        "school": (f"school:{school['id']}", {"school_id": school["id"]}),
+        "mandal": (f"mandal:{school['mandal_id']}", {"school_id": {"$in": school_ids}}),
+    }
+    end = datetime.now(timezone.utc)
+    ranges = {
+        "day": (analytics.bucket_start(end - timedelta(days=args.days), "day"), end),
+        "month": (datetime(2000, 1, 1, tzinfo=timezone.utc), end),
+    }
+
+    queries, checks = {}, {}
+    for granularity, (start, stop) in ranges.items():
+        for name, (scope, match) in scopes.items():
+            latencies = []
+            for _ in range(args.repeat):
+                began = time.perf_counter()
+                result = await analytics.series(db, scope, granularity, start, stop, window=args.window)
+                latencies.append((time.perf_counter() - began) * 1000)
+            ordered = sorted(latencies)
+            label = f"{granularity}/{name}"
+            queries[label] = {
+                "periods": len(result["periods"]),
+                "total_count": result["total_count"],
+                "latency_ms": {"p50": round(percentile(ordered, 50), 2), "p99": round(percentile(ordered, 99), 2)},
+            }
+            checks[f"{label}_totals_match"] = (
+                (result["total_count"], result["total_amount"]) == await expected(db, match, start, stop)
+            )
+
+    print(json.dumps({
+        "benchmark": "analytics",
+        "donations": await db.donations.count_documents({}),
+        "buckets": buckets,
+        "rebuild_ms": round(rebuild_ms, 1),
+        "window": args.window,
+        "queries": queries,
+        "checks": checks,
+    }, indent=2))
+    return 0 if all(checks.values()) else 1
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--days", type=int, default=365, help="length of the daily range")
+    parser.add_argument("--window", type=int, default=7, help="moving average window in periods")
+    parser.add_argument("--repeat", type=int, default=50, help="timed queries per range and scope")
+    parser.add_argument("--mock-db", action="store_true", help="run on mongomock-motor instead of MONGO_URL")
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,171 @@
+"""WebSocket chat load test: many concurrent sockets on one worker.
+
+Starts one uvicorn worker in a subprocess (against MONGO_URL/DB_NAME, or an
+in-memory mongomock-motor database with ``--mock-db``), seeds users and group
+conversations, opens ``--connections`` sockets, then sends ``--rate``
+messages per second from random members for ``--duration`` seconds. Every
+message carries its send time, so each receiving socket records delivery
+latency. Prints a JSON report including the worker's own chat stats.
+
+    cd backend && python -m benchmarks.bench_chat --connections 5000 --group-size 20 --rate 200
+"""
+import argparse
+import asyncio
+import json
+import random
+import subprocess
+import sys
+import time
+
+from benchmarks.datagen import percentile
+
+ADMIN_ID = "bench-chat-admin"
+
+def user_id(i: int) -> str:
+    return f"bench-chat-{i:06d}"
+
+def conversation_id(k: int) -> str:
+    return f"bench-conv-{k:05d}"
+
+async def serve(args) -> None:
+    import uvicorn
+    import server
+    from benchmarks.datagen import in_process_database
+
+    if args.mock_db:
+        server.db = in_process_database()
+    db = server.db
+    for name in ("users", "conversations", "chat_messages"):
+        await db[name].delete_many({"id": {"$regex": "^bench-"}} if name != "chat_messages" else
+                                   {"conversation_id": {"$regex": "^bench-conv-"}})
+    users = [{"id": user_id(i), "email": f"chat{i}@bench.example.org", "name": f"Chat {i}",
+              "role": "alumni", "approved": True} for i in range(args.connections)]
+    users.append({"id": ADMIN_ID, "email": "chat-admin@bench.example.org", "name": "Chat Admin",
+                  "role": "admin", "approved": True})
+    await db.users.insert_many(users)
+    groups = range(0, args.connections, args.group_size)
+    await db.conversations.insert_many([{
+        "id": conversation_id(k),
+        "type": "group",
+        "title": f"Batch {k}",
+        "members": [user_id(i) for i in range(start, min(start + args.group_size, args.connections))],
+        "created_by": user_id(start),
+    } for k, start in enumerate(groups)])
+
+    config = uvicorn.Config(server.app, host="127.0.0.1", port=args.port, log_level="warning", ws="websockets")
+    await uvicorn.Server(config).serve()
+
+async def wait_for_worker(port: int, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            _, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.close()
+            return
+        except OSError:
+            await asyncio.sleep(0.2)
+    raise SystemExit("chat worker did not start")
+
+async def run(args) -> dict:
+    import httpx
+    import websockets
+    from server import create_access_token
+
+    latencies = []
+    received = 0
+    base = f"ws://127.0.0.1:{args.port}/api/chat/ws?token="
+    members = lambda i: i // args.group_size  # noqa: E731
+
+    async def reader(socket):
+        nonlocal received
+        async for frame in socket:
+            event = json.loads(frame)
+            if event.get("type") == "message":
+                received += 1
+                latencies.append((time.time() - float(event["message"]["body"])) * 1000)
+
+    slots = asyncio.Semaphore(200)  # bound the connect storm, not the total
+
+    async def connect(i: int):
+        async with slots:
+            token = create_access_token({"sub": user_id(i), "role": "alumni", "approved": True})
+            return await websockets.connect(base + token, max_queue=None, open_timeout=60)
+
+    started = time.perf_counter()
+    sockets = await asyncio.gather(*(connect(i) for i in range(args.connections)))
+    connect_seconds = time.perf_counter() - started
+    readers = [asyncio.create_task(reader(socket)) for socket in sockets]
+
+    rng = random.Random(args.seed)
+    sent = 0
+    expected = 0
+    interval = 1 / args.rate
+    send_started = time.perf_counter()
+    while time.perf_counter() - send_started < args.duration:
+        i = rng.randrange(args.connections)
+        k = members(i)
+        group = min(args.group_size, args.connections - k * args.group_size)
+        await sockets[i].send(json.dumps({"type": "send", "conversation_id": conversation_id(k), "body": repr(time.time())}))
+        sent += 1
+        expected += group
+        # pace against the schedule, not the previous send, so stalls do not lower the rate
+        await asyncio.sleep(max(0.0, send_started + sent * interval - time.perf_counter()))
+    await asyncio.sleep(args.settle)
+
+    admin_token = create_access_token({"sub": ADMIN_ID, "role": "admin", "approved": True})
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.port}") as client:
+        runtime = (await client.get("/api/admin/runtime", headers={"Authorization": f"Bearer {admin_token}"})).json()
+
+    for task in readers:
+        task.cancel()
+    await asyncio.gather(*(socket.close() for socket in sockets), return_exceptions=True)
+
+    ordered = sorted(latencies)
+    return {
+        "benchmark": "chat",
+        "connections": args.connections,
+        "group_size": args.group_size,
+        "connect_seconds": round(connect_seconds, 2),
+        "rate_per_s": args.rate,
+        "duration_s": args.duration,
+        "sent": sent,
+        "expected_deliveries": expected,
+        "delivered": received,
+        "latency_ms": {
+            "p50": round(percentile(ordered, 50), 2),
+            "p95": round(percentile(ordered, 95), 2),
+            "p99": round(percentile(ordered, 99), 2),
+            "max": round(ordered[-1], 2) if ordered else 0.0,
+        },
+        "worker": runtime.get("chat"),
+    }
+
+def main(args) -> None:
+    if args.serve:
+        asyncio.run(serve(args))
+        return
+    command = [sys.executable, "-m", "benchmarks.bench_chat", "--serve", "--port", str(args.port),
+               "--connections", str(args.connections), "--group-size", str(args.group_size)]
+    if args.mock_db:
+        command.append("--mock-db")
+    worker = subprocess.Popen(command)
+    try:
+        asyncio.run(wait_for_worker(args.port))
+        report = asyncio.run(run(args))
+    finally:
+        worker.terminate()
+        worker.wait()
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--connections", type=int, default=2000)
+    parser.add_argument("--group-size", type=int, default=20)
+    parser.add_argument("--rate", type=float, default=100.0, help="messages sent per second")
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--settle", type=float, default=2.0, help="seconds to wait for in-flight deliveries")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--mock-db", action="store_true", help="run the worker on mongomock-motor")
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    main(parser.parse_args())
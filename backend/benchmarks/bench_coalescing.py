@@ -0,0 +1,134 @@
+"""Thundering herd on the hot list routes, with and without read coalescing.
+
+Each wave invalidates the schools, events and bulletins namespaces, as
+publishing a notice does, and then fires ``--herd`` concurrent GETs spread
+over /api/schools, /api/events and /api/bulletins (``--variants`` distinct
+query strings per route). The run is repeated with the coalescer on and off
+and reports, per mode, how many list queries reached the database (every
+``paginate`` call issues one find) next to latency and throughput.
+
+mongomock answers without ever yielding to the event loop, so with
+``--mock-db`` each query is given ``--db-latency-ms`` of simulated round trip;
+without it the first request of a wave would finish before the next one
+started and there would be no herd to collapse.
+
+    cd backend && python -m benchmarks.bench_coalescing --mock-db --herd 500 --waves 20
+"""
+import argparse
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta, timezone
+
+from benchmarks.datagen import percentile
+
+ROUTES = ("/api/schools", "/api/events", "/api/bulletins")
+SCHOOL_ID = "bench-coalescing-school"
+
+async def seed(server, db, count: int) -> None:
+    await db.schools.delete_many({"mandal_id": "bench-coalescing"})
+    await db.events.delete_many({"school_id": SCHOOL_ID})
+    await db.bulletins.delete_many({"school_id": SCHOOL_ID})
+    now = datetime.now(timezone.utc)
+    schools, events, bulletins = [], [], []
+    for i in range(count):
+        at = now - timedelta(minutes=i)
+        schools.append(server.School(name=f"ZPHS Bench {i}", mandal_id="bench-coalescing",
+                                     udise_code=f"BENCH{i:05d}", created_at=at).model_dump())
+        events.append(server.Event(title=f"Event {i}", description="Annual day", school_id=SCHOOL_ID,
+                                   event_date=at, location="Ground", created_by="bench",
+                                   created_at=at).model_dump())
+        bulletins.append(server.Bulletin(title=f"Notice {i}", content="Exam schedule", school_id=SCHOOL_ID,
+                                         created_by="bench", created_at=at).model_dump())
+    await db.schools.insert_many(schools)
+    await db.events.insert_many(events)
+    await db.bulletins.insert_many(bulletins)
+
+async def herd(server, client, args, paths: list) -> dict:
+    latencies = []
+    statuses = {}
+
+    async def fetch(path: str) -> None:
+        started = time.perf_counter()
+        response = await client.get(path)
+        latencies.append((time.perf_counter() - started) * 1000)
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    elapsed = 0.0
+    for _ in range(args.waves):
+        await server.response_cache.invalidate("schools", "events", "bulletins")
+        started = time.perf_counter()
+        await asyncio.gather(*(fetch(paths[i % len(paths)]) for i in range(args.herd)))
+        elapsed += time.perf_counter() - started
+    ordered = sorted(latencies)
+    return {
+        "requests": len(latencies),
+        "requests_per_s": round(len(latencies) / elapsed),
+        "latency_ms": {"p50": round(percentile(ordered, 50), 2), "p99": round(percentile(ordered, 99), 2)},
+        "statuses": statuses,
+    }
+
+async def main(args) -> None:
+    import httpx
+    import server
+    from benchmarks.datagen import in_process_database
+
+    if args.mock_db:
+        server.db = in_process_database()
+    await server.ensure_indexes(server.db)
+    await seed(server, server.db, args.documents)
+
+    # count the list queries behind the three routes; the loaders look paginate up at call time
+    finds = 0
+    paginate = server.paginate
+    latency = args.db_latency_ms / 1000 if args.mock_db else 0.0
+
+    async def counted(*call_args, **kwargs):
+        nonlocal finds
+        finds += 1
+        if latency:
+            await asyncio.sleep(latency)
+        return await paginate(*call_args, **kwargs)
+
+    server.paginate = counted
+    server.response_cache.enabled = not args.no_cache
+    server.read_coalescer.window = args.window
+
+    paths = [f"{route}?limit={20 + variant}" for route in ROUTES for variant in range(args.variants)]
+    modes = {}
+    transport = httpx.ASGITransport(app=server.app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        for mode, enabled in (("coalesced", True), ("uncoalesced", False)):
+            server.read_coalescer.enabled = enabled
+            before = finds
+            result = await herd(server, client, args, paths)
+            result["db_queries"] = finds - before
+            result["db_queries_per_wave"] = round((finds - before) / args.waves, 1)
+            modes[mode] = result
+    server.paginate = paginate
+
+    print(json.dumps({
+        "benchmark": "coalescing",
+        "herd": args.herd,
+        "waves": args.waves,
+        "distinct_queries": len(paths),
+        "response_cache": not args.no_cache,
+        "window_seconds": args.window,
+        "db_latency_ms": args.db_latency_ms if args.mock_db else None,
+        "modes": modes,
+        "query_reduction": round(modes["uncoalesced"]["db_queries"] / max(1, modes["coalesced"]["db_queries"]), 1),
+        "coalescer": server.read_coalescer.stats(),
+    }, indent=2))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--herd", type=int, default=500, help="concurrent requests per wave")
+    parser.add_argument("--waves", type=int, default=20)
+    parser.add_argument("--variants", type=int, default=2, help="distinct query strings per route")
+    parser.add_argument("--documents", type=int, default=500, help="schools, events and bulletins seeded")
+    parser.add_argument("--window", type=float, default=0.0,
+                        help="coalescing window in seconds; 0 counts in-flight sharing only")
+    parser.add_argument("--no-cache", action="store_true", help="disable the response cache as well")
+    parser.add_argument("--db-latency-ms", type=float, default=5.0, help="simulated round trip with --mock-db")
+    parser.add_argument("--mock-db", action="store_true", help="run on mongomock-motor instead of MONGO_URL")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,92 @@
+"""Concurrent donation ingest: throughput and latency under retries.
+
+Creates a fresh school need, then fires ``--donations`` POST /api/donations
+requests against it, ``--concurrency`` at a time, in-process against
+MONGO_URL/DB_NAME (or mongomock-motor with ``--mock-db``). A ``--retries``
+fraction of them is sent a second time with the same Idempotency-Key, racing
+the original. The exact-totals checks live in tests/test_donations.py.
+
+    cd backend && python -m benchmarks.bench_donations --donations 5000 --concurrency 200
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from benchmarks.datagen import percentile
+
+SCHOOL_ID = "bench-donation-school"
+NEED_ID = "bench-donation-need"
+
+async def main(args) -> None:
+    import httpx
+    import server
+    from benchmarks.datagen import in_process_database
+
+    if args.mock_db:
+        server.db = in_process_database()
+    db = server.db
+    await server.ensure_indexes(db)
+    await db.donations.delete_many({"school_id": SCHOOL_ID})
+    await db.school_needs.delete_many({"id": NEED_ID})
+    await db.stats.delete_many({"_id": f"school:{SCHOOL_ID}"})
+
+    rng = random.Random(args.seed)
+    # whole rupees, so float sums are exact in any order
+    amounts = [rng.randint(100, 5000) for _ in range(args.donations)]
+    expected_amount = sum(amounts)
+    target = expected_amount * args.target_fraction
+    await db.school_needs.insert_one(server.SchoolNeed(
+        id=NEED_ID, school_id=SCHOOL_ID, title="Benchmark need", description="", category="books",
+        target_amount=target,
+    ).model_dump())
+
+    requests = [(f"bench-{args.seed}-{i}", amount) for i, amount in enumerate(amounts)]
+    requests += rng.sample(requests, int(len(requests) * args.retries))
+    rng.shuffle(requests)
+
+    latencies = []
+    statuses = {}
+    slots = asyncio.Semaphore(args.concurrency)
+    transport = httpx.ASGITransport(app=server.app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        async def donate(key: str, amount: int) -> None:
+            async with slots:
+                started = time.perf_counter()
+                response = await client.post("/api/donations", headers={"Idempotency-Key": key}, json={
+                    "donor_name": "Bench Donor", "donor_email": "donor@bench.example.org",
+                    "amount": amount, "need_id": NEED_ID,
+                })
+                latencies.append((time.perf_counter() - started) * 1000)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(donate(key, amount) for key, amount in requests))
+        elapsed = time.perf_counter() - started
+
+    need = await db.school_needs.find_one({"id": NEED_ID}, {"_id": 0})
+    ordered = sorted(latencies)
+    print(json.dumps({
+        "benchmark": "donations",
+        "donations": args.donations,
+        "requests": len(requests),
+        "concurrency": args.concurrency,
+        "requests_per_s": round(len(requests) / elapsed),
+        "latency_ms": {"p50": round(percentile(ordered, 50), 2), "p99": round(percentile(ordered, 99), 2)},
+        "statuses": statuses,
+        "raised_amount": need["raised_amount"],
+        "expected_amount": expected_amount,
+        "need_status": need["status"],
+    }, indent=2))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--donations", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--retries", type=float, default=0.2, help="fraction of donations sent twice")
+    parser.add_argument("--target-fraction", type=float, default=0.5,
+                        help="need target as a fraction of the total donated")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--mock-db", action="store_true", help="run on mongomock-motor instead of MONGO_URL")
+    asyncio.run(main(parser.parse_args()))
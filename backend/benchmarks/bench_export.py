@@ -0,0 +1,95 @@
+"""Peak memory and throughput of the streaming exports at growing sizes.
+
+Feeds exports.encode from a lazy source of donation documents (standing in
+for a Motor cursor) and consumes the stream without keeping it, recording the
+tracemalloc peak per export size. The peak should stay flat as rows grow.
+With ``--mongo`` it streams GET /api/admin/export/{kind} in-process against
+MONGO_URL/DB_NAME instead (load data with benchmarks.datagen first) and
+reports the process RSS high-water mark. Prints a JSON report.
+
+    cd backend && python -m benchmarks.bench_export --rows 10000 100000 1000000
+    cd backend && python -m benchmarks.bench_export --mongo --kind donations
+"""
+import argparse
+import asyncio
+import json
+import resource
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+import exports
+from server import Donation
+
+async def donations(count: int):
+    base = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    for i in range(count):
+        yield {
+            "id": f"donation-{i:08d}",
+            "donor_name": f"Donor {i % 5000}",
+            "donor_email": f"donor{i % 5000}@example.org",
+            "amount": float(100 + i % 10000),
+            "school_id": f"school-{i % 5000:05d}",
+            "purpose": "books",
+            "payment_status": "completed",
+            "transaction_id": f"TXN{i:012d}",
+            "created_at": base + timedelta(seconds=i),
+        }
+
+async def measure_encoder(rows: int, fmt: str) -> dict:
+    tracemalloc.start()
+    started = time.perf_counter()
+    total_bytes = 0
+    async for chunk in exports.encode(donations(rows), list(Donation.model_fields), fmt):
+        total_bytes += len(chunk)
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {
+        "rows": rows,
+        "mb_out": round(total_bytes / 1024 / 1024, 1),
+        "rows_per_s": round(rows / elapsed),
+        "peak_traced_kb": round(peak / 1024),
+    }
+
+async def measure_endpoint(kind: str, fmt: str) -> dict:
+    import httpx
+    import server
+
+    token = server.create_access_token({"sub": "user-admin", "role": "admin", "approved": True})
+    transport = httpx.ASGITransport(app=server.app)
+    started = time.perf_counter()
+    lines = 0
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        async with client.stream("GET", f"/api/admin/export/{kind}?format={fmt}",
+                                 headers={"Authorization": f"Bearer {token}"}) as response:
+            response.raise_for_status()
+            async for chunk in response.aiter_bytes():
+                lines += chunk.count(b"\n")
+    elapsed = time.perf_counter() - started
+    return {
+        "kind": kind,
+        "lines": lines,
+        "rows_per_s": round(lines / elapsed),
+        "max_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024),
+    }
+
+async def main(args) -> None:
+    if args.mongo:
+        results = [await measure_endpoint(args.kind, args.format)]
+    else:
+        results = [await measure_encoder(rows, args.format) for rows in args.rows]
+    print(json.dumps({
+        "benchmark": "export",
+        "format": args.format,
+        "batch_size": exports.EXPORT_BATCH_SIZE,
+        "results": results,
+    }, indent=2))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 100000, 500000])
+    parser.add_argument("--format", choices=exports.FORMATS, default="csv")
+    parser.add_argument("--mongo", action="store_true", help="stream the real endpoint against MONGO_URL")
+    parser.add_argument("--kind", default="donations")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,72 @@
+"""Response and MongoDB read bytes of list pages per sparse fieldset.
+
+For each list route, fetches one page of ``--limit`` items three ways: every
+field (``fields=*``), the route's default list view, and the fields a title
+card renders. Reports the HTTP body size and the BSON size of the documents
+MongoDB returns for the same page under each projection. Run it against the
+benchmark dataset (``python -m benchmarks.datagen``), or with ``--mock-db``
+to generate a small one in process.
+
+    cd backend && python -m benchmarks.bench_fieldsets --limit 50
+"""
+import argparse
+import asyncio
+import json
+
+# route -> (collection, sort key, model name, default view model name, card fields)
+ROUTES = {
+    "/api/schools": ("schools", "created_at", "School", "SchoolSummary", "name"),
+    "/api/news": ("news", "created_at", "News", "NewsSummary", "title,created_at"),
+    "/api/bulletins": ("bulletins", "created_at", "Bulletin", "BulletinSummary", "title,created_at"),
+    "/api/events": ("events", "event_date", "Event", None, "title,event_date"),
+}
+
+async def read_bytes(db, collection: str, sort_key: str, projection: dict, limit: int) -> int:
+    import bson
+
+    docs = await db[collection].find({}, projection).sort([(sort_key, -1), ("id", -1)]).limit(limit).to_list(limit)
+    return sum(len(bson.encode(doc)) for doc in docs)
+
+async def main(args) -> None:
+    import httpx
+    import fast_json
+    import fieldsets
+    import server
+    from benchmarks.datagen import DatasetSpec, generate, in_process_database
+
+    if args.mock_db:
+        server.db = in_process_database()
+        await generate(server.db, DatasetSpec(mandals=5, schools=200, users=100, alumni=100, donations=100,
+                                              content=500), log=lambda *_: None)
+    server.response_cache.enabled = False
+
+    report = {}
+    transport = httpx.ASGITransport(app=server.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for route, (collection, sort_key, model_name, summary_name, card) in ROUTES.items():
+            model = getattr(server, model_name)
+            summary = getattr(server, summary_name) if summary_name else None
+            views = {"all": "*", "default": None, "card": card}
+            report[route] = {}
+            for name, fields in views.items():
+                params = {"limit": args.limit, **({"fields": fields} if fields else {})}
+                response = await client.get(route, params=params)
+                response.raise_for_status()
+                projection = fast_json.projection(fieldsets.view(model, fields, summary))
+                report[route][name] = {
+                    "response_bytes": len(response.content),
+                    "mongo_bytes": await read_bytes(server.db, collection, sort_key, projection, args.limit),
+                }
+            all_bytes = report[route]["all"]["response_bytes"]
+            report[route]["reduction"] = {
+                name: round(all_bytes / max(1, report[route][name]["response_bytes"]), 1)
+                for name in ("default", "card")
+            }
+
+    print(json.dumps({"benchmark": "fieldsets", "limit": args.limit, "routes": report}, indent=2))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--mock-db", action="store_true", help="run on mongomock-motor instead of MONGO_URL")
+    asyncio.run(main(parser.parse_args()))
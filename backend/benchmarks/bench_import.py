@@ -0,0 +1,121 @@
+"""Throughput of the streaming bulk import.
+
+Streams a synthetic UDISE-style schools CSV (or an alumni NDJSON file) in
+64 KiB chunks through bulk_import, first parse+validate only, then end to end
+against MONGO_URL/DB_NAME (or mongomock-motor with ``--in-process``). Runs
+the import twice so the second pass measures the all-update path. Prints a
+JSON report.
+
+    cd backend && python -m benchmarks.bench_import --rows 200000
+    cd backend && python -m benchmarks.bench_import --kind alumni --rows 100000
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+
+from pymongo import UpdateOne
+
+import bulk_import
+from benchmarks.datagen import in_process_database
+from server import IMPORTS, ensure_indexes
+
+CHUNK_SIZE = 64 * 1024
+
+def school_rows(count: int):
+    yield "udise_code,name,mandal_id,facilities,contact_phone,address\n"
+    for i in range(count):
+        mandal = f"mandal-{i % 22:03d}"
+        yield (f"2816{i:07d},ZPHS {mandal} {i},{mandal},Library;Playground,"
+               f"98765{i % 100000:05d},\"Main Road, {mandal}\"\n")
+
+def alumni_rows(count: int):
+    for i in range(count):
+        yield json.dumps({
+            "user_id": f"user-{i:07d}",
+            "school_id": f"school-{i % 2000:05d}",
+            "batch_year": 1990 + i % 35,
+            "current_profession": "Teacher",
+            "willing_to_mentor": i % 3 == 0,
+        }) + "\n"
+
+async def seed_references(db, count: int) -> None:
+    # Imported alumni must name an existing school and user
+    ids = [("schools", f"school-{i:05d}", {"name": f"School {i}", "udise_code": f"2899{i:07d}"})
+           for i in range(min(count, 2000))]
+    ids += [("users", f"user-{i:07d}", {"email": f"user{i}@example.org"}) for i in range(count)]
+    for collection in ("schools", "users"):
+        ops = [UpdateOne({"id": doc_id}, {"$setOnInsert": fields}, upsert=True)
+               for name, doc_id, fields in ids if name == collection]
+        for start in range(0, len(ops), 10000):
+            await db[collection].bulk_write(ops[start:start + 10000], ordered=False)
+
+async def chunks(kind: str, count: int):
+    rows = school_rows(count) if kind == "schools" else alumni_rows(count)
+    buffer = []
+    size = 0
+    for row in rows:
+        buffer.append(row)
+        size += len(row)
+        if size >= CHUNK_SIZE:
+            yield "".join(buffer).encode()
+            buffer, size = [], 0
+    if buffer:
+        yield "".join(buffer).encode()
+
+async def parse_and_validate(kind: str, count: int, fmt: str) -> float:
+    job = bulk_import._Import(None, IMPORTS[kind])
+    started = time.perf_counter()
+    batch = []
+    async for line, row in bulk_import.records(chunks(kind, count), fmt):
+        batch.append((line, row))
+        if len(batch) >= 1000:
+            job.validate(batch)
+            batch = []
+    job.validate(batch)
+    return time.perf_counter() - started
+
+async def main(args) -> None:
+    fmt = "csv" if args.kind == "schools" else "ndjson"
+    if args.in_process:
+        db = in_process_database()
+    else:
+        from motor.motor_asyncio import AsyncIOMotorClient
+        db = AsyncIOMotorClient(os.environ["MONGO_URL"], tz_aware=True)[os.environ["DB_NAME"]]
+    await db[IMPORTS[args.kind].collection].drop()
+    await ensure_indexes(db)
+    if args.kind == "alumni":
+        await seed_references(db, args.rows)
+
+    parse_seconds = await parse_and_validate(args.kind, args.rows, fmt)
+    passes = []
+    for label in ("insert", "update"):
+        started = time.perf_counter()
+        report = await bulk_import.import_rows(db, IMPORTS[args.kind], chunks(args.kind, args.rows), fmt, args.batch_size)
+        elapsed = time.perf_counter() - started
+        passes.append({
+            "pass": label,
+            "seconds": round(elapsed, 2),
+            "rows_per_s": round(args.rows / elapsed),
+            **{key: report[key] for key in ("inserted", "updated", "failed")},
+        })
+
+    print(json.dumps({
+        "benchmark": "import",
+        "kind": args.kind,
+        "format": fmt,
+        "rows": args.rows,
+        "batch_size": args.batch_size,
+        "database": "mongomock" if args.in_process else os.environ["MONGO_URL"],
+        "parse_validate_rows_per_s": round(args.rows / parse_seconds),
+        "passes": passes,
+    }, indent=2))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--kind", choices=sorted(IMPORTS), default="schools")
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--in-process", action="store_true", help="use mongomock-motor instead of MONGO_URL")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,107 @@
+"""p99 latency of unrelated GETs while a login storm is running.
+
+Builds a minimal app with a bcrypt-backed /login and a trivial /ping and
+drives both through httpx's in-process ASGI transport on one event loop,
+first verifying passwords inline (the old behaviour) and then through
+PasswordHasher. Prints a JSON report.
+
+    cd backend && python -m benchmarks.bench_login_storm --logins 200
+"""
+import argparse
+import asyncio
+import json
+import logging
+import time
+
+import httpx
+from fastapi import FastAPI, HTTPException
+
+from benchmarks.datagen import percentile
+from passwords import PasswordHasher
+
+def build_app(hasher: PasswordHasher, stored_hash: str, inline: bool) -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/login")
+    async def login(body: dict):
+        if inline:
+            valid = hasher.context.verify(body["password"], stored_hash)
+        else:
+            valid = await hasher.verify(body["password"], stored_hash)
+        if not valid:
+            raise HTTPException(status_code=401)
+        return {"ok": True}
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    return app
+
+async def run_mode(inline: bool, args) -> dict:
+    hasher = PasswordHasher(rounds=args.rounds, max_workers=args.workers)
+    stored_hash = hasher.context.hash("secret")
+    app = build_app(hasher, stored_hash, inline)
+    transport = httpx.ASGITransport(app=app)
+    ping_latencies = []
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        storm_done = asyncio.Event()
+
+        async def storm():
+            await asyncio.gather(*(
+                client.post("/login", json={"password": "secret"}) for _ in range(args.logins)
+            ))
+            storm_done.set()
+
+        async def ping(due: float):
+            await client.get("/ping")
+            ping_latencies.append((time.perf_counter() - due) * 1000)
+
+        async def pinger():
+            # Pings are due on a fixed schedule and timed from when they were
+            # due, so a blocked event loop shows up as latency rather than as
+            # missing samples.
+            interval = args.ping_interval / 1000
+            first_due = time.perf_counter()
+            pings = []
+            tick = 0
+            while not storm_done.is_set():
+                due = first_due + tick * interval
+                await asyncio.sleep(max(0.0, due - time.perf_counter()))
+                pings.append(asyncio.create_task(ping(due)))
+                tick += 1
+            await asyncio.gather(*pings)
+
+        started = time.perf_counter()
+        pinger_task = asyncio.create_task(pinger())
+        await asyncio.sleep(0.01)
+        await storm()
+        elapsed = time.perf_counter() - started
+        await pinger_task
+
+    hasher.shutdown()
+    ping_latencies.sort()
+    return {
+        "mode": "inline" if inline else "pool",
+        "logins": args.logins,
+        "login_throughput_per_s": round(args.logins / elapsed, 1),
+        "ping_samples": len(ping_latencies),
+        "ping_p50_ms": round(percentile(ping_latencies, 50), 2),
+        "ping_p99_ms": round(percentile(ping_latencies, 99), 2),
+        "ping_max_ms": round(max(ping_latencies), 2),
+        "peak_queued": hasher.peak_queued,
+    }
+
+async def main(args) -> None:
+    results = [await run_mode(True, args), await run_mode(False, args)]
+    print(json.dumps({"benchmark": "login_storm", "rounds": args.rounds, "results": results}, indent=2))
+
+if __name__ == "__main__":
+    logging.getLogger("passlib").setLevel(logging.ERROR)
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--logins", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=12)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--ping-interval", type=float, default=5.0, help="milliseconds between pings")
+    asyncio.run(main(parser.parse_args()))
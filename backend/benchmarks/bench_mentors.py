@@ -0,0 +1,104 @@
+"""Mentor matching latency at district scale.
+
+Fills a MentorIndex with ``--alumni`` synthetic profiles (every one willing
+to mentor unless ``--willing`` says otherwise, so the whole population is
+scored), then times ``--queries`` top-k requests for each query shape and
+single-profile upserts. With ``--mongo`` the index is instead rebuilt from
+MONGO_URL/DB_NAME (load data with benchmarks.datagen first). Prints a JSON
+report.
+
+    cd backend && python -m benchmarks.bench_mentors --alumni 100000
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+from datetime import datetime, timezone
+
+from benchmarks.datagen import COMPANIES, PROFESSIONS, mandal_id, school_id
+from mentors import MentorIndex
+
+def profiles(count: int, schools: int, mandals: int, willing: float, rng: random.Random):
+    now = datetime.now(timezone.utc)
+    for i in range(count):
+        school = rng.randrange(schools)
+        yield {
+            "id": f"alumni-{i:07d}",
+            "user_id": f"user-{i:07d}",
+            "school_id": school_id(school),
+            "mandal_id": mandal_id(school % mandals),
+            "batch_year": rng.randint(1970, 2024),
+            "current_profession": rng.choice(PROFESSIONS),
+            "company": rng.choice(COMPANIES),
+            "willing_to_mentor": rng.random() < willing,
+            "created_at": now,
+        }
+
+def timings(samples: list) -> dict:
+    ordered = sorted(samples)
+    pick = lambda pct: ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]  # noqa: E731
+    return {"p50": round(pick(50), 3), "p95": round(pick(95), 3), "p99": round(pick(99), 3), "max": round(ordered[-1], 3)}
+
+async def main(args) -> None:
+    rng = random.Random(args.seed)
+    index = MentorIndex()
+    started = time.perf_counter()
+    if args.mongo:
+        from motor.motor_asyncio import AsyncIOMotorClient
+        db = AsyncIOMotorClient(os.environ["MONGO_URL"], tz_aware=True)[os.environ["DB_NAME"]]
+        await index.rebuild(db)
+    else:
+        for doc in profiles(args.alumni, args.schools, args.mandals, args.willing, rng):
+            index.upsert(doc)
+    build_seconds = time.perf_counter() - started
+
+    shapes = {
+        "school": lambda: {"school_id": school_id(rng.randrange(args.schools))},
+        "school+mandal": lambda: {"school_id": school_id(rng.randrange(args.schools)),
+                                  "mandal_id": mandal_id(rng.randrange(args.mandals))},
+        "school+interests": lambda: {"school_id": school_id(rng.randrange(args.schools)),
+                                     "interests": rng.sample(PROFESSIONS + COMPANIES, 3)},
+        "interest prefix": lambda: {"interests": [rng.choice(PROFESSIONS)[:3]]},
+    }
+    queries = {}
+    for name, shape in shapes.items():
+        samples = []
+        for _ in range(args.queries):
+            params = shape()
+            started = time.perf_counter()
+            index.match(**params, exclude_user_id=f"user-{rng.randrange(args.alumni):07d}", limit=args.limit)
+            samples.append((time.perf_counter() - started) * 1000)
+        queries[name] = timings(samples)
+
+    upserts = []
+    for doc in profiles(args.queries, args.schools, args.mandals, 1.0, rng):
+        doc["id"] = f"alumni-{rng.randrange(args.alumni):07d}"  # rewrite existing rows in place
+        started = time.perf_counter()
+        index.upsert(doc)
+        upserts.append((time.perf_counter() - started) * 1000)
+
+    print(json.dumps({
+        "benchmark": "mentors",
+        "alumni": args.alumni,
+        "mentors": len(index),
+        "limit": args.limit,
+        "build_seconds": round(build_seconds, 2),
+        "array_mb": round(sum(a.nbytes for a in (index.school, index.mandal, index.batch, index.tokens, index.active))
+                          / 1024 / 1024, 1),
+        "match_ms": queries,
+        "upsert_ms": timings(upserts),
+    }, indent=2))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--alumni", type=int, default=100000)
+    parser.add_argument("--schools", type=int, default=5000)
+    parser.add_argument("--mandals", type=int, default=60)
+    parser.add_argument("--willing", type=float, default=1.0, help="fraction of profiles willing to mentor")
+    parser.add_argument("--queries", type=int, default=500, help="requests timed per query shape")
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--mongo", action="store_true", help="rebuild from MONGO_URL instead of synthetic profiles")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,117 @@
+"""Throughput cost of request and command metrics.
+
+Runs the harness workload in-process in alternating rounds with metrics
+recording switched on and off through the runtime flag (against
+MONGO_URL/DB_NAME, or mongomock-motor with ``--mock-db``, which bypasses
+pymongo and so exercises only the HTTP middleware). Then it times the
+middleware per request on a path that does no work, and the pymongo command
+listener per command. Prints a JSON report with the
+throughput difference between the on and off rounds.
+
+    cd backend && python -m benchmarks.bench_metrics --mock-db --generate --profile small
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from datetime import timedelta
+
+import httpx
+from pymongo import monitoring
+
+from benchmarks.datagen import add_dataset_arguments, generate, in_process_database, spec_from_args
+from benchmarks.harness import Workload, run_load
+
+def listener_cost(iterations: int) -> dict:
+    # pymongo builds the events only when a listener is registered, so their
+    # construction is part of the cost and timed separately
+    import server
+
+    command = {"find": "donations", "filter": {"school_id": "school-00001"},
+               "sort": {"created_at": -1, "id": -1}, "limit": 21}
+    address = ("localhost", 27017)
+    duration = timedelta(microseconds=800)
+    started = time.perf_counter()
+    events = [
+        (monitoring.CommandStartedEvent(command, "benchmarks", request_id, address, 1),
+         monitoring.CommandSucceededEvent(duration, {"ok": 1}, "find", request_id, address, 1))
+        for request_id in range(iterations)
+    ]
+    built = time.perf_counter()
+    for started_event, succeeded_event in events:
+        server.command_metrics.started(started_event)
+        server.command_metrics.succeeded(succeeded_event)
+    done = time.perf_counter()
+    return {
+        "event_construction": round((built - started) / iterations * 1_000_000, 2),
+        "listener": round((done - built) / iterations * 1_000_000, 2),
+    }
+
+async def middleware_cost(client: httpx.AsyncClient, registry, requests: int) -> dict:
+    # An unmatched path does almost no work, so the difference is the middleware
+    cost = {}
+    for enabled in (False, True, False, True):
+        registry.enabled = enabled
+        started = time.perf_counter()
+        for _ in range(requests):
+            await client.get("/api/__unmatched__")
+        cost.setdefault(enabled, []).append((time.perf_counter() - started) / requests * 1_000_000)
+    off, on = min(cost[False]), min(cost[True])
+    return {"request_off": round(off, 1), "request_on": round(on, 1), "middleware": round(on - off, 1)}
+
+async def main(args) -> None:
+    import server
+
+    if args.mock_db:
+        server.db = in_process_database()
+    if args.generate:
+        await generate(server.db, spec_from_args(args), drop=True)
+    await server.app.router.startup()
+    transport = httpx.ASGITransport(app=server.app, raise_app_exceptions=False)
+    token = server.create_access_token({"sub": "user-admin", "role": "admin", "approved": True})
+    school_ids = [doc["id"] async for doc in server.db.schools.find({}, {"_id": 0, "id": 1}).limit(1000)]
+
+    totals = {True: [0, 0.0], False: [0, 0.0]}
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=30) as client:
+        workload = Workload(school_ids, random.Random(args.workload_seed))
+        await run_load(client, workload, token, args.concurrency, args.warmup)
+        # on, off, off, on...: data written by earlier rounds slows later ones
+        # alike for both settings
+        for round_number in range(args.rounds * 2):
+            enabled = round_number % 4 in (0, 3)
+            server.metrics_registry.enabled = enabled
+            result = await run_load(client, workload, token, args.concurrency, args.round_seconds)
+            totals[enabled][0] += result["overall"]["requests"]
+            totals[enabled][1] += result["elapsed_s"]
+        request_us = await middleware_cost(client, server.metrics_registry, args.middleware_requests)
+    server.metrics_registry.enabled = True
+    await server.app.router.shutdown()
+
+    on, off = (totals[flag][0] / totals[flag][1] for flag in (True, False))
+    per_command = listener_cost(args.listener_iterations)
+    print(json.dumps({
+        "benchmark": "metrics",
+        "target": "in-process/mock-db" if args.mock_db else "in-process",
+        "rounds": args.rounds,
+        "round_seconds": args.round_seconds,
+        "throughput_on_per_s": round(on, 1),
+        "throughput_off_per_s": round(off, 1),
+        "overhead_pct": round((off - on) / off * 100, 2),
+        "request_us": request_us,
+        "command_us": per_command,
+    }, indent=2))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_dataset_arguments(parser)
+    parser.add_argument("--mock-db", action="store_true", help="use an in-memory mongomock-motor database")
+    parser.add_argument("--generate", action="store_true", help="(re)generate the dataset before the run")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--rounds", type=int, default=5, help="pairs of on/off rounds")
+    parser.add_argument("--round-seconds", type=float, default=5.0)
+    parser.add_argument("--warmup", type=float, default=3.0)
+    parser.add_argument("--workload-seed", type=int, default=1)
+    parser.add_argument("--middleware-requests", type=int, default=5000)
+    parser.add_argument("--listener-iterations", type=int, default=200000)
+    asyncio.run(main(parser.parse_args()))
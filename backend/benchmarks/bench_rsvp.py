@@ -0,0 +1,114 @@
+"""Parallel RSVPs against a capacity-limited event: throughput and latency.
+
+Creates an event with ``--capacity`` seats, then ``--users`` distinct users
+RSVP at once through POST /api/events/{id}/rsvp, ``--concurrency`` at a time,
+a ``--duplicates`` fraction of them twice (double clicks and retries racing
+each other). A second, churn phase has a ``--cancels`` fraction of the
+seated users cancel while as many new users RSVP. In-process against
+MONGO_URL/DB_NAME, or mongomock-motor with ``--mock-db``.
+
+The report includes the final rsvp_count and seated RSVPs for reference;
+the overbooking and drift checks live in tests/test_rsvp.py.
+
+    cd backend && python -m benchmarks.bench_rsvp --users 5000 --capacity 2000 --concurrency 200
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from benchmarks.datagen import percentile
+
+EVENT_ID = "bench-rsvp-event"
+
+async def main(args) -> None:
+    from datetime import datetime, timedelta, timezone
+
+    import httpx
+    import server
+    from benchmarks.datagen import in_process_database
+
+    if args.mock_db:
+        server.db = in_process_database()
+    db = server.db
+    await server.ensure_indexes(db)
+    await db.events.delete_many({"id": EVENT_ID})
+    await db.event_rsvps.delete_many({"event_id": EVENT_ID})
+    await db.events.insert_one(server.Event(
+        id=EVENT_ID, title="District science fair", description="Benchmark", created_by="user-admin",
+        event_date=datetime.now(timezone.utc) + timedelta(days=7), capacity=args.capacity,
+    ).model_dump())
+
+    # Users must exist unless TOKEN_CLAIMS_TRUST_SECONDS lets tokens stand alone
+    await db.users.delete_many({"id": {"$regex": "^bench-rsvp-user-"}})
+    await db.users.insert_many([
+        server.User(id=f"bench-rsvp-user-{i}", email=f"rsvp{i}@bench.example.org", name=f"RSVP {i}",
+                    role="student", approved=True).model_dump()
+        for i in range(args.users * 2)
+    ])
+
+    rng = random.Random(args.seed)
+    headers = {
+        i: {"Authorization": "Bearer " + server.create_access_token(
+            {"sub": f"bench-rsvp-user-{i}", "role": "student", "approved": True})}
+        for i in range(args.users * 2)
+    }
+    latencies = []
+    statuses = {}
+    slots = asyncio.Semaphore(args.concurrency)
+    transport = httpx.ASGITransport(app=server.app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        async def call(method: str, user: int) -> int:
+            async with slots:
+                started = time.perf_counter()
+                response = await client.request(method, f"/api/events/{EVENT_ID}/rsvp", headers=headers[user])
+                latencies.append((time.perf_counter() - started) * 1000)
+                key = f"{method} {response.status_code}"
+                statuses[key] = statuses.get(key, 0) + 1
+                return response.status_code
+
+        # Phase 1: everyone at once, some of them twice
+        users = list(range(args.users))
+        attempts = users + rng.sample(users, int(len(users) * args.duplicates))
+        rng.shuffle(attempts)
+        started = time.perf_counter()
+        results = await asyncio.gather(*(call("POST", user) for user in attempts))
+        first_elapsed = time.perf_counter() - started
+        seated_users = {user for user, status in zip(attempts, results) if status == 200}
+
+        # Phase 2: cancellations racing new RSVPs for the freed seats
+        leaving = rng.sample(sorted(seated_users), int(len(seated_users) * args.cancels))
+        joining = range(args.users, args.users + len(leaving))
+        churn = [("DELETE", user) for user in leaving] + [("POST", user) for user in joining]
+        rng.shuffle(churn)
+        started = time.perf_counter()
+        await asyncio.gather(*(call(method, user) for method, user in churn))
+        churn_elapsed = time.perf_counter() - started
+
+    event = await db.events.find_one({"id": EVENT_ID}, {"_id": 0, "rsvp_count": 1})
+    seated = await db.event_rsvps.count_documents({"event_id": EVENT_ID, "seated": True})
+    ordered = sorted(latencies)
+    print(json.dumps({
+        "benchmark": "rsvp",
+        "users": args.users,
+        "capacity": args.capacity,
+        "concurrency": args.concurrency,
+        "first_phase": {"requests": len(attempts), "requests_per_s": round(len(attempts) / first_elapsed)},
+        "churn_phase": {"requests": len(churn), "requests_per_s": round(len(churn) / max(churn_elapsed, 1e-9))},
+        "latency_ms": {"p50": round(percentile(ordered, 50), 2), "p99": round(percentile(ordered, 99), 2)},
+        "statuses": statuses,
+        "rsvp_count": event["rsvp_count"],
+        "seated_rsvps": seated,
+    }, indent=2))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--capacity", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--duplicates", type=float, default=0.2, help="fraction of users who RSVP twice")
+    parser.add_argument("--cancels", type=float, default=0.25, help="fraction of seated users who cancel")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--mock-db", action="store_true", help="run on mongomock-motor instead of MONGO_URL")
+    asyncio.run(main(parser.parse_args()))
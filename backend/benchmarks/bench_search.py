@@ -0,0 +1,101 @@
+"""Build and query latency of the in-process search index at scale.
+
+Generates a synthetic corpus of Telugu and English school names plus news,
+bulletin and forum text, indexes it, then times prefix queries. Prints a
+JSON report.
+
+    cd backend && python -m benchmarks.bench_search --docs 100000
+"""
+import argparse
+import itertools
+import json
+import random
+import time
+import tracemalloc
+
+from benchmarks.datagen import percentile
+from search import SearchIndex
+
+PLACES = [
+    "Amalapuram", "Razole", "Mummidivaram", "Ravulapalem", "Sakhinetipalli", "Kothapeta",
+    "Allavaram", "Uppalaguptam", "Malikipuram", "Mamidikuduru", "Ainavilli", "Katrenikona",
+]
+PLACES_TE = ["అమలాపురం", "రాజోలు", "ముమ్మిడివరం", "రావులపాలెం", "సఖినేటిపల్లి", "కొత్తపేట"]
+SCHOOL_KINDS = ["ZPHS", "MPPS", "జిల్లా పరిషత్ ఉన్నత పాఠశాల", "Government High School"]
+COMMON_WORDS = (
+    "exam results sports day library science fair holiday notice admissions alumni meet "
+    "donation computer lab playground mid day meal parents teachers scholarship annual "
+    "పరీక్ష ఫలితాలు క్రీడలు గ్రంథాలయం సెలవు ప్రకటన విద్యార్థులు"
+).split()
+SYLLABLES = ["ka", "ra", "ma", "pa", "la", "va", "na", "ta", "sa", "di", "ru", "ko", "pe", "vi", "gu"]
+QUERIES = ["amala", "zphs raz", "అమలా", "exam res", "science", "పరీక్ష", "kotha", "library holiday", "government high"]
+
+def make_vocabulary(rng: random.Random, size: int) -> list:
+    # Real text is Zipfian: a few very common words and a long tail
+    words = {"".join(rng.choices(SYLLABLES, k=rng.randint(2, 4))) for _ in range(size)}
+    return COMMON_WORDS + sorted(words)
+
+def make_corpus(total: int, seed: int):
+    rng = random.Random(seed)
+    vocabulary = make_vocabulary(rng, max(1000, total // 2))
+    cum_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(vocabulary))))
+    schools = max(1, total // 20)
+    for i in range(schools):
+        place = rng.choice(PLACES + PLACES_TE)
+        yield "school", {
+            "id": f"school-{i}",
+            "name": f"{rng.choice(SCHOOL_KINDS)} {place} {i % 7 or ''}".strip(),
+            "address": f"Main Road, {place}, Konaseema District",
+        }
+    doc_types = ["news", "bulletin", "forum_post"]
+    for i in range(total - schools):
+        yield rng.choice(doc_types), {
+            "id": f"doc-{i}",
+            "school_id": f"school-{rng.randrange(schools)}",
+            "title": " ".join(rng.choices(vocabulary, cum_weights=cum_weights, k=5)),
+            "content": " ".join(rng.choices(vocabulary, cum_weights=cum_weights, k=60)),
+        }
+
+def main(args) -> None:
+    index = SearchIndex()
+    if args.trace_memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+    index.loading = True  # bulk load, as SearchIndex.rebuild does
+    for doc_type, doc in make_corpus(args.docs, args.seed):
+        index.add(doc_type, doc)
+    index.search("warmup")  # pays the one-off term sort
+    build_seconds = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1] if args.trace_memory else 0
+    tracemalloc.stop()
+
+    per_query = {}
+    for query in QUERIES:
+        latencies = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            hits = index.search(query, limit=20)
+            latencies.append((time.perf_counter() - started) * 1000)
+        latencies.sort()
+        per_query[query] = {
+            "hits": len(hits),
+            "p50_ms": round(percentile(latencies, 50), 3),
+            "p99_ms": round(percentile(latencies, 99), 3),
+        }
+
+    print(json.dumps({
+        "benchmark": "search",
+        "documents": len(index),
+        "terms": len(index.postings),
+        "build_seconds": round(build_seconds, 2),
+        "build_peak_mb": round(peak / 1024 / 1024, 1) if args.trace_memory else None,
+        "queries": per_query,
+    }, indent=2, ensure_ascii=False))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--docs", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--trace-memory", action="store_true", help="report peak build memory (slows the build)")
+    main(parser.parse_args())
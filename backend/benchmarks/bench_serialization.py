@@ -0,0 +1,89 @@
+"""Requests/sec of validated vs fast (orjson) list responses.
+
+Serves the same in-memory Event rows two ways: the default path, where
+FastAPI validates the page through response_model=Page[Event] and
+re-serializes it, and the FAST_RESPONSES path, where fast_json encodes the
+rows straight to bytes. Both are driven through httpx's in-process ASGI
+transport and checked to produce identical JSON. Prints a JSON report.
+
+    cd backend && python -m benchmarks.bench_serialization
+"""
+import argparse
+import asyncio
+import copy
+import json
+import time
+from datetime import datetime, timedelta, timezone
+
+import httpx
+from fastapi import FastAPI
+from starlette.responses import Response
+
+import fast_json
+from server import Event, Page
+
+def make_rows(count: int) -> list:
+    base = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    return [
+        {
+            "id": f"event-{i}",
+            "title": "Annual day",
+            "description": "Celebrations at the school ground",
+            "school_id": "school-001",
+            "event_date": base + timedelta(days=i % 365),
+            "location": "Amalapuram",
+            "rsvp_count": i % 50,
+            "created_by": "user-1",
+            "created_at": base + timedelta(minutes=i),
+        }
+        for i in range(count)
+    ]
+
+def build_app(rows: list) -> FastAPI:
+    app = FastAPI()
+
+    # Each request gets fresh dicts, as it would from a Motor cursor
+    @app.get("/validated", response_model=Page[Event])
+    async def validated():
+        return {"items": copy.copy(rows), "next_cursor": None}
+
+    @app.get("/fast", response_model=Page[Event])
+    async def fast():
+        page = {"items": [dict(row) for row in rows], "next_cursor": None}
+        return Response(content=fast_json.page_bytes(Event, page), media_type="application/json")
+
+    return app
+
+async def measure(client: httpx.AsyncClient, path: str, seconds: float) -> dict:
+    requests = 0
+    body_bytes = 0
+    started = time.perf_counter()
+    while time.perf_counter() - started < seconds:
+        response = await client.get(path)
+        body_bytes = len(response.content)
+        requests += 1
+    elapsed = time.perf_counter() - started
+    return {"requests_per_s": round(requests / elapsed, 1), "body_bytes": body_bytes}
+
+async def main(args) -> None:
+    results = {}
+    for size in args.sizes:
+        app = build_app(make_rows(size))
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            same = (await client.get("/validated")).json() == (await client.get("/fast")).json()
+            validated = await measure(client, "/validated", args.seconds)
+            fast = await measure(client, "/fast", args.seconds)
+        results[str(size)] = {
+            "identical_output": same,
+            "validated": validated,
+            "fast": fast,
+            "speedup": round(fast["requests_per_s"] / validated["requests_per_s"], 2),
+        }
+    print(json.dumps({"benchmark": "serialization", "rows": results}, indent=2))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--seconds", type=float, default=3.0)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,84 @@
+"""Per-page cost of string timestamps vs native BSON dates.
+
+The old list handlers stored created_at/event_date as isoformat() strings and
+re-parsed every row with datetime.fromisoformat before Pydantic validation.
+This times both paths on in-memory rows and checks how string ordering
+behaves once timezone offsets differ. Prints a JSON report.
+
+    cd backend && python -m benchmarks.bench_timestamps
+"""
+import argparse
+import json
+import time
+from datetime import datetime, timedelta, timezone
+
+from server import Event, Page
+
+IST = timezone(timedelta(hours=5, minutes=30))
+
+def make_rows(count: int, as_strings: bool) -> list:
+    base = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    rows = []
+    for i in range(count):
+        created_at = base + timedelta(minutes=i)
+        event_date = base + timedelta(days=i % 365)
+        rows.append({
+            "id": f"event-{i}",
+            "title": "Annual day",
+            "description": "Celebrations at the school ground",
+            "school_id": "school-001",
+            "event_date": event_date.isoformat() if as_strings else event_date,
+            "location": "Amalapuram",
+            "rsvp_count": 0,
+            "created_by": "user-1",
+            "created_at": created_at.isoformat() if as_strings else created_at,
+        })
+    return rows
+
+def old_path(rows: list):
+    # what get_events did before: parse every row, then validate
+    for event in rows:
+        if isinstance(event.get('created_at'), str):
+            event['created_at'] = datetime.fromisoformat(event['created_at'])
+        if isinstance(event.get('event_date'), str):
+            event['event_date'] = datetime.fromisoformat(event['event_date'])
+    return Page[Event](items=rows).model_dump_json()
+
+def new_path(rows: list):
+    return Page[Event](items=rows).model_dump_json()
+
+def time_path(path, count: int, as_strings: bool, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        rows = make_rows(count, as_strings)
+        started = time.perf_counter()
+        path(rows)
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+def ordering_check() -> dict:
+    # 10:00 IST is 04:30 UTC, i.e. earlier than 05:00 UTC, but sorts later as a string
+    earlier = datetime(2025, 6, 1, 10, 0, tzinfo=IST)
+    later = datetime(2025, 6, 1, 5, 0, tzinfo=timezone.utc)
+    return {
+        "as_strings_sorted_correctly": sorted([later.isoformat(), earlier.isoformat()])[0] == earlier.isoformat(),
+        "as_dates_sorted_correctly": sorted([later, earlier])[0] == earlier,
+    }
+
+def main(args) -> None:
+    pages = {}
+    for count in args.sizes:
+        before = time_path(old_path, count, True, args.repeat)
+        after = time_path(new_path, count, False, args.repeat)
+        pages[str(count)] = {
+            "string_timestamps_ms": round(before, 3),
+            "bson_dates_ms": round(after, 3),
+            "speedup": round(before / after, 2),
+        }
+    print(json.dumps({"benchmark": "timestamps", "pages": pages, "ordering": ordering_check()}, indent=2))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[20, 100, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=20)
+    main(parser.parse_args())
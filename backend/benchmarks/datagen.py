@@ -0,0 +1,276 @@
+"""Parameterized synthetic dataset generator for benchmarks.
+
+Generates mandals, schools, users, alumni, donations and school content with
+the same document shapes the API writes, and loads them with unordered
+``insert_many`` batches (several in flight at once). Every synthetic user
+shares one precomputed bcrypt hash for the password ``benchmark``.
+
+    cd backend && python -m benchmarks.datagen --profile district
+    cd backend && python -m benchmarks.datagen --schools 500 --users 20000 --drop
+
+Targets MONGO_URL/DB_NAME; pass ``--in-process`` to fill an in-memory
+mongomock-motor database instead (useful only for small profiles).
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import time
+from dataclasses import asdict, dataclass, fields
+from datetime import datetime, timedelta, timezone
+
+from passlib.context import CryptContext
+
+PROFILES = {
+    "small": dict(mandals=10, schools=200, users=5000, alumni=2000, donations=20000, content=2000),
+    "medium": dict(mandals=25, schools=1000, users=50000, alumni=20000, donations=200000, content=20000),
+    "district": dict(mandals=50, schools=5000, users=500000, alumni=200000, donations=2000000, content=100000),
+}
+
+ROLES = ["student"] * 6 + ["parent"] * 2 + ["alumni"] * 3 + ["staff", "donor", "mentor"]
+PROFESSIONS = ["Engineer", "Teacher", "Doctor", "Farmer", "Civil Servant", "Entrepreneur", "Nurse", "Scientist"]
+COMPANIES = ["TCS", "Infosys", "APSRTC", "AP Govt", "Wipro", "Self-employed", "ISRO", "HCL"]
+PURPOSES = ["books", "infrastructure", "scholarship", "sports", "computer lab", None]
+CONTENT_WORDS = (
+    "exam results sports day library science fair holiday notice admissions alumni meet "
+    "donation computer lab playground mid day meal parents teachers scholarship annual"
+).split()
+
+BENCHMARK_PASSWORD = "benchmark"
+
+@dataclass
+class DatasetSpec:
+    mandals: int
+    schools: int
+    users: int
+    alumni: int
+    donations: int
+    content: int  # each of news, bulletins, events and forum posts
+    seed: int = 42
+    batch_size: int = 5000
+    in_flight: int = 4
+
+def mandal_id(i: int) -> str:
+    return f"mandal-{i:03d}"
+
+def school_id(i: int) -> str:
+    return f"school-{i:05d}"
+
+def user_id(i: int) -> str:
+    return f"user-{i:07d}"
+
+class Generator:
+    def __init__(self, spec: DatasetSpec):
+        self.spec = spec
+        self.rng = random.Random(spec.seed)
+        self.epoch = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        self.span_seconds = int((datetime(2026, 1, 1, tzinfo=timezone.utc) - self.epoch).total_seconds())
+        self.school_mandal = {}
+        self.hashed_password = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4).hash(BENCHMARK_PASSWORD)
+
+    def timestamp(self) -> datetime:
+        # millisecond precision, as BSON stores it
+        return self.epoch + timedelta(milliseconds=self.rng.randrange(self.span_seconds * 1000))
+
+    def random_school(self) -> str:
+        return school_id(self.rng.randrange(self.spec.schools))
+
+    def mandals(self):
+        for i in range(self.spec.mandals):
+            yield {"id": mandal_id(i), "name": f"Mandal {i:03d}", "district": "Konaseema", "meo_count": 2}
+
+    def schools(self):
+        for i in range(self.spec.schools):
+            mandal = mandal_id(i % self.spec.mandals)
+            self.school_mandal[school_id(i)] = mandal
+            yield {
+                "id": school_id(i),
+                "name": f"ZPHS {mandal.split('-')[1]}-{i}",
+                "mandal_id": mandal,
+                "udise_code": f"2816{i:07d}",
+                "hm_note": "Synthetic school generated for benchmarks.",
+                "facilities": self.rng.sample(["Library", "Computer Lab", "Science Lab", "Playground"], 2),
+                "contact_email": f"{school_id(i)}@example.org",
+                "contact_phone": None,
+                "address": f"Main Road, {mandal}",
+                "created_at": self.timestamp(),
+            }
+
+    def users(self):
+        yield {
+            "id": "user-admin", "email": "admin@bench.example.org", "name": "Benchmark Admin", "phone": None,
+            "role": "admin", "school_id": None, "mandal_id": None, "batch_year": None, "approved": True,
+            "created_at": self.epoch, "hashed_password": self.hashed_password,
+        }
+        for i in range(self.spec.users):
+            school = self.random_school()
+            role = self.rng.choice(ROLES)
+            yield {
+                "id": user_id(i),
+                "email": f"{user_id(i)}@bench.example.org",
+                "name": f"User {i}",
+                "phone": None,
+                "role": role,
+                "school_id": school,
+                "mandal_id": self.school_mandal[school],
+                "batch_year": self.rng.randint(1980, 2024) if role == "alumni" else None,
+                "approved": role != "alumni" or self.rng.random() < 0.8,
+                "created_at": self.timestamp(),
+                "hashed_password": self.hashed_password,
+            }
+
+    def alumni(self):
+        seen = set()  # (school_id, user_id) is unique, as in the alumni index
+        for i in range(self.spec.alumni):
+            user, school = user_id(self.rng.randrange(max(self.spec.users, 1))), self.random_school()
+            while (school, user) in seen:
+                user, school = user_id(self.rng.randrange(max(self.spec.users, 1))), self.random_school()
+            seen.add((school, user))
+            yield {
+                "id": f"alumni-{i:07d}",
+                "user_id": user,
+                "school_id": school,
+                "mandal_id": self.school_mandal[school],
+                "batch_year": self.rng.randint(1980, 2024),
+                "current_profession": self.rng.choice(PROFESSIONS),
+                "company": self.rng.choice(COMPANIES),
+                "achievements": [],
+                "willing_to_mentor": self.rng.random() < 0.3,
+                "created_at": self.timestamp(),
+            }
+
+    def donations(self):
+        for i in range(self.spec.donations):
+            yield {
+                "id": f"donation-{i:08d}",
+                "donor_name": f"Donor {i % 5000}",
+                "donor_email": f"donor{i % 5000}@bench.example.org",
+                "amount": float(self.rng.choice([100, 250, 500, 1000, 2500, 5000, 10000])),
+                "school_id": self.random_school(),
+                "purpose": self.rng.choice(PURPOSES),
+                "payment_status": "completed" if self.rng.random() < 0.95 else "failed",
+                "transaction_id": f"TXN{i:012d}",
+                "created_at": self.timestamp(),
+            }
+
+    def _text(self, words: int) -> str:
+        return " ".join(self.rng.choices(CONTENT_WORDS, k=words))
+
+    def content(self, kind: str):
+        for i in range(self.spec.content):
+            doc = {
+                "id": f"{kind}-{i:07d}",
+                "title": self._text(5).capitalize(),
+                "school_id": self.random_school(),
+                "created_at": self.timestamp(),
+            }
+            if kind == "events":
+                doc.update(description=self._text(30), event_date=self.timestamp(), location=None,
+                           rsvp_count=0, created_by="user-admin")
+            elif kind == "forum_posts":
+                doc.update(content=self._text(60), author_id=user_id(self.rng.randrange(max(self.spec.users, 1))),
+                           category="general", replies_count=0)
+            elif kind == "news":
+                doc.update(content=self._text(80), image_url=None, created_by="user-admin")
+            else:
+                doc.update(content=self._text(40), category="announcement", created_by="user-admin")
+            yield doc
+
+    def collections(self):
+        # Order matters: schools must exist before users/alumni reference them
+        yield "mandals", self.mandals()
+        yield "schools", self.schools()
+        yield "users", self.users()
+        yield "alumni", self.alumni()
+        yield "donations", self.donations()
+        for kind in ("news", "bulletins", "events", "forum_posts"):
+            yield kind, self.content(kind)
+
+def batched(docs, size: int):
+    iterator = iter(docs)
+    while batch := list(itertools.islice(iterator, size)):
+        yield batch
+
+async def insert_stream(collection, docs, batch_size: int, in_flight: int) -> int:
+    # Back-pressure: at most in_flight batches are generated and unacknowledged
+    slots = asyncio.Semaphore(in_flight)
+    tasks = []
+    inserted = 0
+
+    async def flush(batch):
+        try:
+            await collection.insert_many(batch, ordered=False)
+        finally:
+            slots.release()
+
+    for batch in batched(docs, batch_size):
+        await slots.acquire()
+        tasks.append(asyncio.create_task(flush(batch)))
+        inserted += len(batch)
+    await asyncio.gather(*tasks)
+    return inserted
+
+async def generate(db, spec: DatasetSpec, drop: bool = False, log=print) -> dict:
+    import stats
+    from server import ensure_indexes
+
+    generator = Generator(spec)
+    counts = {}
+    started = time.perf_counter()
+    for name, docs in generator.collections():
+        if drop:
+            await db[name].drop()
+        collection_started = time.perf_counter()
+        counts[name] = await insert_stream(db[name], docs, spec.batch_size, spec.in_flight)
+        elapsed = time.perf_counter() - collection_started
+        log(f"✓ {name}: {counts[name]} documents in {elapsed:.1f}s ({counts[name] / max(elapsed, 1e-9):,.0f}/s)")
+
+    await ensure_indexes(db)
+    await stats.reconcile_stats(db)
+    return {"spec": asdict(spec), "counts": counts, "seconds": round(time.perf_counter() - started, 1)}
+
+def spec_from_args(args) -> DatasetSpec:
+    values = dict(PROFILES[args.profile])
+    for field in fields(DatasetSpec):
+        override = getattr(args, field.name, None)
+        if override is not None:
+            values[field.name] = override
+    return DatasetSpec(**values)
+
+def add_dataset_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="small")
+    for name in ("mandals", "schools", "users", "alumni", "donations", "content", "seed", "batch_size", "in_flight"):
+        parser.add_argument(f"--{name.replace('_', '-')}", dest=name, type=int)
+
+def percentile(ordered: list, pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list of samples."""
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))] if ordered else 0.0
+
+def in_process_database():
+    try:
+        from mongomock_motor import AsyncMongoMockClient
+    except ImportError:
+        raise SystemExit("--in-process needs mongomock-motor: pip install mongomock-motor")
+    return AsyncMongoMockClient(tz_aware=True)["benchmarks"]
+
+async def main(args) -> None:
+    if args.in_process:
+        db = in_process_database()
+    else:
+        from motor.motor_asyncio import AsyncIOMotorClient
+        db = AsyncIOMotorClient(os.environ["MONGO_URL"], tz_aware=True)[os.environ["DB_NAME"]]
+    report = await generate(db, spec_from_args(args), drop=args.drop)
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+    from pathlib import Path
+
+    load_dotenv(Path(__file__).resolve().parent.parent / ".env")
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_dataset_arguments(parser)
+    parser.add_argument("--drop", action="store_true", help="drop each collection before loading it")
+    parser.add_argument("--in-process", action="store_true")
+    asyncio.run(main(parser.parse_args()))
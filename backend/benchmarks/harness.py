@@ -0,0 +1,225 @@
+"""Mixed read/write load test against the real FastAPI app.
+
+Drives ``server.app`` in-process through httpx's ASGI transport (or a running
+server with ``--url``) with a weighted mix of public reads, authenticated
+reads and writes, and reports per-route throughput and p50/p95/p99 latency as
+JSON, tagged with the current git commit so runs can be compared.
+
+    # against MONGO_URL/DB_NAME, generating the dataset first
+    cd backend && python -m benchmarks.harness --generate --profile medium --duration 60
+
+    # fully in-process with a mongomock-motor database
+    cd backend && python -m benchmarks.harness --mock-db --generate --duration 20 --output run.json
+
+    # against a deployed worker (dataset from benchmarks.datagen)
+    cd backend && python -m benchmarks.harness --url http://localhost:8001 --duration 60
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+
+import httpx
+
+from benchmarks.datagen import (
+    BENCHMARK_PASSWORD,
+    add_dataset_arguments,
+    generate,
+    in_process_database,
+    percentile,
+    spec_from_args,
+)
+
+SEARCH_TERMS = ["zphs", "exam", "library", "sports day", "results"]
+
+class Workload:
+    """Weighted operations; each returns (route label, method, path, json body, needs auth)."""
+
+    def __init__(self, school_ids: list, rng: random.Random):
+        self.school_ids = school_ids or ["school-00000"]
+        self.rng = rng
+        self.operations = [
+            (20, self.list_schools),
+            (10, self.get_school),
+            (10, self.school_overview),
+            (10, self.school_news),
+            (8, self.bulletins),
+            (8, self.events),
+            (5, self.school_alumni),
+            (5, self.school_donations),
+            (5, self.search),
+            (5, self.me),
+            (2, self.admin_stats),
+            (3, self.create_donation),
+            (1, self.create_bulletin),
+            (1, self.create_forum_post),
+        ]
+        self.weights = [weight for weight, _ in self.operations]
+
+    def school(self) -> str:
+        return self.rng.choice(self.school_ids)
+
+    def next(self):
+        return self.rng.choices(self.operations, weights=self.weights)[0][1]()
+
+    def list_schools(self):
+        return "GET /api/schools", "GET", "/api/schools", None, False
+
+    def get_school(self):
+        return "GET /api/schools/{id}", "GET", f"/api/schools/{self.school()}", None, False
+
+    def school_overview(self):
+        return "GET /api/schools/{id}/overview", "GET", f"/api/schools/{self.school()}/overview", None, False
+
+    def school_news(self):
+        return "GET /api/news?school_id", "GET", f"/api/news?school_id={self.school()}", None, False
+
+    def bulletins(self):
+        return "GET /api/bulletins", "GET", "/api/bulletins", None, False
+
+    def events(self):
+        return "GET /api/events?school_id", "GET", f"/api/events?school_id={self.school()}", None, False
+
+    def school_alumni(self):
+        return "GET /api/alumni?school_id", "GET", f"/api/alumni?school_id={self.school()}", None, False
+
+    def school_donations(self):
+        return "GET /api/donations?school_id", "GET", f"/api/donations?school_id={self.school()}", None, False
+
+    def search(self):
+        return "GET /api/search", "GET", f"/api/search?q={self.rng.choice(SEARCH_TERMS)}", None, False
+
+    def me(self):
+        return "GET /api/auth/me", "GET", "/api/auth/me", None, True
+
+    def admin_stats(self):
+        return "GET /api/admin/stats", "GET", "/api/admin/stats", None, True
+
+    def create_donation(self):
+        body = {
+            "donor_name": "Load Test",
+            "donor_email": "load@bench.example.org",
+            "amount": float(self.rng.choice([100, 500, 1000])),
+            "school_id": self.school(),
+        }
+        return "POST /api/donations", "POST", "/api/donations", body, False
+
+    def create_bulletin(self):
+        body = {"title": "Load test notice", "content": "Generated by the harness", "school_id": self.school()}
+        return "POST /api/bulletins", "POST", "/api/bulletins", body, True
+
+    def create_forum_post(self):
+        body = {"title": "Load test thread", "content": "Generated by the harness", "school_id": self.school()}
+        return "POST /api/forums/posts", "POST", "/api/forums/posts", body, True
+
+async def run_load(client: httpx.AsyncClient, workload: Workload, token: str, concurrency: int, duration: float) -> dict:
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+    headers = {"Authorization": f"Bearer {token}"}
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        while time.perf_counter() < deadline:
+            label, method, path, body, auth = workload.next()
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, path, json=body, headers=headers if auth else None)
+                failed = response.status_code >= 400
+            except httpx.HTTPError:
+                failed = True
+            latencies[label].append((time.perf_counter() - started) * 1000)
+            if failed:
+                errors[label] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    def summarize(samples: list, error_count: int) -> dict:
+        ordered = sorted(samples)
+        return {
+            "requests": len(ordered),
+            "errors": error_count,
+            "throughput_per_s": round(len(ordered) / elapsed, 1),
+            "p50_ms": round(percentile(ordered, 50), 2),
+            "p95_ms": round(percentile(ordered, 95), 2),
+            "p99_ms": round(percentile(ordered, 99), 2),
+            "max_ms": round(ordered[-1], 2) if ordered else 0.0,
+        }
+
+    routes = {label: summarize(samples, errors[label]) for label, samples in sorted(latencies.items())}
+    overall = summarize([ms for samples in latencies.values() for ms in samples], sum(errors.values()))
+    return {"elapsed_s": round(elapsed, 2), "overall": overall, "routes": routes}
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+async def main(args) -> None:
+    import server
+
+    dataset = None
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=30)
+        if args.generate:
+            from motor.motor_asyncio import AsyncIOMotorClient
+            db = AsyncIOMotorClient(os.environ["MONGO_URL"], tz_aware=True)[os.environ["DB_NAME"]]
+            dataset = await generate(db, spec_from_args(args), drop=True)
+        login = await client.post("/api/auth/login", json={"email": "admin@bench.example.org", "password": BENCHMARK_PASSWORD})
+        login.raise_for_status()
+        token = login.json()["access_token"]
+        school_ids = [school["id"] for school in (await client.get(f"/api/schools?limit={server.MAX_PAGE_SIZE}")).json()["items"]]
+    else:
+        if args.mock_db:
+            server.db = in_process_database()
+        if args.generate:
+            dataset = await generate(server.db, spec_from_args(args), drop=True)
+        await server.app.router.startup()
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=server.app, raise_app_exceptions=False), base_url="http://bench", timeout=30)
+        token = server.create_access_token({"sub": "user-admin", "role": "admin", "approved": True})
+        school_ids = [doc["id"] async for doc in server.db.schools.find({}, {"_id": 0, "id": 1}).limit(1000)]
+
+    workload = Workload(school_ids, random.Random(args.workload_seed))
+    async with client:
+        if args.warmup > 0:
+            await run_load(client, workload, token, args.concurrency, args.warmup)
+        results = await run_load(client, workload, token, args.concurrency, args.duration)
+
+    if not args.url:
+        await server.app.router.shutdown()
+
+    report = {
+        "benchmark": "harness",
+        "commit": git_commit(),
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "target": args.url or ("in-process/mock-db" if args.mock_db else "in-process"),
+        "concurrency": args.concurrency,
+        "duration_s": args.duration,
+        "dataset": dataset,
+        **results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as handle:
+            handle.write(output + "\n")
+    print(output)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_dataset_arguments(parser)
+    parser.add_argument("--url", help="base URL of a running server; default drives server.app in-process")
+    parser.add_argument("--mock-db", action="store_true", help="use an in-memory mongomock-motor database")
+    parser.add_argument("--generate", action="store_true", help="(re)generate the dataset before the run")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds")
+    parser.add_argument("--warmup", type=float, default=3.0, help="seconds, not reported")
+    parser.add_argument("--workload-seed", type=int, default=1)
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,222 @@
+"""Streaming CSV/NDJSON bulk import behind /api/admin/import/{kind}.
+
+Uploads are parsed incrementally from an async iterator of byte chunks, so a
+district-sized file is never held in memory. Rows are validated in batches
+against the kind's row model and each batch is written with a single
+unordered ``bulk_write`` of upserts keyed on the kind's natural key, which
+makes re-running an import idempotent. Only the columns a row gives are
+``$set``; model defaults for the rest apply to new documents only, so a file
+with fewer columns never blanks fields of existing ones. Every written
+document gets ``updated_at``, which the in-process indexes refresh on. Rows
+whose ``references`` name a missing document are rejected. Rows that fail
+parsing, validation or the write are reported by line number; the rest of
+their batch still lands.
+"""
+import codecs
+import csv
+import json
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import AsyncIterator, Awaitable, Callable, List, Optional, Tuple, Type, Union, get_origin
+
+from pydantic import BaseModel, ValidationError
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+FORMATS = ("csv", "ndjson")
+LIST_SEPARATOR = ";"  # CSV cells for list fields, e.g. "Library;Playground"
+# Spreadsheets run cells starting with these as formulas; exports.py writes
+# such text behind a "'" and CSV imports drop it again
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+MAX_REPORTED_ERRORS = 1000
+
+@dataclass
+class ImportKind:
+    collection: str
+    model: Type[BaseModel]  # validated row; the fields it sets are $set on the document
+    key: Tuple[str, ...]  # natural key the upsert matches on
+    # called after each batch with [(document, inserted, stored)] for the rows written,
+    # stored being the fields the row had before this import ({} if it had none)
+    on_batch: Optional[Callable[[object, list], Awaitable[None]]] = None
+    # (field, collection) pairs: the field must hold the id of a document there
+    references: Tuple[Tuple[str, str], ...] = ()
+
+async def _lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending.rstrip("\r")
+
+async def records(chunks: AsyncIterator[bytes], fmt: str) -> AsyncIterator[Tuple[int, Union[dict, str]]]:
+    """Yield (line number, row) for each record, or (line number, error message)."""
+    number = 0
+    if fmt == "ndjson":
+        async for line in _lines(chunks):
+            number += 1
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as exc:
+                yield number, f"invalid JSON: {exc}"
+                continue
+            yield number, row if isinstance(row, dict) else "expected a JSON object"
+        return
+
+    header = None
+    buffered: List[str] = []
+    async for line in _lines(chunks):
+        number += 1
+        buffered.append(line)
+        # An odd number of quotes means a quoted cell continues on the next line
+        if sum(part.count('"') for part in buffered) % 2:
+            continue
+        first = number - len(buffered) + 1
+        text = "\n".join(buffered)
+        buffered = []
+        if not text.strip():
+            continue
+        cells = next(csv.reader([text]))
+        if header is None:
+            header = [name.strip() for name in cells]
+            continue
+        if len(cells) != len(header):
+            yield first, f"expected {len(header)} columns, got {len(cells)}"
+            continue
+        # Empty cells are omitted so the model's defaults apply
+        yield first, {name: _unescape(value) for name, value in zip(header, cells) if value != ""}
+    if buffered:
+        yield number - len(buffered) + 1, "unterminated quoted field"
+
+def _unescape(cell: str) -> str:
+    return cell[1:] if cell.startswith("'") and cell[1:].startswith(FORMULA_PREFIXES) else cell
+
+def _list_fields(model: Type[BaseModel]) -> set:
+    return {name for name, field in model.model_fields.items() if get_origin(field.annotation) is list}
+
+def _describe(exc: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(map(str, error['loc'])) or 'row'}: {error['msg']}" for error in exc.errors())
+
+class _Import:
+    def __init__(self, db, kind: ImportKind):
+        self.db = db
+        self.kind = kind
+        self.list_fields = _list_fields(kind.model)
+        self.report = {"rows": 0, "inserted": 0, "updated": 0, "duplicates": 0, "failed": 0, "errors": []}
+
+    def fail(self, line: int, message: str) -> None:
+        self.report["failed"] += 1
+        if len(self.report["errors"]) < MAX_REPORTED_ERRORS:
+            self.report["errors"].append({"line": line, "error": message})
+
+    def validate(self, batch: list) -> dict:
+        # key -> (line, given fields, defaults); a key repeated within the batch keeps its last row
+        valid = {}
+        for line, row in batch:
+            for name in self.list_fields:
+                if isinstance(row.get(name), str):
+                    row[name] = [item.strip() for item in row[name].split(LIST_SEPARATOR) if item.strip()]
+            try:
+                parsed = self.kind.model.model_validate(row)
+            except ValidationError as exc:
+                self.fail(line, _describe(exc))
+                continue
+            fields = parsed.model_dump(exclude_unset=True)
+            defaults = {name: value for name, value in parsed.model_dump().items() if name not in fields}
+            key = tuple(fields[name] for name in self.kind.key)
+            if key in valid:
+                self.report["duplicates"] += 1
+            valid[key] = (line, fields, defaults)
+        return valid
+
+    async def check_references(self, valid: dict) -> dict:
+        # One indexed $in per referenced collection for the whole batch
+        for field, collection in self.kind.references:
+            values = list({fields[field] for _, fields, _ in valid.values() if fields.get(field) is not None})
+            known = set(await self.db[collection].distinct("id", {"id": {"$in": values}}))
+            for key, (line, fields, _) in list(valid.items()):
+                if fields.get(field) is not None and fields[field] not in known:
+                    self.fail(line, f"{field}: unknown {collection} id {fields[field]!r}")
+                    del valid[key]
+        return valid
+
+    async def existing(self, keys: list) -> dict:
+        # One indexed $in per key field; the result is a superset, matched exactly below.
+        # The stored fields let on_batch see the merged document of an update.
+        query = {name: {"$in": list({key[i] for key in keys})} for i, name in enumerate(self.kind.key)}
+        projection = {"_id": 0, "id": 1, **{name: 1 for name in self.kind.model.model_fields}}
+        found = {}
+        async for doc in self.db[self.kind.collection].find(query, projection):
+            found[tuple(doc.get(name) for name in self.kind.key)] = doc
+        return found
+
+    async def write(self, batch: list) -> None:
+        valid = await self.check_references(self.validate(batch))
+        if not valid:
+            return
+        found = await self.existing(list(valid))
+        now = datetime.now(timezone.utc)
+        lines, keys, docs, ops = [], [], [], []
+        for key, (line, fields, defaults) in valid.items():
+            stored = found.get(key, {})
+            doc_id = stored.get("id") or str(uuid.uuid4())
+            lines.append(line)
+            keys.append(key)
+            docs.append({**defaults, **stored, **fields, "id": doc_id, "updated_at": now})
+            ops.append(UpdateOne(
+                dict(zip(self.kind.key, key)),
+                {"$set": {**fields, "updated_at": now}, "$setOnInsert": {**defaults, "id": doc_id, "created_at": now}},
+                upsert=True,
+            ))
+
+        failed = {}
+        try:
+            result = await self.db[self.kind.collection].bulk_write(ops, ordered=False)
+            upserted = set(result.upserted_ids)
+        except BulkWriteError as exc:
+            upserted = {item["index"] for item in exc.details.get("upserted", [])}
+            failed = {error["index"]: error["errmsg"] for error in exc.details.get("writeErrors", [])}
+
+        written = []
+        for index, doc in enumerate(docs):
+            if index in failed:
+                self.fail(lines[index], failed[index])
+                continue
+            inserted = index in upserted
+            if inserted:
+                doc["created_at"] = now
+            written.append((doc, inserted, found.get(keys[index], {})))
+            self.report["inserted" if inserted else "updated"] += 1
+        if written and self.kind.on_batch:
+            await self.kind.on_batch(self.db, written)
+
+async def import_rows(
+    db,
+    kind: ImportKind,
+    chunks: AsyncIterator[bytes],
+    fmt: str = "csv",
+    batch_size: int = 1000,
+) -> dict:
+    job = _Import(db, kind)
+    batch = []
+    async for line, row in records(chunks, fmt):
+        job.report["rows"] += 1
+        if isinstance(row, str):
+            job.fail(line, row)
+            continue
+        batch.append((line, row))
+        if len(batch) >= batch_size:
+            await job.write(batch)
+            batch = []
+    if batch:
+        await job.write(batch)
+    job.report["errors"].sort(key=lambda error: error["line"])
+    job.report["errors_truncated"] = job.report["failed"] > len(job.report["errors"])
+    return job.report
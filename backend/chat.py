@@ -0,0 +1,331 @@
+"""WebSocket chat behind /api/chat/ws.
+
+``ChatService`` ties together three pieces:
+
+* ``ConnectionRegistry`` maps user ids to their open sockets on this worker.
+  Every socket drains its own bounded outbox, so one slow client cannot hold
+  up delivery to the others; a client whose outbox overflows is disconnected.
+* A broker carries each message to every worker. ``MemoryBroker`` delivers
+  within this process only; ``MongoBroker`` publishes into a capped
+  collection that every worker tails, for deployments with several workers.
+* ``MessageBuffer`` persists messages with ``insert_many`` once
+  ``max_batch`` are pending or every ``flush_seconds``, whichever is first.
+  Live delivery does not wait for the write, so a message can reach sockets
+  up to ``flush_seconds`` before it shows up in paginated history. A failed
+  write is put back at the head of the queue and retried with exponential
+  backoff; a message is dropped only after ``max_attempts`` failed writes.
+"""
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict, defaultdict
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+from bson import ObjectId
+from pymongo import CursorType, UpdateOne
+from pymongo.errors import BulkWriteError, CollectionInvalid
+from starlette.websockets import WebSocket, WebSocketDisconnect
+
+import fast_json
+
+logger = logging.getLogger(__name__)
+
+MAX_MESSAGE_LENGTH = 4000
+DUPLICATE_KEY = 11000
+
+class Connection:
+    def __init__(self, websocket: WebSocket, user_id: str, max_pending: int):
+        self.websocket = websocket
+        self.user_id = user_id
+        self.outbox: asyncio.Queue = asyncio.Queue(max_pending)
+
+    def offer(self, text: str) -> bool:
+        try:
+            self.outbox.put_nowait(text)
+        except asyncio.QueueFull:
+            return False
+        return True
+
+    async def pump(self) -> None:
+        while True:
+            await self.websocket.send_text(await self.outbox.get())
+
+class ConnectionRegistry:
+    def __init__(self):
+        self.by_user = defaultdict(set)
+        self.connections = 0
+        self.delivered = 0
+        self.dropped = 0
+
+    def add(self, connection: Connection) -> None:
+        self.by_user[connection.user_id].add(connection)
+        self.connections += 1
+
+    def remove(self, connection: Connection) -> None:
+        sockets = self.by_user.get(connection.user_id)
+        if sockets and connection in sockets:
+            sockets.discard(connection)
+            self.connections -= 1
+            if not sockets:
+                del self.by_user[connection.user_id]
+
+    def deliver(self, user_ids: List[str], text: str) -> None:
+        for user_id in user_ids:
+            for connection in list(self.by_user.get(user_id, ())):
+                if connection.offer(text):
+                    self.delivered += 1
+                else:
+                    # 1013 "try again later": the client reconnects and reloads history
+                    self.dropped += 1
+                    self.remove(connection)
+                    asyncio.create_task(connection.websocket.close(code=1013))
+
+class MemoryBroker:
+    def __init__(self):
+        self.handler: Optional[Callable[[dict], None]] = None
+
+    async def start(self, handler: Callable[[dict], None]) -> None:
+        self.handler = handler
+
+    async def publish(self, event: dict) -> None:
+        self.handler(event)
+
+    async def stop(self) -> None:
+        pass
+
+class MongoBroker:
+    def __init__(self, db, size_bytes: int = 64 * 1024 * 1024):
+        self.db = db
+        self.size_bytes = size_bytes
+        self.task: Optional[asyncio.Task] = None
+
+    async def start(self, handler: Callable[[dict], None]) -> None:
+        try:
+            await self.db.create_collection("chat_events", capped=True, size=self.size_bytes)
+        except CollectionInvalid:
+            pass  # another worker created it
+        self.task = asyncio.create_task(self._tail(handler))
+
+    async def publish(self, event: dict) -> None:
+        await self.db.chat_events.insert_one({"event": event})
+
+    async def _tail(self, handler: Callable[[dict], None]) -> None:
+        # Start after the newest event so a restarting worker does not replay history
+        newest = await self.db.chat_events.find_one({}, sort=[("$natural", -1)])
+        query = {"_id": {"$gt": newest["_id"]}} if newest else {}
+        while True:
+            try:
+                cursor = self.db.chat_events.find(query, cursor_type=CursorType.TAILABLE_AWAIT)
+                async for doc in cursor:
+                    query = {"_id": {"$gt": doc["_id"]}}
+                    handler(doc["event"])
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Chat event tail failed; retrying")
+            await asyncio.sleep(0.1)  # a tailable cursor on an empty collection dies at once
+
+    async def stop(self) -> None:
+        if self.task:
+            self.task.cancel()
+
+class MessageBuffer:
+    def __init__(self, max_batch: int = 500, flush_seconds: float = 0.25, max_attempts: int = 5,
+                 max_backoff: float = 30.0):
+        self.max_batch = max_batch
+        self.flush_seconds = flush_seconds
+        self.max_attempts = max_attempts
+        self.max_backoff = max_backoff
+        self.pending: List[dict] = []
+        self.attempts: Dict[str, int] = {}  # message id -> failed writes so far
+        self.retry_at = 0.0
+        self.flushed = 0
+        self.batches = 0
+        self.retried = 0
+        self.failed = 0
+
+    async def add(self, db, message: dict) -> None:
+        self.pending.append(message)
+        if len(self.pending) >= self.max_batch:
+            # the sender that fills a batch pays for its write: natural back-pressure
+            await self.flush(db)
+
+    async def flush(self, db, force: bool = False) -> None:
+        if not self.pending or (not force and time.monotonic() < self.retry_at):
+            return
+        batch, self.pending = self.pending, []
+        try:
+            await db.chat_messages.insert_many(batch, ordered=False)
+            unsaved = []
+        except BulkWriteError as exc:
+            # A retried message may already be stored: a duplicate id means it was written
+            unsaved = [batch[error["index"]] for error in exc.details.get("writeErrors", [])
+                       if error.get("code") != DUPLICATE_KEY]
+        except Exception:
+            logger.exception("Failed to persist %d chat messages; will retry", len(batch))
+            unsaved = batch
+        if unsaved:
+            self._requeue(unsaved)
+        else:
+            self.retry_at = 0.0
+        unsaved_ids = {message["id"] for message in unsaved}
+        saved = [message for message in batch if message["id"] not in unsaved_ids]
+        if not saved:
+            return
+        newest = {}
+        for message in saved:
+            self.attempts.pop(message["id"], None)
+            conversation_id = message["conversation_id"]
+            if conversation_id not in newest or message["created_at"] > newest[conversation_id]:
+                newest[conversation_id] = message["created_at"]
+        try:
+            await db.conversations.bulk_write([
+                UpdateOne({"id": conversation_id}, {"$max": {"last_message_at": created_at}})
+                for conversation_id, created_at in newest.items()
+            ], ordered=False)
+        except Exception:
+            # The messages are stored; only the conversation ordering lags until its next message
+            logger.exception("Failed to update last_message_at for %d conversations", len(newest))
+        self.flushed += len(saved)
+        self.batches += 1
+
+    def _requeue(self, messages: List[dict]) -> None:
+        retry = []
+        for message in messages:
+            attempts = self.attempts.get(message["id"], 0) + 1
+            if attempts < self.max_attempts:
+                self.attempts[message["id"]] = attempts
+                retry.append(message)
+            else:
+                self.attempts.pop(message["id"], None)
+                self.failed += 1
+        if len(retry) < len(messages):
+            logger.error("Dropped %d chat messages after %d failed writes", len(messages) - len(retry),
+                         self.max_attempts)
+        # Ahead of anything sent since, so history keeps its order
+        self.pending[:0] = retry
+        self.retried += len(retry)
+        backoff = self.flush_seconds * 2 ** max(self.attempts.values(), default=0)
+        self.retry_at = time.monotonic() + min(backoff, self.max_backoff)
+
+class ChatService:
+    def __init__(self, max_batch: int = 500, flush_seconds: float = 0.25, max_pending: int = 256,
+                 members_cache_size: int = 10000):
+        self.registry = ConnectionRegistry()
+        self.buffer = MessageBuffer(max_batch, flush_seconds)
+        self.max_pending = max_pending
+        self.members_cache_size = members_cache_size
+        self._members: "OrderedDict[str, list]" = OrderedDict()
+        self.broker = None
+        self.db = None
+        self.flusher: Optional[asyncio.Task] = None
+
+    async def start(self, db, broker) -> None:
+        self.db = db
+        self.broker = broker
+        await broker.start(self._on_event)
+        self.flusher = asyncio.create_task(self._flush_periodically())
+
+    async def stop(self) -> None:
+        if self.flusher:
+            self.flusher.cancel()
+        if self.broker:
+            await self.broker.stop()
+        if self.db is not None:
+            await self.buffer.flush(self.db, force=True)
+
+    async def _flush_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.buffer.flush_seconds)
+            await self.buffer.flush(self.db)
+
+    def _on_event(self, event: dict) -> None:
+        self.registry.deliver(event["members"], event["payload"])
+
+    async def members(self, conversation_id: str) -> Optional[list]:
+        # Membership never changes after creation, so it is cached per worker
+        members = self._members.get(conversation_id)
+        if members is None:
+            conversation = await self.db.conversations.find_one({"id": conversation_id}, {"_id": 0, "members": 1})
+            if conversation is None:
+                return None
+            members = conversation["members"]
+            self._members[conversation_id] = members
+            if len(self._members) > self.members_cache_size:
+                self._members.popitem(last=False)
+        else:
+            self._members.move_to_end(conversation_id)
+        return members
+
+    async def serve(self, websocket: WebSocket, user_id: str) -> None:
+        connection = Connection(websocket, user_id, self.max_pending)
+        self.registry.add(connection)
+        pump = asyncio.create_task(connection.pump())
+        try:
+            while True:
+                received = await websocket.receive()
+                if received["type"] == "websocket.disconnect":
+                    raise WebSocketDisconnect(received.get("code", 1000))
+                if received.get("text") is None:
+                    connection.offer(json.dumps({"type": "error", "detail": "Only text frames are accepted"}))
+                    continue
+                try:
+                    frame = json.loads(received["text"])
+                except ValueError:
+                    connection.offer(json.dumps({"type": "error", "detail": "Invalid JSON"}))
+                    continue
+                reply = await self.handle(user_id, frame)
+                if reply:
+                    connection.offer(json.dumps(reply))
+        except (WebSocketDisconnect, RuntimeError):
+            pass  # RuntimeError: the registry already closed a slow socket
+        finally:
+            self.registry.remove(connection)
+            pump.cancel()
+
+    async def handle(self, user_id: str, frame: dict) -> Optional[dict]:
+        kind = frame.get("type") if isinstance(frame, dict) else None
+        if kind == "ping":
+            return {"type": "pong"}
+        if kind != "send":
+            return {"type": "error", "detail": "Unknown frame type"}
+
+        body = frame.get("body")
+        if not isinstance(body, str) or not body.strip() or len(body) > MAX_MESSAGE_LENGTH:
+            return {"type": "error", "detail": f"body must be 1-{MAX_MESSAGE_LENGTH} characters"}
+        conversation_id = str(frame.get("conversation_id"))
+        members = await self.members(conversation_id)
+        if members is None or user_id not in members:
+            return {"type": "error", "detail": "Conversation not found"}
+
+        # BSON dates keep milliseconds, so messages sent within the same one are
+        # ordered by id; ObjectIds increase monotonically on each worker.
+        now = datetime.now(timezone.utc)
+        message = {
+            "id": str(ObjectId()),
+            "conversation_id": conversation_id,
+            "sender_id": user_id,
+            "body": body,
+            "created_at": now.replace(microsecond=now.microsecond // 1000 * 1000),
+        }
+        # Encoded once for every recipient; client_id lets the sender match its echo
+        payload = fast_json.dumps({"type": "message", "client_id": frame.get("client_id"), "message": message})
+        await self.buffer.add(self.db, dict(message))
+        await self.broker.publish({"members": members, "payload": payload.decode()})
+        return None
+
+    def stats(self) -> dict:
+        return {
+            "connections": self.registry.connections,
+            "users_online": len(self.registry.by_user),
+            "delivered": self.registry.delivered,
+            "dropped_slow_clients": self.registry.dropped,
+            "pending_writes": len(self.buffer.pending),
+            "persisted": self.buffer.flushed,
+            "write_batches": self.buffer.batches,
+            "retried_writes": self.buffer.retried,
+            "failed_writes": self.buffer.failed,
+            "broker": type(self.broker).__name__ if self.broker else None,
+        }
@@ -0,0 +1,57 @@
+import asyncio
+import os
+import sys
+from motor.motor_asyncio import AsyncIOMotorClient
+from dotenv import load_dotenv
+from pathlib import Path
+from server import QUERY_SHAPES, ensure_indexes
+
+ROOT_DIR = Path(__file__).parent
+load_dotenv(ROOT_DIR / '.env')
+
+mongo_url = os.environ['MONGO_URL']
+db_name = os.environ['DB_NAME']
+
+def find_stages(plan: dict):
+    # Walk the winning plan tree and yield every stage name
+    yield plan.get("stage")
+    for child_key in ("inputStage", "queryPlan"):
+        if child_key in plan:
+            yield from find_stages(plan[child_key])
+    for child in plan.get("inputStages", []):
+        yield from find_stages(child)
+
+async def check_indexes(apply: bool = False) -> int:
+    client = AsyncIOMotorClient(mongo_url)
+    db = client[db_name]
+    
+    if apply:
+        await ensure_indexes(db)
+        print("✓ Applied index registry")
+    
+    failures = 0
+    for name, collection, query, sort in QUERY_SHAPES:
+        cursor = db[collection].find(query)
+        if sort:
+            cursor = cursor.sort(sort)
+        explain = await cursor.explain()
+        winning_plan = explain["queryPlanner"]["winningPlan"]
+        stages = [stage for stage in find_stages(winning_plan) if stage]
+        if "COLLSCAN" in stages:
+            failures += 1
+            print(f"✗ {name}: {collection} {query} falls back to COLLSCAN")
+        else:
+            print(f"✓ {name}: {' <- '.join(stages)}")
+    
+    client.close()
+    
+    if failures:
+        print(f"\n❌ {failures} of {len(QUERY_SHAPES)} query shapes are not index-backed")
+    else:
+        print(f"\n✨ All {len(QUERY_SHAPES)} query shapes use an index")
+    return failures
+
+if __name__ == "__main__":
+    # Usage: python check_indexes.py [--apply]
+    failed = asyncio.run(check_indexes(apply="--apply" in sys.argv))
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,66 @@
+"""Streaming CSV/NDJSON encoders behind /api/admin/export/{kind}.
+
+Rows are pulled from a Motor cursor in server-side batches of
+``EXPORT_BATCH_SIZE`` and written out as they arrive, so a worker holds at
+most one batch and one encoded chunk at a time however large the export is.
+CSV cells use the same conventions bulk_import.py reads (lists joined with
+``;``, text that a spreadsheet would run as a formula prefixed with ``'``),
+so an export can be edited and imported back.
+"""
+import csv
+import io
+from datetime import datetime
+from typing import AsyncIterable, AsyncIterator, List
+
+import fast_json
+from bulk_import import FORMULA_PREFIXES, LIST_SEPARATOR
+
+FORMATS = ("csv", "ndjson")
+MEDIA_TYPES = {"csv": "text/csv; charset=utf-8", "ndjson": "application/x-ndjson"}
+EXPORT_BATCH_SIZE = 1000
+
+def _cell(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, list):
+        value = LIST_SEPARATOR.join(map(str, value))
+    elif not isinstance(value, str):
+        return str(value)
+    # e.g. a donor_name of "=HYPERLINK(...)" from the public donation form
+    return "'" + value if value.startswith(FORMULA_PREFIXES) else value
+
+async def encode(docs: AsyncIterable[dict], fields: List[str], fmt: str) -> AsyncIterator[bytes]:
+    """Yield the export as chunks of up to EXPORT_BATCH_SIZE encoded rows."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    rows: List[bytes] = []
+    if fmt == "csv":
+        writer.writerow(fields)
+
+    def flush() -> bytes:
+        if fmt == "csv":
+            chunk = buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+            return chunk
+        chunk = b"".join(rows)
+        rows.clear()
+        return chunk
+
+    pending = 0
+    async for doc in docs:
+        if fmt == "csv":
+            writer.writerow([_cell(doc.get(field)) for field in fields])
+        else:
+            rows.append(fast_json.dumps({field: doc.get(field) for field in fields}) + b"\n")
+        pending += 1
+        if pending >= EXPORT_BATCH_SIZE:
+            yield flush()
+            pending = 0
+    chunk = flush()
+    if chunk:
+        yield chunk
@@ -0,0 +1,44 @@
+"""Sparse fieldsets for list routes: ``?fields=id,title,created_at``.
+
+``view(model, fields, summary)`` returns a model trimmed to the requested
+fields (``id`` is always kept) and the list routes page with it, so the
+fields become the MongoDB projection through ``fast_json.projection`` and
+the response is validated and serialized through the trimmed model. Without
+``fields`` a route serves ``summary``, a declared model leaving out the heavy
+fields its list view does not need and documented as its response model, or
+the full model if it has none; ``fields=*`` asks for every field.
+"""
+from functools import lru_cache
+from typing import Optional, Type
+
+from pydantic import BaseModel, ConfigDict, create_model
+
+ALL = "*"
+
+class UnknownFields(ValueError):
+    pass
+
+@lru_cache(maxsize=256)
+def _trimmed(model: Type[BaseModel], names: frozenset) -> Type[BaseModel]:
+    fields = {name: (info.annotation, info) for name, info in model.model_fields.items() if name in names}
+    return create_model(f"{model.__name__}Fields", __config__=ConfigDict(extra="ignore"), **fields)
+
+def view(
+    model: Type[BaseModel],
+    fields: Optional[str] = None,
+    summary: Optional[Type[BaseModel]] = None,
+) -> Type[BaseModel]:
+    if fields is None:
+        return summary or model
+    if fields.strip() == ALL:
+        return model
+    names = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = names - set(model.model_fields)
+    if unknown:
+        raise UnknownFields(
+            f"Unknown fields: {', '.join(sorted(unknown))}. Available: {', '.join(model.model_fields)}"
+        )
+    names.add("id")
+    if names >= set(model.model_fields):
+        return model
+    return _trimmed(model, frozenset(names))
@@ -0,0 +1,117 @@
+"""Hot-thread ranking for /api/forums/posts?sort=hot.
+
+A thread's heat is the sum of ``2 ** ((t - EPOCH) / half_life)`` over its
+activity (the post itself and every reply). Decay multiplies every thread's
+heat by the same factor, so the order never changes just because time
+passes and stored scores never need re-decaying. ``hot_score`` keeps the
+logarithm of that sum, which stays a small float for any realistic date.
+
+Creating a post sets its score; a reply only marks the post ``hot_dirty``.
+``HotRanker.run_once`` folds the replies each dirty post received since its
+``hot_scored_at`` into its score, so the job's cost follows activity, not
+the number of threads. ``hot_replies`` counts the replies folded in so far.
+A reply timestamped before the watermark but written after a pass is not
+found by that query, so when the folded count falls short of
+``replies_count`` the post is rescored from all its replies and stays dirty
+until the two agree. If they still disagree after ``max_mismatches`` passes,
+``replies_count`` itself has drifted and is set to the replies counted.
+``score_unscored`` gives posts from before hot ranking a score; it runs at
+startup so paging by ``hot_score`` never meets a null.
+"""
+import math
+from datetime import datetime, timezone
+from typing import Optional
+
+from pymongo import UpdateOne
+
+EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+def activity_score(at: datetime, half_life_hours: float) -> float:
+    return (at - EPOCH).total_seconds() / 3600 / half_life_hours * math.log(2)
+
+def combine(a: Optional[float], b: float) -> float:
+    # log(exp(a) + exp(b)) without overflow
+    if a is None:
+        return b
+    high, low = max(a, b), min(a, b)
+    return high + math.log1p(math.exp(low - high))
+
+class HotRanker:
+    def __init__(self, half_life_hours: float = 24.0, batch_size: int = 500, max_mismatches: int = 3):
+        self.half_life_hours = half_life_hours
+        self.batch_size = batch_size
+        self.max_mismatches = max_mismatches
+        self.runs = 0
+        self.rescored = 0
+
+    def initial(self, created_at: datetime) -> dict:
+        return {"hot_score": activity_score(created_at, self.half_life_hours), "hot_scored_at": created_at,
+                "hot_replies": 0}
+
+    async def score_unscored(self, db) -> int:
+        # Posts that predate hot ranking are scored from scratch once
+        scored = 0
+        unscored = db.forum_posts.find({"hot_score": None}, {"_id": 0, "id": 1, "created_at": 1})
+        while batch := await unscored.to_list(self.batch_size):
+            await db.forum_posts.bulk_write([
+                UpdateOne({"id": post["id"], "hot_score": None},
+                          {"$set": {**self.initial(post["created_at"]), "hot_dirty": True}})
+                for post in batch
+            ], ordered=False)
+            scored += len(batch)
+        return scored
+
+    async def run_once(self, db) -> int:
+        rescored = 0
+        await self.score_unscored(db)
+
+        fields = {"_id": 0, "id": 1, "created_at": 1, "hot_score": 1, "hot_scored_at": 1, "hot_replies": 1,
+                  "hot_mismatches": 1, "replies_count": 1}
+        async for post in db.forum_posts.find({"hot_dirty": True}, fields).batch_size(self.batch_size):
+            replies_count = post.get("replies_count") or 0
+            from_scratch = post.get("hot_replies") is None  # scored before replies were counted
+            score, scored_at, folded = await self._fold(db, post, from_scratch)
+            if folded < replies_count and not from_scratch:
+                # A reply is still being written, or one landed behind the watermark
+                # after an earlier pass; the count tells, timestamps cannot
+                score, scored_at, folded = await self._fold(db, post, True)
+            await db.forum_posts.update_one(
+                {"id": post["id"]},
+                {"$set": {"hot_score": score, "hot_scored_at": scored_at, "hot_replies": folded}},
+            )
+            if folded == replies_count:
+                # Stays dirty if a reply arrived meanwhile; the next run folds it in
+                await db.forum_posts.update_one(
+                    {"id": post["id"], "replies_count": post.get("replies_count")},
+                    {"$unset": {"hot_dirty": "", "hot_mismatches": ""}},
+                )
+            elif (post.get("hot_mismatches") or 0) + 1 < self.max_mismatches:
+                await db.forum_posts.update_one({"id": post["id"]}, {"$inc": {"hot_mismatches": 1}})
+            else:
+                # Still off after several passes, so no reply is in flight: replies_count
+                # drifted (a lost or doubled $inc). Adopt the replies actually stored.
+                await db.forum_posts.update_one(
+                    {"id": post["id"], "replies_count": post.get("replies_count")},
+                    {"$set": {"replies_count": folded}, "$unset": {"hot_dirty": "", "hot_mismatches": ""}},
+                )
+            rescored += 1
+        self.runs += 1
+        self.rescored += rescored
+        return rescored
+
+    async def _fold(self, db, post: dict, from_scratch: bool) -> tuple:
+        if from_scratch:
+            scored_at, folded = post["created_at"], 0
+            score = activity_score(scored_at, self.half_life_hours)
+            query = {"post_id": post["id"]}
+        else:
+            score, scored_at, folded = post["hot_score"], post["hot_scored_at"], post["hot_replies"]
+            query = {"post_id": post["id"], "created_at": {"$gt": scored_at}}
+        async for reply in db.forum_replies.find(query, {"_id": 0, "created_at": 1}):
+            score = combine(score, activity_score(reply["created_at"], self.half_life_hours))
+            scored_at = max(scored_at, reply["created_at"])
+            folded += 1
+        return score, scored_at, folded
+
+    def stats(self) -> dict:
+        return {"half_life_hours": self.half_life_hours, "runs": self.runs, "rescored": self.rescored}
@@ -0,0 +1,53 @@
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from motor.motor_asyncio import AsyncIOMotorClient
+from dotenv import load_dotenv
+from pathlib import Path
+from bulk_import import FORMATS, import_rows
+from server import IMPORTS, ensure_indexes
+
+ROOT_DIR = Path(__file__).parent
+load_dotenv(ROOT_DIR / '.env')
+
+mongo_url = os.environ['MONGO_URL']
+db_name = os.environ['DB_NAME']
+
+CHUNK_SIZE = 1024 * 1024
+
+async def read_chunks(path: str):
+    # Same chunked shape as an HTTP upload, so the file is never fully loaded
+    with open(path, "rb") as handle:
+        while chunk := handle.read(CHUNK_SIZE):
+            yield chunk
+
+async def import_file(kind: str, path: str, fmt: str, batch_size: int) -> int:
+    client = AsyncIOMotorClient(mongo_url, tz_aware=True)
+    db = client[db_name]
+    await ensure_indexes(db)
+
+    started = time.perf_counter()
+    report = await import_rows(db, IMPORTS[kind], read_chunks(path), fmt, batch_size)
+    elapsed = time.perf_counter() - started
+    client.close()
+
+    for error in report["errors"]:
+        print(f"✗ line {error['line']}: {error['error']}", file=sys.stderr)
+    print(json.dumps({key: value for key, value in report.items() if key != "errors"}))
+    print(f"✓ {report['rows']} rows in {elapsed:.1f}s ({report['rows'] / max(elapsed, 1e-9):,.0f} rows/s): "
+          f"{report['inserted']} inserted, {report['updated']} updated, {report['failed']} failed")
+    return 1 if report["failed"] else 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk import schools or alumni from CSV/NDJSON")
+    parser.add_argument("kind", choices=sorted(IMPORTS))
+    parser.add_argument("path")
+    parser.add_argument("--format", dest="fmt", choices=FORMATS,
+                        help="defaults to ndjson for .ndjson/.jsonl files, otherwise csv")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+    fmt = args.fmt or ("ndjson" if args.path.endswith((".ndjson", ".jsonl")) else "csv")
+    sys.exit(asyncio.run(import_file(args.kind, args.path, fmt, args.batch_size)))
@@ -0,0 +1,199 @@
+"""Content-addressed gallery images behind /api/media.
+
+An upload is streamed to disk while it is hashed and stored once under its
+SHA-256 digest, so the same photo uploaded to several galleries takes the
+space of one. Resized JPEG and WebP renditions are produced in a process
+pool, off the event loop, and written next to the original together with a
+``meta.json`` describing them; a digest that already has one is not
+processed again. Renditions are re-encoded without EXIF, so camera location
+data in the original never leaves the server.
+
+A rendition's URL names its content, so ``serve`` marks it immutable and
+answers conditional and single-range requests from the file.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import re
+import shutil
+import struct
+import tempfile
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Optional
+
+from starlette.requests import Request
+from starlette.responses import Response, StreamingResponse
+
+WIDTHS = (160, 480, 1280, 2048)
+FORMATS = {"jpg": ("JPEG", "image/jpeg", {"quality": 82, "optimize": True, "progressive": True}),
+           "webp": ("WEBP", "image/webp", {"quality": 78, "method": 4})}
+MAX_PIXELS = 50_000_000  # refuse decompression bombs before decoding
+# what Pillow's decoders raise on malformed input besides OSError
+DECODE_ERRORS = (OSError, ValueError, SyntaxError, EOFError, IndexError, struct.error)
+CHUNK_SIZE = 64 * 1024
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+DIGEST_RE = re.compile(r"^[0-9a-f]{64}$")
+RENDITION_RE = re.compile(r"^(\d+)\.(jpg|webp)$")
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+class InvalidImage(ValueError):
+    pass
+
+def _derive(original: str, directory: str) -> dict:
+    # Runs in a worker process: decode once, then resize per width and encode per format
+    from PIL import Image, ImageOps
+
+    # Pillow only raises above twice MAX_IMAGE_PIXELS and warns below that, so
+    # the header's dimensions are checked before anything is decoded
+    Image.MAX_IMAGE_PIXELS = MAX_PIXELS
+    try:
+        with Image.open(original) as image:
+            if image.size[0] * image.size[1] > MAX_PIXELS:
+                raise Image.DecompressionBombError()
+            image = ImageOps.exif_transpose(image)
+            image = image.convert("RGB")
+    except Image.DecompressionBombError:
+        raise InvalidImage(f"image has more than {MAX_PIXELS} pixels") from None
+    except DECODE_ERRORS:
+        raise InvalidImage("not a readable image") from None
+
+    width, height = image.size
+    variants = []
+    # never upscale; the largest rendition is at most the original width
+    for target in sorted({min(w, width) for w in WIDTHS}):
+        resized = image if target == width else image.resize(
+            (target, max(1, round(height * target / width))), Image.LANCZOS)
+        for extension, (fmt, _, options) in FORMATS.items():
+            name = f"{target}.{extension}"
+            path = os.path.join(directory, name)
+            resized.save(path, fmt, **options)
+            variants.append({"name": name, "width": resized.width, "height": resized.height,
+                             "format": extension, "bytes": os.path.getsize(path)})
+    return {"width": width, "height": height, "variants": variants}
+
+class MediaStore:
+    def __init__(self, root: str, max_upload_bytes: int = 15 * 1024 * 1024, workers: Optional[int] = None):
+        self.root = Path(root)
+        self.max_upload_bytes = max_upload_bytes
+        self.workers = workers
+        self.pool: Optional[ProcessPoolExecutor] = None
+        self.stored = 0
+        self.deduplicated = 0
+        self.derived = 0
+
+    def start(self) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.pool = ProcessPoolExecutor(self.workers)
+
+    def stop(self) -> None:
+        if self.pool:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+            self.pool = None
+
+    def directory(self, digest: str) -> Path:
+        return self.root / digest[:2] / digest
+
+    def _store(self, source) -> str:
+        # Hash while copying to a temp file, then move it under its digest
+        self.root.mkdir(parents=True, exist_ok=True)
+        digest = hashlib.sha256()
+        size = 0
+        with tempfile.NamedTemporaryFile(dir=self.root, delete=False) as temp:
+            try:
+                while chunk := source.read(CHUNK_SIZE):
+                    size += len(chunk)
+                    if size > self.max_upload_bytes:
+                        raise InvalidImage(f"file is larger than {self.max_upload_bytes} bytes")
+                    digest.update(chunk)
+                    temp.write(chunk)
+            except BaseException:
+                os.unlink(temp.name)
+                raise
+        directory = self.directory(digest.hexdigest())
+        if (directory / "original").exists():
+            os.unlink(temp.name)
+            self.deduplicated += 1
+        else:
+            directory.mkdir(parents=True, exist_ok=True)
+            os.replace(temp.name, directory / "original")
+            self.stored += 1
+        return digest.hexdigest()
+
+    async def ingest(self, source) -> dict:
+        """Store a binary file object and return its metadata, deriving renditions once."""
+        digest = await asyncio.to_thread(self._store, source)
+        directory = self.directory(digest)
+        meta_path = directory / "meta.json"
+        if meta_path.exists():
+            meta = json.loads(await asyncio.to_thread(meta_path.read_text))
+        else:
+            loop = asyncio.get_running_loop()
+            try:
+                meta = await loop.run_in_executor(self.pool, _derive, str(directory / "original"), str(directory))
+            except InvalidImage:
+                await asyncio.to_thread(shutil.rmtree, directory, True)
+                raise
+            self.derived += 1
+            # written last and atomically, so its presence means every rendition exists
+            temp = directory / f"meta.{uuid.uuid4().hex}.tmp"
+            temp.write_text(json.dumps(meta))
+            os.replace(temp, meta_path)
+        return {"hash": digest, **meta}
+
+    def path(self, digest: str, name: str) -> Optional[Path]:
+        if not DIGEST_RE.match(digest) or not RENDITION_RE.match(name):
+            return None
+        path = self.directory(digest) / name
+        return path if path.is_file() else None
+
+    async def serve(self, request: Request, digest: str, name: str) -> Response:
+        path = self.path(digest, name)
+        if path is None:
+            return Response(status_code=404)
+        etag = f'"{digest[:16]}-{name}"'
+        media_type = FORMATS[RENDITION_RE.match(name).group(2)][1]
+        headers = {"ETag": etag, "Cache-Control": IMMUTABLE, "Accept-Ranges": "bytes"}
+        if etag in request.headers.get("if-none-match", ""):
+            return Response(status_code=304, headers=headers)
+
+        size = path.stat().st_size
+        start, end = 0, size - 1
+        requested = request.headers.get("range")
+        if_range = request.headers.get("if-range")
+        if requested and (if_range is None or if_range == etag):
+            match = RANGE_RE.match(requested.strip())
+            # multiple ranges are answered with the whole file, which the spec allows
+            if match and match.group(1) + match.group(2):
+                first, last = match.groups()
+                if first:
+                    start, end = int(first), min(int(last), size - 1) if last else size - 1
+                else:
+                    start = max(0, size - int(last))
+                if start >= size or start > end:
+                    return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{size}"})
+                headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+        headers["Content-Length"] = str(end - start + 1)
+        return StreamingResponse(
+            self._read(path, start, end - start + 1),
+            status_code=206 if "Content-Range" in headers else 200,
+            media_type=media_type,
+            headers=headers,
+        )
+
+    @staticmethod
+    async def _read(path: Path, offset: int, length: int):
+        with open(path, "rb") as handle:
+            handle.seek(offset)
+            while length > 0:
+                chunk = await asyncio.to_thread(handle.read, min(CHUNK_SIZE, length))
+                if not chunk:
+                    break
+                length -= len(chunk)
+                yield chunk
+
+    def stats(self) -> dict:
+        return {"stored": self.stored, "deduplicated": self.deduplicated, "derived": self.derived}
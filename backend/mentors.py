@@ -0,0 +1,200 @@
+"""In-memory mentor matching behind /api/mentors.
+
+Every alumni profile with ``willing_to_mentor`` occupies one row of a set of
+parallel NumPy arrays: school and mandal codes, batch year and a small
+matrix of token codes from profession and company (one column per token
+slot, so interest matching gathers contiguous arrays). A request scores every
+row at once (same school, same mandal, interest overlap, seniority) and
+picks the top k with ``argpartition``, so no query touches MongoDB.
+
+Rows are updated in place when a profile is written on this worker and are
+tombstoned when a profile stops mentoring; ``rebuild`` compacts them.
+``refresh`` picks up profiles created or changed on other workers by
+``updated_at``, which every alumni write stamps.
+"""
+import bisect
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, List, Optional
+
+import numpy as np
+
+from search import tokenize
+
+SAME_SCHOOL = 3.0
+SAME_MANDAL = 1.5
+PER_INTEREST = 2.0
+SENIORITY = 1.0
+SENIORITY_YEARS = 15  # seniority credit saturates at this many years ahead
+MAX_TOKENS = 8  # profession + company tokens kept per mentor
+MAX_INTERESTS = 32  # one bit each in the interest mask
+# refresh re-reads this far behind the watermark, for writes stamped before
+# an earlier refresh but committed after it; re-applying a profile is a no-op
+REFRESH_OVERLAP = timedelta(seconds=5)
+
+class MentorIndex:
+    def __init__(self, capacity: int = 1024):
+        self.size = 0
+        self.rows = {}  # alumni id -> row
+        self.user_rows = defaultdict(set)  # user id -> rows, to leave out the requester
+        self.docs: List[Optional[dict]] = []  # row -> response metadata
+        self.school_codes = {}
+        self.mandal_codes = {}
+        self.term_codes = {}
+        self.terms: List[str] = []  # sorted vocabulary, for interest prefixes
+        self.school_mandals = {}  # school id -> mandal id
+        self.watermark: Optional[datetime] = None  # newest updated_at seen
+        self.width = 0  # token columns in use
+        self._allocate(capacity)
+
+    def _allocate(self, capacity: int) -> None:
+        self.school = np.full(capacity, -1, dtype=np.int32)
+        self.mandal = np.full(capacity, -1, dtype=np.int32)
+        self.batch = np.zeros(capacity, dtype=np.int32)
+        self.tokens = np.full((MAX_TOKENS, capacity), -1, dtype=np.int32)  # column per token slot
+        self.active = np.zeros(capacity, dtype=bool)
+
+    def _grow(self) -> None:
+        old = (self.school, self.mandal, self.batch, self.tokens, self.active)
+        self._allocate(len(self.school) * 2)
+        for new, previous in zip((self.school, self.mandal, self.batch, self.tokens, self.active), old):
+            new[..., :previous.shape[-1]] = previous
+
+    def __len__(self) -> int:
+        return int(self.active[:self.size].sum())
+
+    @staticmethod
+    def _code(codes: dict, value: Optional[str]) -> int:
+        if value is None:
+            return -1
+        return codes.setdefault(value, len(codes))
+
+    def _term(self, term: str) -> int:
+        if term not in self.term_codes:
+            self.term_codes[term] = len(self.term_codes)
+            bisect.insort(self.terms, term)
+        return self.term_codes[term]
+
+    def upsert(self, doc: dict) -> None:
+        # legacy profiles written before updated_at fall back to created_at
+        stamp = doc.get("updated_at") or doc.get("created_at")
+        if stamp is not None and (self.watermark is None or stamp > self.watermark):
+            self.watermark = stamp
+        row = self.rows.get(doc["id"])
+        if not doc.get("willing_to_mentor"):
+            if row is not None:
+                self.active[row] = False
+                self.user_rows[self.docs[row]["user_id"]].discard(row)
+                self.docs[row] = None
+                del self.rows[doc["id"]]
+            return
+        if row is None:
+            if self.size == len(self.school):
+                self._grow()
+            row = self.size
+            self.size += 1
+            self.rows[doc["id"]] = row
+            self.docs.append(None)
+        else:
+            self.user_rows[self.docs[row]["user_id"]].discard(row)
+
+        school_id = doc["school_id"]
+        mandal_id = doc.get("mandal_id") or self.school_mandals.get(school_id)
+        terms = list(dict.fromkeys(tokenize(doc.get("current_profession")) + tokenize(doc.get("company"))))
+        self.school[row] = self._code(self.school_codes, school_id)
+        self.mandal[row] = self._code(self.mandal_codes, mandal_id)
+        self.batch[row] = doc["batch_year"]
+        terms = terms[:MAX_TOKENS]
+        self.tokens[:, row] = -1
+        self.tokens[:len(terms), row] = [self._term(term) for term in terms]
+        self.width = max(self.width, len(terms))
+        self.active[row] = True
+        self.user_rows[doc.get("user_id")].add(row)
+        self.docs[row] = {
+            "alumni_id": doc["id"],
+            "user_id": doc.get("user_id"),
+            "school_id": school_id,
+            "mandal_id": mandal_id,
+            "batch_year": doc["batch_year"],
+            "current_profession": doc.get("current_profession"),
+            "company": doc.get("company"),
+        }
+
+    def _interest_masks(self, interests: Iterable[str]) -> Optional[np.ndarray]:
+        # term code -> bit per interest token it satisfies (itself or by prefix);
+        # the spare last slot stays 0 so padding (-1) never matches
+        table = np.zeros(len(self.term_codes) + 1, dtype=np.uint32)
+        tokens = list(dict.fromkeys(t for interest in interests for t in tokenize(interest)))
+        for bit, token in enumerate(tokens[:MAX_INTERESTS]):
+            start = bisect.bisect_left(self.terms, token)
+            for term in self.terms[start:]:
+                if not term.startswith(token):
+                    break
+                table[self.term_codes[term]] |= np.uint32(1 << bit)
+        return table if table.any() else None
+
+    def match(
+        self,
+        school_id: Optional[str] = None,
+        mandal_id: Optional[str] = None,
+        interests: Iterable[str] = (),
+        batch_year: Optional[int] = None,
+        exclude_user_id: Optional[str] = None,
+        limit: int = 10,
+    ) -> List[dict]:
+        n = self.size
+        if n == 0:
+            return []
+        if mandal_id is None and school_id:
+            mandal_id = self.school_mandals.get(school_id)
+
+        scores = np.zeros(n, dtype=np.float32)
+        if school_id in self.school_codes:
+            scores += SAME_SCHOOL * (self.school[:n] == self.school_codes[school_id])
+        if mandal_id in self.mandal_codes:
+            scores += SAME_MANDAL * (self.mandal[:n] == self.mandal_codes[mandal_id])
+        table = self._interest_masks(interests)
+        if table is not None:
+            # one gather per token column for all interests, then count the distinct
+            # interests each mentor covers
+            matched = np.zeros(n, dtype=np.uint32)
+            for column in self.tokens[:self.width, :n]:
+                matched |= table[column]
+            scores += PER_INTEREST * np.bitwise_count(matched)
+        reference_year = batch_year or datetime.now(timezone.utc).year
+        scores += SENIORITY * np.clip((reference_year - self.batch[:n]) / SENIORITY_YEARS, 0, 1)
+
+        scores[~self.active[:n]] = -np.inf
+        excluded = self.user_rows.get(exclude_user_id)
+        if excluded:
+            scores[list(excluded)] = -np.inf
+        k = min(limit, n)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [{**self.docs[row], "score": round(float(scores[row]), 3)} for row in top if np.isfinite(scores[row])]
+
+    async def rebuild(self, db) -> int:
+        self.__init__()
+        async for school in db.schools.find({}, {"_id": 0, "id": 1, "mandal_id": 1}):
+            self.school_mandals[school["id"]] = school.get("mandal_id")
+        return await self._load(db, {"willing_to_mentor": True})
+
+    async def refresh(self, db) -> int:
+        # Past the watermark every changed profile is read, so the ones that
+        # stopped mentoring are dropped too
+        if self.watermark is None:
+            return await self._load(db, {"willing_to_mentor": True})
+        return await self._load(db, {"updated_at": {"$gt": self.watermark - REFRESH_OVERLAP}})
+
+    async def _load(self, db, query: dict) -> int:
+        projection = {"_id": 0, "id": 1, "user_id": 1, "school_id": 1, "mandal_id": 1, "batch_year": 1,
+                      "current_profession": 1, "company": 1, "willing_to_mentor": 1, "created_at": 1,
+                      "updated_at": 1}
+        loaded = 0
+        async for doc in db.alumni.find(query, projection).batch_size(1000):
+            if doc["school_id"] not in self.school_mandals:
+                school = await db.schools.find_one({"id": doc["school_id"]}, {"_id": 0, "mandal_id": 1})
+                self.school_mandals[doc["school_id"]] = school.get("mandal_id") if school else None
+            self.upsert(doc)
+            loaded += 1
+        return loaded
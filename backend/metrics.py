@@ -0,0 +1,304 @@
+"""Prometheus metrics behind /api/metrics.
+
+``MetricsMiddleware`` times every HTTP request into a histogram labelled by
+method and route template and tracks requests in flight. ``CommandMetrics``
+is a pymongo command listener recording per-collection, per-command timings
+and logging commands slower than ``slow_ms`` with the shape of their filter
+(values replaced by ``?``) and the registered index it would likely use.
+That last part is a heuristic over the index registry, not an ``explain``:
+it names the index whose leading keys the filter covers furthest, or the one
+the sort follows when there is no filter. ``PoolMetrics`` follows the Motor
+connection pool through pymongo's pool listener.
+
+Everything is kept in plain dicts and rendered in the text exposition format
+on scrape; ``registry.enabled`` switches recording off at runtime, leaving
+only a flag check on the hot paths.
+"""
+import bisect
+import logging
+import threading
+import time
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from pymongo import monitoring
+
+logger = logging.getLogger(__name__)
+
+HTTP_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DB_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+
+# where each command keeps its filter
+FILTER_FIELDS = {"find": "filter", "count": "query", "findAndModify": "query", "distinct": "query"}
+WRITE_FIELDS = {"update": ("updates", "q"), "delete": ("deletes", "q")}
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, label_names: Tuple[str, ...], buckets: Tuple[float, ...]):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        self.series: Dict[tuple, list] = {}  # labels -> [bucket counts..., count, sum]
+
+    def observe(self, labels: tuple, value: float) -> None:
+        series = self.series.get(labels)
+        if series is None:
+            series = self.series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect.bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help_text}"
+        yield f"# TYPE {self.name} histogram"
+        for labels, series in self.series.items():
+            base = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(self.label_names, labels))
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                yield f'{self.name}_bucket{{{base},le="{bound}"}} {cumulative}'
+            count = cumulative + series[len(self.buckets)]
+            yield f'{self.name}_bucket{{{base},le="+Inf"}} {count}'
+            yield f"{self.name}_count{{{base}}} {count}"
+            yield f"{self.name}_sum{{{base}}} {series[-1]:.6f}"
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, label_names: Tuple[str, ...]):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.values: Dict[tuple, float] = defaultdict(float)
+
+    def inc(self, labels: tuple, value: float = 1) -> None:
+        self.values[labels] += value
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help_text}"
+        yield f"# TYPE {self.name} {self.kind}"
+        for labels, value in self.values.items():
+            base = ",".join(f'{name}="{_escape(v)}"' for name, v in zip(self.label_names, labels))
+            yield f"{self.name}{{{base}}} {value:g}" if base else f"{self.name} {value:g}"
+
+class Gauge(Counter):
+    kind = "gauge"
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+class MetricsRegistry:
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.http_duration = Histogram("http_request_duration_seconds", "HTTP request latency by route.",
+                                       ("method", "route"), HTTP_BUCKETS)
+        self.http_responses = Counter("http_responses_total", "HTTP responses by route and status.",
+                                      ("method", "route", "status"))
+        self.http_in_flight = Gauge("http_requests_in_flight", "HTTP requests being handled.", ())
+        self.db_duration = Histogram("mongodb_command_duration_seconds", "MongoDB command latency.",
+                                     ("collection", "command"), DB_BUCKETS)
+        self.db_failures = Counter("mongodb_command_failures_total", "Failed MongoDB commands.",
+                                   ("collection", "command"))
+        self.db_slow = Counter("mongodb_slow_commands_total", "MongoDB commands over the slow threshold.",
+                               ("collection", "command", "indexed"))
+        self.pool = Gauge("mongodb_pool_connections", "Connection pool state by address.", ("address", "state"))
+        self.pool_events = Counter("mongodb_pool_events_total", "Connection pool events by address.",
+                                   ("address", "event"))
+        # callables returning extra families built from other components' stats on scrape
+        self.collectors: List[Callable[[], Iterable]] = []
+        # pymongo listeners run on Motor's worker threads; requests on the event loop
+        self.lock = threading.Lock()
+
+    def render(self) -> str:
+        with self.lock:
+            return self._render()
+
+    def _render(self) -> str:
+        families = (self.http_duration, self.http_responses, self.http_in_flight, self.db_duration,
+                    self.db_failures, self.db_slow, self.pool, self.pool_events)
+        families += tuple(family for collect in self.collectors for family in collect())
+        lines = [line for family in families for line in family.render()]
+        lines.append("# HELP metrics_enabled Whether request and command metrics are being recorded.")
+        lines.append("# TYPE metrics_enabled gauge")
+        lines.append(f"metrics_enabled {int(self.enabled)}")
+        return "\n".join(lines) + "\n"
+
+class MetricsMiddleware:
+    """Pure ASGI, so streaming responses are timed to their last byte."""
+
+    def __init__(self, app, registry: MetricsRegistry):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope, receive, send):
+        registry = self.registry
+        if scope["type"] != "http" or not registry.enabled:
+            await self.app(scope, receive, send)
+            return
+        status = 500
+        registry.http_in_flight.inc((), 1)
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            registry.http_in_flight.inc((), -1)
+            # The router writes the matched route into the shared scope; label by
+            # its template so ids in paths do not explode the series count
+            route = scope.get("route")
+            labels = (scope["method"], route.path if route is not None else "unmatched")
+            registry.http_duration.observe(labels, time.perf_counter() - started)
+            registry.http_responses.inc(labels + (status,))
+
+def filter_shape(value):
+    if isinstance(value, dict):
+        return {key: filter_shape(item) for key, item in value.items()}
+    if isinstance(value, list) and value and isinstance(value[0], dict):
+        return [filter_shape(item) for item in value]
+    return "?"
+
+def filter_fields(query: dict) -> List[str]:
+    fields = []
+    for key, value in query.items():
+        if key in ("$and", "$or", "$nor") and isinstance(value, list):
+            for clause in value:
+                if isinstance(clause, dict):
+                    fields.extend(filter_fields(clause))
+        elif not key.startswith("$"):
+            fields.append(key)
+    return fields
+
+class CommandMetrics(monitoring.CommandListener):
+    def __init__(self, registry: MetricsRegistry, slow_ms: float = 100.0,
+                 indexes: Optional[Dict[str, List[Tuple[str, List[str]]]]] = None):
+        self.registry = registry
+        self.slow_ms = slow_ms
+        self.indexes = indexes or {}  # collection -> [(index name, key fields)]
+        self.pending: Dict[tuple, tuple] = {}
+
+    def started(self, event) -> None:
+        if not self.registry.enabled:
+            return
+        command = event.command
+        name = event.command_name
+        collection = command.get("collection") if name == "getMore" else command.get(name)
+        if not isinstance(collection, str):
+            collection = "-"  # admin commands: ping, hello, endSessions...
+        # keep a reference only; the shape is worked out for slow commands alone
+        self.pending[(event.connection_id, event.request_id)] = (collection, command)
+
+    def succeeded(self, event) -> None:
+        entry = self.pending.pop((event.connection_id, event.request_id), None)
+        if entry is None:
+            return
+        collection, command = entry
+        seconds = event.duration_micros / 1_000_000
+        with self.registry.lock:
+            self.registry.db_duration.observe((collection, event.command_name), seconds)
+        if seconds * 1000 >= self.slow_ms:
+            self.report_slow(collection, event.command_name, command, seconds)
+
+    def failed(self, event) -> None:
+        entry = self.pending.pop((event.connection_id, event.request_id), None)
+        if entry is not None:
+            with self.registry.lock:
+                self.registry.db_failures.inc((entry[0], event.command_name))
+
+    def command_filter(self, name: str, command) -> Tuple[dict, List[str]]:
+        query = {}
+        if name in FILTER_FIELDS:
+            query = command.get(FILTER_FIELDS[name]) or {}
+        elif name in WRITE_FIELDS:
+            field, key = WRITE_FIELDS[name]
+            statements = command.get(field) or []
+            query = statements[0].get(key, {}) if statements else {}
+        elif name == "aggregate":
+            pipeline = command.get("pipeline") or []
+            if pipeline and "$match" in pipeline[0]:
+                query = pipeline[0]["$match"]
+        sort = list((command.get("sort") or {}).keys())
+        return query, sort
+
+    def likely_index(self, collection: str, fields: List[str], sort: List[str]) -> Optional[str]:
+        if "_id" in fields:
+            return "_id_"
+        # the index whose leading keys the filter covers furthest, as the planner would prefer
+        best, best_prefix = None, 0
+        for name, keys in self.indexes.get(collection, ()):
+            prefix = 0
+            while prefix < len(keys) and keys[prefix] in fields:
+                prefix += 1
+            if prefix == 0 and not fields and sort and keys[0] == sort[0]:
+                prefix = 1  # an unfiltered sort walks the index
+            if prefix > best_prefix:
+                best, best_prefix = name, prefix
+        return best
+
+    def report_slow(self, collection: str, name: str, command, seconds: float) -> None:
+        query, sort = self.command_filter(name, command)
+        index = self.likely_index(collection, filter_fields(query), sort) if name != "getMore" else "cursor"
+        with self.registry.lock:
+            self.registry.db_slow.inc((collection, name, "yes" if index else "no"))
+        logger.warning(
+            "Slow MongoDB %s on %s: %.1f ms filter=%s sort=%s index=%s",
+            name, collection, seconds * 1000, filter_shape(query), sort or None,
+            index or "none (likely collection scan)",
+        )
+
+class PoolMetrics(monitoring.ConnectionPoolListener):
+    def __init__(self, registry: MetricsRegistry):
+        self.registry = registry
+
+    def _state(self, event, state: str, delta: int) -> None:
+        with self.registry.lock:
+            self.registry.pool.inc((f"{event.address[0]}:{event.address[1]}", state), delta)
+
+    def _event(self, event, name: str) -> None:
+        with self.registry.lock:
+            self.registry.pool_events.inc((f"{event.address[0]}:{event.address[1]}", name))
+
+    # Pool state is tracked even while disabled, so the gauges stay correct
+    def connection_created(self, event):
+        self._state(event, "open", 1)
+
+    def connection_closed(self, event):
+        self._state(event, "open", -1)
+
+    def connection_checked_out(self, event):
+        self._state(event, "checked_out", 1)
+
+    def connection_checked_in(self, event):
+        self._state(event, "checked_out", -1)
+
+    def connection_check_out_failed(self, event):
+        self._event(event, "check_out_failed")
+
+    def pool_cleared(self, event):
+        self._event(event, "cleared")
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_check_out_started(self, event):
+        pass
+
+def index_registry(indexes: dict) -> Dict[str, List[Tuple[str, List[str]]]]:
+    """(name, key fields) per collection from a {collection: [IndexModel]} registry."""
+    return {
+        collection: [(model.document["name"], list(model.document["key"].keys())) for model in models]
+        for collection, models in indexes.items()
+    }
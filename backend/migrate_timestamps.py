@@ -0,0 +1,95 @@
+import argparse
+import asyncio
+import os
+from datetime import datetime, timezone
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+from dotenv import load_dotenv
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).parent
+load_dotenv(ROOT_DIR / '.env')
+
+mongo_url = os.environ['MONGO_URL']
+db_name = os.environ['DB_NAME']
+
+# Fields that older releases wrote as isoformat() strings
+TIMESTAMP_FIELDS = {
+    "users": ["created_at"],
+    "schools": ["created_at"],
+    "alumni": ["created_at"],
+    "events": ["created_at", "event_date"],
+    "donations": ["created_at"],
+    "forum_posts": ["created_at"],
+    "bulletins": ["created_at"],
+    "news": ["created_at"],
+    "galleries": ["created_at"],
+    "school_needs": ["created_at"],
+}
+
+def parse_timestamp(value: str) -> datetime:
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+async def migrate_collection(db, collection: str, fields: list, batch_size: int) -> int:
+    # Progress is checkpointed by _id in the `migrations` collection, so an
+    # interrupted run resumes where it stopped. Only string-typed values are
+    # selected, so re-running a finished migration is a no-op.
+    checkpoint_id = f"timestamps:{collection}"
+    checkpoint = await db.migrations.find_one({"_id": checkpoint_id}) or {}
+    string_filter = {"$or": [{field: {"$type": "string"}} for field in fields]}
+    migrated = 0
+    
+    while True:
+        query = string_filter
+        if checkpoint.get("last_id") is not None:
+            query = {"$and": [string_filter, {"_id": {"$gt": checkpoint["last_id"]}}]}
+        
+        projection = {field: 1 for field in fields}
+        batch = await db[collection].find(query, projection).sort("_id", 1).to_list(batch_size)
+        if not batch:
+            break
+        
+        ops = []
+        for doc in batch:
+            updates = {
+                field: parse_timestamp(doc[field])
+                for field in fields
+                if isinstance(doc.get(field), str)
+            }
+            ops.append(UpdateOne({"_id": doc["_id"]}, {"$set": updates}))
+        await db[collection].bulk_write(ops, ordered=False)
+        
+        migrated += len(ops)
+        checkpoint = {"last_id": batch[-1]["_id"]}
+        await db.migrations.update_one(
+            {"_id": checkpoint_id},
+            {"$set": {"last_id": checkpoint["last_id"], "migrated": migrated}},
+            upsert=True,
+        )
+    
+    await db.migrations.update_one(
+        {"_id": checkpoint_id},
+        {"$set": {"completed_at": datetime.now(timezone.utc)}, "$unset": {"last_id": ""}},
+        upsert=True,
+    )
+    return migrated
+
+async def migrate_timestamps(batch_size: int = 1000):
+    client = AsyncIOMotorClient(mongo_url)
+    db = client[db_name]
+    
+    print("🕒 Converting string timestamps to BSON dates...")
+    for collection, fields in TIMESTAMP_FIELDS.items():
+        migrated = await migrate_collection(db, collection, fields, batch_size)
+        print(f"✓ {collection}: {migrated} documents converted")
+    
+    print("\n✨ Timestamp migration complete!")
+    client.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert isoformat string timestamps to BSON dates")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    asyncio.run(migrate_timestamps(parser.parse_args().batch_size))
@@ -0,0 +1,170 @@
+"""Notification fan-out behind /api/notifications.
+
+Write handlers ``publish`` an event naming its audience (one school, one
+mandal, or everyone when ``broadcast`` is set explicitly; an event with none
+of these is dropped) and return immediately; the event waits on a bounded
+in-process queue. A single background worker resolves the audience with an
+index-covered scan of ``users`` and writes one notification per recipient
+with ``insert_many`` batches, then bumps each recipient's document in
+``notification_counters`` with an ``$inc`` so the unread badge is a single
+``_id`` lookup.
+
+Events still queued when the worker is stopped are drained for up to
+``drain_seconds``; anything left after that is dropped and logged.
+"""
+import asyncio
+import logging
+import uuid
+from datetime import datetime, timezone
+from typing import Optional
+
+from pymongo import UpdateOne
+
+logger = logging.getLogger(__name__)
+
+class Notifier:
+    def __init__(self, batch_size: int = 1000, max_queue: int = 1000, drain_seconds: float = 10.0):
+        self.batch_size = batch_size
+        self.drain_seconds = drain_seconds
+        self.queue: Optional[asyncio.Queue] = None
+        self.max_queue = max_queue
+        self.worker: Optional[asyncio.Task] = None
+        self.published = 0
+        self.delivered = 0
+        self.batches = 0
+        self.failed = 0
+
+    def start(self) -> None:
+        self.queue = asyncio.Queue(self.max_queue)
+        self.worker = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self.worker is None:
+            return
+        try:
+            await asyncio.wait_for(self.queue.join(), self.drain_seconds)
+        except asyncio.TimeoutError:
+            logger.warning("Dropping %d queued notification events at shutdown", self.queue.qsize())
+        self.worker.cancel()
+        self.worker = None
+
+    async def publish(
+        self,
+        db,
+        kind: str,
+        title: str,
+        ref_id: str,
+        school_id: Optional[str] = None,
+        mandal_id: Optional[str] = None,
+        actor_id: Optional[str] = None,
+        broadcast: bool = False,
+    ) -> None:
+        """Queue a notification for the members of school_id, else mandal_id, else everyone if broadcast."""
+        if not (school_id or mandal_id or broadcast):
+            return
+        event = {
+            "type": kind,
+            "title": title,
+            "ref_id": ref_id,
+            "school_id": school_id,
+            "mandal_id": mandal_id,
+            "actor_id": actor_id,
+            "broadcast": broadcast,
+            "created_at": datetime.now(timezone.utc),
+        }
+        self.published += 1
+        if self.worker is None:
+            # not started (CLI scripts, benchmarks): deliver inline
+            await self.fan_out(db, event)
+            return
+        # A full queue makes publishers wait, so fan-out cannot fall unboundedly behind
+        await self.queue.put((db, event))
+
+    async def _run(self) -> None:
+        while True:
+            db, event = await self.queue.get()
+            try:
+                await self.fan_out(db, event)
+            except Exception:
+                self.failed += 1
+                logger.exception("Notification fan-out failed for %s %s", event["type"], event["ref_id"])
+            finally:
+                self.queue.task_done()
+
+    async def fan_out(self, db, event: dict) -> int:
+        audience = {}
+        if event["school_id"]:
+            audience["school_id"] = event["school_id"]
+        elif event["mandal_id"]:
+            audience["mandal_id"] = event["mandal_id"]
+        elif not event.get("broadcast"):
+            # An empty filter would match every user; that takes an explicit broadcast
+            return 0
+
+        delivered = 0
+        batch = []
+        cursor = db.users.find(audience, {"_id": 0, "id": 1}).batch_size(self.batch_size)
+        async for user in cursor:
+            if user["id"] == event["actor_id"]:
+                continue
+            batch.append(user["id"])
+            if len(batch) >= self.batch_size:
+                delivered += await self._deliver(db, event, batch)
+                batch = []
+        if batch:
+            delivered += await self._deliver(db, event, batch)
+        return delivered
+
+    async def _deliver(self, db, event: dict, user_ids: list) -> int:
+        docs = [
+            {
+                "id": str(uuid.uuid4()),
+                "user_id": user_id,
+                "type": event["type"],
+                "title": event["title"],
+                "ref_id": event["ref_id"],
+                "school_id": event["school_id"],
+                "read": False,
+                "created_at": event["created_at"],
+            }
+            for user_id in user_ids
+        ]
+        await db.notifications.insert_many(docs, ordered=False)
+        await db.notification_counters.bulk_write(
+            [UpdateOne({"_id": user_id}, {"$inc": {"unread": 1}}, upsert=True) for user_id in user_ids],
+            ordered=False,
+        )
+        self.batches += 1
+        self.delivered += len(docs)
+        return len(docs)
+
+    async def unread_count(self, db, user_id: str) -> int:
+        doc = await db.notification_counters.find_one({"_id": user_id})
+        return max(doc["unread"], 0) if doc else 0
+
+    async def mark_read(self, db, user_id: str, notification_id: str) -> bool:
+        # Only an unread -> read flip decrements, so repeats are harmless
+        result = await db.notifications.update_one(
+            {"id": notification_id, "user_id": user_id, "read": False},
+            {"$set": {"read": True}},
+        )
+        if result.modified_count:
+            await db.notification_counters.update_one({"_id": user_id}, {"$inc": {"unread": -1}})
+        return bool(result.modified_count)
+
+    async def mark_all_read(self, db, user_id: str) -> int:
+        result = await db.notifications.update_many({"user_id": user_id, "read": False}, {"$set": {"read": True}})
+        if result.modified_count:
+            await db.notification_counters.update_one({"_id": user_id}, {"$inc": {"unread": -result.modified_count}})
+        return result.modified_count
+
+    def stats(self) -> dict:
+        return {
+            "queued": self.queue.qsize() if self.queue else 0,
+            "max_queue": self.max_queue,
+            "batch_size": self.batch_size,
+            "published": self.published,
+            "delivered": self.delivered,
+            "batches": self.batches,
+            "failed": self.failed,
+        }
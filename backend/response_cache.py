@@ -0,0 +1,188 @@
+"""Serialized-response cache with strong ETags for public read endpoints.
+
+Entries are keyed by route path, sorted query params and the current
+generation of each namespace the route reads from. Write handlers call
+``invalidate(namespace)`` to bump the generation, which makes every older
+entry unreachable; the backend's own eviction reclaims them later.
+
+Two backends are provided: ``MemoryCacheBackend`` (per process, LRU bounded
+by total body bytes) and ``MongoCacheBackend`` (shared by every worker, so
+invalidations made on one worker are seen by all of them).
+
+Routes that pass ``coalesce=True`` load through the cache's ``coalescer``
+(a ``SingleFlight``) on a miss, so a burst of identical requests right after
+an invalidation runs the query once. The coalescing key is the cache key,
+generations included, so a write never joins a request to a pre-write load.
+"""
+import hashlib
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Iterable, Optional, Tuple, Union
+
+from bson import Binary
+from pydantic import BaseModel
+from starlette.requests import Request
+from starlette.responses import Response
+
+Entry = Tuple[str, bytes]  # (etag, body)
+
+class MemoryCacheBackend:
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.used_bytes = 0
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._generations: dict = {}
+        self.evictions = 0
+
+    async def get(self, key: str) -> Optional[Entry]:
+        item = self._entries.get(key)
+        if item is None:
+            return None
+        expires_at, entry = item
+        if expires_at < time.monotonic():
+            self._drop(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    async def set(self, key: str, entry: Entry, ttl: float) -> None:
+        size = len(entry[1])
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._drop(key)
+        self._entries[key] = (time.monotonic() + ttl, entry)
+        self.used_bytes += size
+        while self.used_bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._drop(oldest)
+            self.evictions += 1
+
+    def _drop(self, key: str) -> None:
+        _, (_, body) = self._entries.pop(key)
+        self.used_bytes -= len(body)
+
+    async def generations(self, namespaces: Iterable[str]) -> list:
+        return [self._generations.get(namespace, 0) for namespace in namespaces]
+
+    async def bump(self, namespace: str) -> None:
+        self._generations[namespace] = self._generations.get(namespace, 0) + 1
+
+    def stats(self) -> dict:
+        return {
+            "backend": "memory",
+            "entries": len(self._entries),
+            "bytes": self.used_bytes,
+            "max_bytes": self.max_bytes,
+            "evictions": self.evictions,
+        }
+
+class MongoCacheBackend:
+    # Bodies live in `response_cache` (TTL-indexed on expires_at, see
+    # INDEXES in server.py) and generations in `response_cache_generations`.
+    def __init__(self, db):
+        self.entries = db.response_cache
+        self.generation_docs = db.response_cache_generations
+
+    async def get(self, key: str) -> Optional[Entry]:
+        doc = await self.entries.find_one({"_id": key})
+        if doc is None or doc["expires_at"].replace(tzinfo=timezone.utc) < datetime.now(timezone.utc):
+            return None
+        return doc["etag"], bytes(doc["body"])
+
+    async def set(self, key: str, entry: Entry, ttl: float) -> None:
+        etag, body = entry
+        expires_at = datetime.now(timezone.utc) + timedelta(seconds=ttl)
+        await self.entries.replace_one(
+            {"_id": key},
+            {"_id": key, "etag": etag, "body": Binary(body), "expires_at": expires_at},
+            upsert=True,
+        )
+
+    async def generations(self, namespaces: Iterable[str]) -> list:
+        namespaces = list(namespaces)
+        found = {
+            doc["_id"]: doc["generation"]
+            async for doc in self.generation_docs.find({"_id": {"$in": namespaces}})
+        }
+        return [found.get(namespace, 0) for namespace in namespaces]
+
+    async def bump(self, namespace: str) -> None:
+        await self.generation_docs.update_one({"_id": namespace}, {"$inc": {"generation": 1}}, upsert=True)
+
+    def stats(self) -> dict:
+        return {"backend": "mongo"}
+
+class ResponseCache:
+    def __init__(self, backend, ttl: float = 300.0, enabled: bool = True, coalescer=None):
+        self.backend = backend
+        self.ttl = ttl
+        self.enabled = enabled
+        self.coalescer = coalescer
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    async def respond(
+        self,
+        request: Request,
+        namespaces: Iterable[str],
+        load: Callable[[], Awaitable[Union[BaseModel, bytes]]],
+        coalesce: bool = False,
+    ) -> Response:
+        coalescer = self.coalescer if coalesce else None
+        if not self.enabled and coalescer is None:
+            return self._response(request, *self._encode(await load()))
+
+        namespaces = list(namespaces)
+        generations = await self.backend.generations(namespaces)
+        params = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+        key = f"{request.url.path}?{params}#" + ",".join(map(str, generations))
+
+        entry = await self.backend.get(key) if self.enabled else None
+        if entry is None:
+            if self.enabled:
+                self.misses += 1
+            if coalescer is None:
+                entry = await self._fill(key, load)
+            else:
+                entry = await coalescer.do(key, lambda: self._fill(key, load))
+        else:
+            self.hits += 1
+        return self._response(request, *entry)
+
+    async def _fill(self, key: str, load: Callable[[], Awaitable[Union[BaseModel, bytes]]]) -> Entry:
+        entry = self._encode(await load())
+        if self.enabled:
+            await self.backend.set(key, entry, self.ttl)
+        return entry
+
+    async def invalidate(self, *namespaces: str) -> None:
+        for namespace in namespaces:
+            await self.backend.bump(namespace)
+
+    @staticmethod
+    def _encode(payload: Union[BaseModel, bytes]) -> Entry:
+        # Loaders return either a model or JSON bytes already encoded by fast_json
+        body = payload if isinstance(payload, bytes) else payload.model_dump_json().encode()
+        return '"' + hashlib.sha256(body).hexdigest()[:32] + '"', body
+
+    def _response(self, request: Request, etag: str, body: bytes) -> Response:
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and (if_none_match.strip() == "*" or etag in [t.strip() for t in if_none_match.split(",")]):
+            self.not_modified += 1
+            return Response(status_code=304, headers=headers)
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "not_modified": self.not_modified,
+            **self.backend.stats(),
+            **({"coalescing": self.coalescer.stats()} if self.coalescer else {}),
+        }
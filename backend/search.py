@@ -0,0 +1,203 @@
+"""In-process inverted index behind /api/search.
+
+Schools, news, bulletins and forum posts are tokenized into a term -> postings
+map plus a sorted term list, so every query token can be prefix-expanded with
+a binary search instead of a regex scan. Documents must match every query
+token; hits are ranked by field-weighted TF-IDF, with exact term matches
+scoring above prefix matches.
+
+Each worker keeps its own index. Create/update handlers on the worker update
+it directly; ``refresh`` periodically picks up documents written on other
+workers by seeking past the newest stamp already indexed: ``updated_at`` for
+schools, which are edited, ``created_at`` for the append-only kinds.
+"""
+import bisect
+import heapq
+import math
+import re
+import unicodedata
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional
+
+# \w alone splits Telugu (and other Indic) words at every vowel sign and
+# virama, so the Indic blocks are included explicitly.
+TOKEN_RE = re.compile(r"[\w\u0900-\u0DFF]+")
+
+# type -> (collection, {field: weight}, field refresh seeks on)
+SEARCHABLE = {
+    "school": ("schools", {"name": 3.0, "address": 1.0}, "updated_at"),
+    "news": ("news", {"title": 2.0, "content": 1.0}, "created_at"),
+    "bulletin": ("bulletins", {"title": 2.0, "content": 1.0}, "created_at"),
+    "forum_post": ("forum_posts", {"title": 2.0, "content": 1.0}, "created_at"),
+}
+
+PREFIX_WEIGHT = 0.7
+MAX_PREFIX_EXPANSION = 64
+# refresh re-reads this far behind the watermark, for writes stamped before
+# an earlier refresh but committed after it; documents whose stamp is already
+# indexed are skipped
+REFRESH_OVERLAP = timedelta(seconds=5)
+
+def tokenize(text: Optional[str]) -> List[str]:
+    if not text:
+        return []
+    return TOKEN_RE.findall(unicodedata.normalize("NFC", text).casefold())
+
+class SearchIndex:
+    def __init__(self):
+        self.postings = defaultdict(dict)  # term -> {doc_key: weight}
+        self.terms: List[str] = []  # sorted, for prefix expansion
+        self.terms_stale = False  # bulk loads re-sort once instead of per insert
+        self.loading = False
+        self.docs = {}  # doc_key -> result metadata
+        self.doc_terms = {}  # doc_key -> terms, for removal on update
+        self.stamps = {}  # doc_key -> stamp indexed
+        self.watermarks = {}  # collection -> newest stamp indexed
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    def add(self, doc_type: str, doc: dict) -> None:
+        collection, fields, stamp_field = SEARCHABLE[doc_type]
+        key = (doc_type, doc["id"])
+        # legacy schools written before updated_at fall back to created_at
+        stamp = doc.get(stamp_field) or doc.get("created_at")
+        if isinstance(stamp, str):
+            # legacy rows that migrate_timestamps.py has not converted yet
+            stamp = datetime.fromisoformat(stamp)
+        if key in self.docs:
+            if stamp is not None and self.stamps.get(key) == stamp:
+                return
+            self.remove(doc_type, doc["id"])
+
+        weights = defaultdict(float)
+        for field, boost in fields.items():
+            for term in tokenize(doc.get(field)):
+                weights[term] += boost
+
+        for term, weight in weights.items():
+            postings = self.postings[term]
+            if not postings and not self.terms_stale:
+                if self.loading:
+                    self.terms_stale = True  # re-sorted once by the next search
+                else:
+                    bisect.insort(self.terms, term)
+            postings[key] = weight
+
+        self.doc_terms[key] = list(weights)
+        self.docs[key] = {
+            "type": doc_type,
+            "id": doc["id"],
+            "title": doc.get("name") or doc.get("title") or "",
+            # a school is its own scope for the school_id filter
+            "school_id": doc["id"] if doc_type == "school" else doc.get("school_id"),
+        }
+        self.stamps[key] = stamp
+        if stamp is not None and (collection not in self.watermarks or stamp > self.watermarks[collection]):
+            self.watermarks[collection] = stamp
+
+    def remove(self, doc_type: str, doc_id: str) -> None:
+        key = (doc_type, doc_id)
+        for term in self.doc_terms.pop(key, []):
+            postings = self.postings[term]
+            postings.pop(key, None)
+            if not postings:
+                del self.postings[term]
+                if self.terms_stale:
+                    continue
+                index = bisect.bisect_left(self.terms, term)
+                if index < len(self.terms) and self.terms[index] == term:
+                    del self.terms[index]
+        self.docs.pop(key, None)
+        self.stamps.pop(key, None)
+
+    def _expand(self, token: str) -> Iterable[tuple]:
+        if self.terms_stale:
+            self.terms = sorted(self.postings)
+            self.terms_stale = False
+        start = bisect.bisect_left(self.terms, token)
+        for term in self.terms[start:start + MAX_PREFIX_EXPANSION]:
+            if not term.startswith(token):
+                break
+            yield term, 1.0 if term == token else PREFIX_WEIGHT
+
+    def search(
+        self,
+        query: str,
+        types: Optional[Iterable[str]] = None,
+        school_id: Optional[str] = None,
+        limit: int = 20,
+    ) -> List[dict]:
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens:
+            return []
+        types = set(types) if types else None
+        total = max(len(self.docs), 1)
+
+        # Expand each token to (term, match weight, idf) and start from the
+        # rarest one, so later tokens only probe the surviving candidates.
+        expansions = []
+        for token in tokens:
+            terms = [
+                (term, match_weight, math.log(1 + total / len(self.postings[term])))
+                for term, match_weight in self._expand(token)
+            ]
+            if not terms:
+                return []
+            expansions.append((sum(len(self.postings[term]) for term, _, _ in terms), terms))
+        expansions.sort(key=lambda expansion: expansion[0])
+
+        def matches(key):
+            meta = self.docs[key]
+            return (types is None or meta["type"] in types) and (school_id is None or meta["school_id"] == school_id)
+
+        scores = defaultdict(float)
+        filtered = types is not None or school_id is not None
+        for term, match_weight, idf in expansions[0][1]:
+            for key, weight in self.postings[term].items():
+                if not filtered or matches(key):
+                    scores[key] += weight * idf * match_weight
+
+        for _, terms in expansions[1:]:
+            narrowed = {}
+            for key, score in scores.items():
+                extra = 0.0
+                for term, match_weight, idf in terms:
+                    weight = self.postings[term].get(key)
+                    if weight:
+                        extra += weight * idf * match_weight
+                if extra:
+                    narrowed[key] = score + extra
+            scores = narrowed
+            if not scores:
+                return []
+
+        ranked = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+        return [{**self.docs[key], "score": round(score, 4)} for key, score in ranked]
+
+    async def _load(self, db, doc_type: str, query: dict) -> int:
+        collection, fields, stamp_field = SEARCHABLE[doc_type]
+        projection = {"_id": 0, "id": 1, "school_id": 1, "created_at": 1, stamp_field: 1,
+                      **{field: 1 for field in fields}}
+        loaded = 0
+        self.loading = True
+        try:
+            async for doc in db[collection].find(query, projection).batch_size(1000):
+                self.add(doc_type, doc)
+                loaded += 1
+        finally:
+            self.loading = False
+        return loaded
+
+    async def rebuild(self, db) -> int:
+        self.__init__()
+        return sum([await self._load(db, doc_type, {}) for doc_type in SEARCHABLE])
+
+    async def refresh(self, db) -> int:
+        loaded = 0
+        for doc_type, (collection, _, stamp_field) in SEARCHABLE.items():
+            watermark = self.watermarks.get(collection)
+            query = {stamp_field: {"$gt": watermark - REFRESH_OVERLAP}} if watermark else {}
+            loaded += await self._load(db, doc_type, query)
+        return loaded
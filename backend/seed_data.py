@@ -1,5 +1,6 @@
 import asyncio
 import os
+from datetime import datetime, timezone
 from motor.motor_asyncio import AsyncIOMotorClient
 from dotenv import load_dotenv
 from pathlib import Path
@@ -92,8 +93,7 @@ async def seed_database():
         schools_to_insert = []
         for school in SAMPLE_SCHOOLS:
             school_doc = school.copy()
-            from datetime import datetime, timezone
-            school_doc['created_at'] = datetime.now(timezone.utc).isoformat()
+            school_doc['created_at'] = datetime.now(timezone.utc)
             schools_to_insert.append(school_doc)
         
         await db.schools.insert_many(schools_to_insert)
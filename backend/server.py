@@ -1,38 +1,184 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, status
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, File, Header, Query, Request, UploadFile, WebSocket, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import Response, StreamingResponse
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, DESCENDING, IndexModel, ReturnDocument
+from pymongo.errors import DuplicateKeyError
 import os
 import logging
 from pathlib import Path
 from pydantic import BaseModel, Field, ConfigDict, EmailStr
-from typing import List, Optional
+from typing import Dict, Generic, List, Optional, TypeVar, Union
+import asyncio
+import base64
+import hmac
+import json
+import re
 import uuid
-from datetime import datetime, timezone, timedelta
+from datetime import date, datetime, timezone, timedelta
 import jwt
-from passlib.context import CryptContext
+import analytics
+import bulk_import
+import exports
+import fast_json
+import fieldsets
+import stats
+from chat import ChatService, MemoryBroker, MongoBroker
+from forum import HotRanker
+from media import InvalidImage, MediaStore
+from mentors import MentorIndex
+from metrics import CommandMetrics, Counter, Gauge, MetricsMiddleware, MetricsRegistry, PoolMetrics, index_registry
+from notifications import Notifier
+from passwords import PasswordHasher, PasswordHasherBusy
+from response_cache import MemoryCacheBackend, MongoCacheBackend, ResponseCache
+from search import SEARCHABLE, SearchIndex
+from single_flight import SingleFlight
+from user_cache import UserCache
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
+# Request, command and pool metrics for /api/metrics; recording can be
+# switched off at runtime through PUT /api/admin/metrics.
+metrics_registry = MetricsRegistry(enabled=os.environ.get('METRICS_ENABLED', 'true').lower() == 'true')
+command_metrics = CommandMetrics(metrics_registry, slow_ms=float(os.environ.get('SLOW_QUERY_MS', '100')))
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+
 # MongoDB connection
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
+# Timestamps are stored as native BSON dates; tz_aware returns them as UTC
+# datetimes (run migrate_timestamps.py once on databases with string dates)
+# pymongo builds command events only when a listener is registered, so
+# METRICS_COMMANDS=false removes even that cost (set at startup only)
+event_listeners = [PoolMetrics(metrics_registry)]
+if os.environ.get('METRICS_COMMANDS', 'true').lower() == 'true':
+    event_listeners.append(command_metrics)
+client = AsyncIOMotorClient(mongo_url, tz_aware=True, event_listeners=event_listeners)
 db = client[os.environ['DB_NAME']]
 
 # Security
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# bcrypt runs in a bounded thread pool; changing BCRYPT_ROUNDS rehashes
+# passwords transparently on their next successful login.
+password_hasher = PasswordHasher(
+    rounds=int(os.environ.get('BCRYPT_ROUNDS', '12')),
+    max_workers=int(os.environ.get('PASSWORD_HASH_WORKERS', '4')),
+    max_queue=int(os.environ.get('PASSWORD_HASH_MAX_QUEUE', '0')),
+)
 SECRET_KEY = os.environ.get('JWT_SECRET_KEY', 'your-secret-key-change-in-production')
 ALGORITHM = "HS256"
 security = HTTPBearer()
 
+# Authenticated-user cache. TOKEN_CLAIMS_TRUST_SECONDS > 0 lets routes that
+# only need id/role/approved trust the signed claims of a freshly issued token
+# instead of loading the user at all; role changes then take up to that long
+# to apply to tokens already issued.
+user_cache = UserCache(
+    max_size=int(os.environ.get('USER_CACHE_SIZE', '10000')),
+    ttl=float(os.environ.get('USER_CACHE_TTL_SECONDS', '60')),
+)
+TOKEN_CLAIMS_TRUST_SECONDS = int(os.environ.get('TOKEN_CLAIMS_TRUST_SECONDS', '0'))
+
+# Pagination: every list endpoint is keyset-paginated on (sort key, id).
+# MAX_PAGE_SIZE is the hard cap on how many documents one request may load.
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+# Cards of each kind embedded in /schools/{id}/overview
+OVERVIEW_ITEMS = 6
+
+# Values listed per facet in /alumni/facets, most common first
+FACET_LIMIT = 50
+
+# Opt-in fast path: list pages are encoded straight to JSON bytes with orjson
+# instead of being re-validated through their response_model (see fast_json.py)
+FAST_RESPONSES = os.environ.get('FAST_RESPONSES', 'false').lower() == 'true'
+
+# Public read endpoints serve cached JSON bytes with strong ETags. Use the
+# mongo backend when running several workers so invalidations are shared.
+if os.environ.get('RESPONSE_CACHE_BACKEND', 'memory') == 'mongo':
+    response_cache_backend = MongoCacheBackend(db)
+else:
+    response_cache_backend = MemoryCacheBackend(
+        max_bytes=int(os.environ.get('RESPONSE_CACHE_MAX_BYTES', str(32 * 1024 * 1024))),
+    )
+# Identical concurrent misses on the hot list routes share one query and its
+# encoded body; results are also reused for COALESCE_WINDOW_SECONDS after it
+read_coalescer = SingleFlight(
+    window=float(os.environ.get('COALESCE_WINDOW_SECONDS', '0.1')),
+    enabled=os.environ.get('COALESCE_ENABLED', 'true').lower() == 'true',
+)
+response_cache = ResponseCache(
+    response_cache_backend,
+    ttl=float(os.environ.get('RESPONSE_CACHE_TTL_SECONDS', '300')),
+    enabled=os.environ.get('RESPONSE_CACHE_ENABLED', 'true').lower() == 'true',
+    coalescer=read_coalescer,
+)
+
+def coalescing_metrics():
+    stats = read_coalescer.stats()
+    loads = Counter("coalesced_reads_total", "Hot read loads, executed or collapsed into one in flight.",
+                    ("outcome",))
+    loads.inc(("executed",), stats["executions"])
+    loads.inc(("collapsed",), stats["collapsed"])
+    in_flight = Gauge("coalesced_reads_in_flight", "Hot read loads currently running.", ())
+    in_flight.inc((), stats["in_flight"])
+    return loads, in_flight
+
+metrics_registry.collectors.append(coalescing_metrics)
+
+# Per-worker full-text index; refreshed every SEARCH_REFRESH_SECONDS to pick
+# up documents created on other workers.
+search_index = SearchIndex()
+SEARCH_REFRESH_SECONDS = float(os.environ.get('SEARCH_REFRESH_SECONDS', '60'))
+
+# Uploaded gallery images, stored once per content hash under MEDIA_ROOT with
+# renditions derived in a pool of MEDIA_WORKERS processes.
+media_store = MediaStore(
+    os.environ.get('MEDIA_ROOT', str(ROOT_DIR / 'media')),
+    max_upload_bytes=int(os.environ.get('MEDIA_MAX_UPLOAD_BYTES', str(15 * 1024 * 1024))),
+    workers=int(os.environ.get('MEDIA_WORKERS', '2')),
+)
+
+# Background job folding new forum replies into each thread's hot_score
+hot_ranker = HotRanker(half_life_hours=float(os.environ.get('FORUM_HOT_HALF_LIFE_HOURS', '24')))
+HOT_SCORE_SECONDS = float(os.environ.get('HOT_SCORE_SECONDS', '30'))
+
+# Per-worker mentor matching index over willing alumni, kept current by the
+# alumni write routes and refreshed every MENTOR_REFRESH_SECONDS.
+mentor_index = MentorIndex()
+MENTOR_REFRESH_SECONDS = float(os.environ.get('MENTOR_REFRESH_SECONDS', '60'))
+
+# Notifications are fanned out to a school's members by a background worker
+# in insert_many batches; publishers wait only when the queue is full. Only an
+# admin's posts without a school_id are broadcast to every user.
+notifier = Notifier(
+    batch_size=int(os.environ.get('NOTIFICATION_BATCH_SIZE', '1000')),
+    max_queue=int(os.environ.get('NOTIFICATION_QUEUE_SIZE', '1000')),
+)
+
+# WebSocket chat. Use the mongo broker when running several workers so a
+# message reaches sockets connected to any of them.
+CHAT_BROKER = os.environ.get('CHAT_BROKER', 'memory')
+chat = ChatService(
+    max_batch=int(os.environ.get('CHAT_WRITE_BATCH', '500')),
+    flush_seconds=float(os.environ.get('CHAT_FLUSH_SECONDS', '0.25')),
+)
+
 # Create the main app
 app = FastAPI()
 api_router = APIRouter(prefix="/api")
 
 # ==================== MODELS ====================
 
+T = TypeVar("T")
+
+# Paginated list envelope; pass next_cursor back as ?cursor= to fetch the next page
+class Page(BaseModel, Generic[T]):
+    items: List[T]
+    next_cursor: Optional[str] = None
+
 # User Models
 class UserBase(BaseModel):
     email: EmailStr
@@ -67,16 +213,30 @@ class School(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     name: str
     mandal_id: str
+    udise_code: Optional[str] = None  # government school code, the bulk import key
     hm_note: Optional[str] = None
     facilities: List[str] = []
     contact_email: Optional[str] = None
     contact_phone: Optional[str] = None
     address: Optional[str] = None
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    updated_at: Optional[datetime] = None  # stamped by every write; search_index refreshes on it
+
+class SchoolSummary(BaseModel):
+    # default /schools list item: School without hm_note, address and facilities
+    id: str
+    name: str
+    mandal_id: str
+    udise_code: Optional[str] = None
+    contact_email: Optional[str] = None
+    contact_phone: Optional[str] = None
+    created_at: datetime
+    updated_at: Optional[datetime] = None
 
 class SchoolCreate(BaseModel):
     name: str
     mandal_id: str
+    udise_code: Optional[str] = None  # government school code, the bulk import key
     hm_note: Optional[str] = None
     facilities: List[str] = []
     contact_email: Optional[str] = None
@@ -97,12 +257,31 @@ class Alumni(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     user_id: str
     school_id: str
+    mandal_id: Optional[str] = None  # copied from the school, for directory filters
     batch_year: int
     current_profession: Optional[str] = None
     company: Optional[str] = None
     achievements: List[str] = []
     willing_to_mentor: bool = False
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    updated_at: Optional[datetime] = None  # stamped by every write; mentor_index refreshes on it
+
+class AlumniUpdate(BaseModel):
+    batch_year: int
+    current_profession: Optional[str] = None
+    company: Optional[str] = None
+    achievements: List[str] = []
+    willing_to_mentor: bool = False
+
+class FacetCount(BaseModel):
+    value: Union[int, str]
+    count: int
+
+class AlumniFacets(BaseModel):
+    total: int
+    batch_years: List[FacetCount]
+    schools: List[FacetCount]
+    professions: List[FacetCount]
 
 # Event Model
 class Event(BaseModel):
@@ -113,6 +292,7 @@ class Event(BaseModel):
     school_id: Optional[str] = None
     event_date: datetime
     location: Optional[str] = None
+    capacity: Optional[int] = None  # no limit when unset
     rsvp_count: int = 0
     created_by: str
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
@@ -123,6 +303,16 @@ class EventCreate(BaseModel):
     school_id: Optional[str] = None
     event_date: datetime
     location: Optional[str] = None
+    capacity: Optional[int] = Field(None, gt=0)
+
+class EventRsvp(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    event_id: str
+    user_id: str
+    event_date: datetime  # copied from the event, so "my events" sorts on the index
+    seated: bool = False  # set once a seat is counted in the event's rsvp_count
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 # Donation Model
 class Donation(BaseModel):
@@ -132,6 +322,7 @@ class Donation(BaseModel):
     donor_email: EmailStr
     amount: float
     school_id: Optional[str] = None
+    need_id: Optional[str] = None
     purpose: Optional[str] = None
     payment_status: str = "pending"  # pending, completed, failed
     transaction_id: Optional[str] = None
@@ -140,10 +331,31 @@ class Donation(BaseModel):
 class DonationCreate(BaseModel):
     donor_name: str
     donor_email: EmailStr
-    amount: float
+    amount: float = Field(gt=0)
     school_id: Optional[str] = None
+    need_id: Optional[str] = None
     purpose: Optional[str] = None
 
+class DonationTotals(BaseModel):
+    count: int
+    amount: float
+
+class DonationPoint(BaseModel):
+    period: date  # first day of the day or month bucket, UTC
+    count: int
+    amount: float
+    moving_average: float  # mean amount over the trailing `window` periods
+
+class DonationAnalytics(BaseModel):
+    scope: str  # global, school:{id} or mandal:{id}
+    granularity: str
+    start: datetime
+    end: datetime
+    window: int
+    totals: DonationTotals
+    by_purpose: Dict[str, DonationTotals]
+    series: List[DonationPoint]
+
 # Forum Post Model
 class ForumPost(BaseModel):
     model_config = ConfigDict(extra="ignore")
@@ -154,6 +366,8 @@ class ForumPost(BaseModel):
     school_id: Optional[str] = None
     category: str = "general"
     replies_count: int = 0
+    last_reply_at: Optional[datetime] = None
+    hot_score: Optional[float] = None
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 class ForumPostCreate(BaseModel):
@@ -162,6 +376,19 @@ class ForumPostCreate(BaseModel):
     school_id: Optional[str] = None
     category: str = "general"
 
+class ForumReply(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    post_id: str
+    parent_id: Optional[str] = None  # the reply this one answers, if any
+    content: str
+    author_id: str
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+class ForumReplyCreate(BaseModel):
+    content: str = Field(min_length=1, max_length=10000)
+    parent_id: Optional[str] = None
+
 # Bulletin/Notice Model
 class Bulletin(BaseModel):
     model_config = ConfigDict(extra="ignore")
@@ -173,6 +400,15 @@ class Bulletin(BaseModel):
     created_by: str
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
+class BulletinSummary(BaseModel):
+    # default /bulletins list item: Bulletin without content
+    id: str
+    title: str
+    school_id: Optional[str] = None
+    category: str = "announcement"
+    created_by: str
+    created_at: datetime
+
 class BulletinCreate(BaseModel):
     title: str
     content: str
@@ -190,6 +426,15 @@ class News(BaseModel):
     created_by: str
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
+class NewsSummary(BaseModel):
+    # default /news list item: News without content
+    id: str
+    title: str
+    school_id: Optional[str] = None
+    image_url: Optional[str] = None
+    created_by: str
+    created_at: datetime
+
 class NewsCreate(BaseModel):
     title: str
     content: str
@@ -197,15 +442,37 @@ class NewsCreate(BaseModel):
     image_url: Optional[str] = None
 
 # Gallery Model
+class ImageVariant(BaseModel):
+    name: str  # served at /api/media/{hash}/{name}
+    width: int
+    height: int
+    format: str  # jpg, webp
+    bytes: int
+
+class GalleryPhoto(BaseModel):
+    hash: str
+    width: int
+    height: int
+    variants: List[ImageVariant]
+
 class Gallery(BaseModel):
     model_config = ConfigDict(extra="ignore")
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     title: str
     school_id: str
-    images: List[str] = []
+    images: List[str] = []  # external image URLs
+    photos: List[GalleryPhoto] = []  # uploaded through /galleries/{id}/photos
     created_by: str
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
+class GallerySummary(BaseModel):
+    # default /galleries list item: Gallery without images and photos
+    id: str
+    title: str
+    school_id: str
+    created_by: str
+    created_at: datetime
+
 class GalleryCreate(BaseModel):
     title: str
     school_id: str
@@ -222,6 +489,7 @@ class SchoolNeed(BaseModel):
     target_amount: Optional[float] = None
     raised_amount: float = 0
     status: str = "active"  # active, fulfilled, closed
+    fulfilled_at: Optional[datetime] = None
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
 class SchoolNeedCreate(BaseModel):
@@ -231,36 +499,427 @@ class SchoolNeedCreate(BaseModel):
     category: str
     target_amount: Optional[float] = None
 
+# Bulk Import Row Models
+class SchoolImportRow(SchoolCreate):
+    udise_code: str
+
+class AlumniImportRow(BaseModel):
+    user_id: str
+    school_id: str
+    batch_year: int
+    current_profession: Optional[str] = None
+    company: Optional[str] = None
+    achievements: List[str] = []
+    willing_to_mentor: bool = False
+
+# School Overview Models
+class AlumniCard(BaseModel):
+    id: str
+    batch_year: int
+    current_profession: Optional[str] = None
+    company: Optional[str] = None
+    willing_to_mentor: bool = False
+
+class NewsCard(BaseModel):
+    id: str
+    title: str
+    content: str
+    image_url: Optional[str] = None
+    created_at: datetime
+
+class NeedSummary(BaseModel):
+    id: str
+    title: str
+    description: str
+    category: str
+    target_amount: Optional[float] = None
+    raised_amount: float = 0
+    status: str = "active"
+
+class SchoolCounts(BaseModel):
+    alumni: int = 0
+    donations: int = 0
+    donation_amount: float = 0
+
+class SchoolOverview(BaseModel):
+    school: School
+    counts: SchoolCounts
+    alumni: List[AlumniCard]
+    news: List[NewsCard]
+    needs: List[NeedSummary]
+
+# Mentor Models
+class MentorMatch(BaseModel):
+    alumni_id: str
+    user_id: str
+    school_id: str
+    mandal_id: Optional[str] = None
+    batch_year: int
+    current_profession: Optional[str] = None
+    company: Optional[str] = None
+    score: float
+
+class MentorMatches(BaseModel):
+    items: List[MentorMatch]
+
+# Metrics Models
+class MetricsSettings(BaseModel):
+    enabled: bool
+    slow_query_ms: Optional[float] = Field(None, ge=0)
+
+# Chat Models
+class Conversation(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    type: str = "group"  # direct, group
+    title: Optional[str] = None
+    members: List[str]
+    created_by: str
+    last_message_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+class ConversationCreate(BaseModel):
+    member_ids: List[str]
+    title: Optional[str] = None
+
+class ChatMessage(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    id: str
+    conversation_id: str
+    sender_id: str
+    body: str
+    created_at: datetime
+
+# Notification Model
+class Notification(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    id: str
+    user_id: str
+    type: str  # bulletin, event, news, school_need
+    title: str
+    ref_id: str
+    school_id: Optional[str] = None
+    read: bool = False
+    created_at: datetime
+
+# Search Models
+class SearchHit(BaseModel):
+    type: str
+    id: str
+    title: str
+    school_id: Optional[str] = None
+    score: float
+
+class SearchResults(BaseModel):
+    items: List[SearchHit]
+
+# ==================== INDEXES ====================
+
+# Index registry, applied idempotently at startup by ensure_indexes().
+# List routes filter on school_id (or mandal_id / role) and seek on
+# (created_at, id), so each gets a compound index ending in the sort keys
+# plus an unfiltered (created_at, id) index for the district-wide views.
+def _by_id():
+    return IndexModel([("id", ASCENDING)], unique=True)
+
+def _seek(*prefix: str, sort_key: str = "created_at"):
+    keys = [(field, ASCENDING) for field in prefix]
+    return IndexModel(keys + [(sort_key, DESCENDING), ("id", DESCENDING)])
+
+INDEXES = {
+    "users": [
+        _by_id(),
+        IndexModel([("email", ASCENDING)], unique=True),
+        _seek(),
+        _seek("role"),
+        _seek("school_id"),
+        _seek("mandal_id"),
+    ],
+    "schools": [
+        _by_id(),
+        _seek(),
+        _seek("mandal_id"),
+        IndexModel(
+            [("udise_code", ASCENDING)],
+            unique=True,
+            partialFilterExpression={"udise_code": {"$type": "string"}},
+        ),
+        IndexModel([("updated_at", ASCENDING)]),
+    ],
+    "mandals": [_by_id(), IndexModel([("name", ASCENDING), ("id", ASCENDING)])],
+    "alumni": [
+        _by_id(),
+        _seek(),
+        _seek("school_id"),
+        _seek("mandal_id"),
+        IndexModel([("user_id", ASCENDING)]),
+        # one profile per user and school: the natural key bulk imports upsert on
+        IndexModel([("school_id", ASCENDING), ("user_id", ASCENDING)], unique=True),
+        IndexModel([("updated_at", ASCENDING)]),
+    ],
+    "events": [_by_id(), _seek(sort_key="event_date"), _seek("school_id", sort_key="event_date")],
+    "event_rsvps": [
+        _by_id(),
+        # one RSVP per user and event; duplicates from retries fail here
+        IndexModel([("event_id", ASCENDING), ("user_id", ASCENDING)], unique=True),
+        _seek("user_id", sort_key="event_date"),
+    ],
+    "donations": [
+        _by_id(),
+        _seek(),
+        _seek("school_id"),
+        _seek("need_id"),
+        IndexModel([("payment_status", ASCENDING)]),
+        # only donations submitted with an Idempotency-Key carry one
+        IndexModel([("idempotency_key", ASCENDING)], unique=True, sparse=True),
+    ],
+    "donation_buckets": [
+        IndexModel([("scope", ASCENDING), ("granularity", ASCENDING), ("period", ASCENDING)]),
+        IndexModel([("rebuilt_at", ASCENDING)]),
+    ],
+    "forum_posts": [
+        _by_id(),
+        _seek(),
+        _seek("school_id"),
+        _seek(sort_key="hot_score"),
+        _seek("school_id", sort_key="hot_score"),
+        # only posts with replies not yet folded into hot_score carry the flag
+        IndexModel([("hot_dirty", ASCENDING)], sparse=True),
+    ],
+    "forum_replies": [_by_id(), _seek("post_id")],
+    "bulletins": [_by_id(), _seek(), _seek("school_id")],
+    "news": [_by_id(), _seek(), _seek("school_id")],
+    "galleries": [_by_id(), _seek(), _seek("school_id")],
+    "school_needs": [_by_id(), _seek(), _seek("school_id")],
+    "notifications": [_by_id(), _seek("user_id")],
+    "conversations": [
+        _by_id(),
+        _seek("members", sort_key="last_message_at"),
+        # only direct conversations carry direct_key
+        IndexModel([("direct_key", ASCENDING)], unique=True, sparse=True),
+    ],
+    "chat_messages": [_by_id(), _seek("conversation_id")],
+    "response_cache": [IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0)],
+}
+
+# Representative query shapes issued by the routes below. check_indexes.py
+# explains each one and fails if any falls back to a collection scan.
+QUERY_SHAPES = [
+    ("get_current_user", "users", {"id": "x"}, None),
+    ("login", "users", {"email": "x"}, None),
+    ("get_all_users", "users", {"role": "x"}, [("created_at", -1), ("id", -1)]),
+    ("get_schools", "schools", {}, [("created_at", -1), ("id", -1)]),
+    ("get_schools:mandal", "schools", {"mandal_id": "x"}, [("created_at", -1), ("id", -1)]),
+    ("get_school", "schools", {"id": "x"}, None),
+    ("bulk_import:schools", "schools", {"udise_code": {"$in": ["x"]}}, None),
+    ("search_index:refresh", "schools", {"updated_at": {"$gt": 1}}, None),
+    ("get_mandals", "mandals", {}, [("name", 1), ("id", 1)]),
+    ("get_alumni", "alumni", {"school_id": "x"}, [("created_at", -1), ("id", -1)]),
+    ("get_alumni:mandal", "alumni", {"mandal_id": "x", "batch_year": {"$gte": 1, "$lte": 2}},
+     [("created_at", -1), ("id", -1)]),
+    ("bulk_import:alumni", "alumni", {"school_id": {"$in": ["x"]}, "user_id": {"$in": ["x"]}}, None),
+    ("mentor_index:refresh", "alumni", {"updated_at": {"$gt": 1}}, None),
+    ("get_events", "events", {"school_id": "x"}, [("event_date", -1), ("id", -1)]),
+    ("rsvp_event", "event_rsvps", {"event_id": "x", "user_id": "x"}, None),
+    ("get_my_events", "event_rsvps", {"user_id": "x", "seated": True, "event_date": {"$gte": 1}},
+     [("event_date", 1), ("id", 1)]),
+    ("get_donations", "donations", {"school_id": "x"}, [("created_at", -1), ("id", -1)]),
+    ("get_donations:need", "donations", {"need_id": "x"}, [("created_at", -1), ("id", -1)]),
+    ("create_donation:replay", "donations", {"idempotency_key": "x"}, None),
+    ("donation_analytics", "donation_buckets",
+     {"scope": "x", "granularity": "x", "period": {"$gte": 1, "$lt": 2}}, None),
+    ("get_forum_posts", "forum_posts", {"school_id": "x"}, [("created_at", -1), ("id", -1)]),
+    ("get_forum_posts:hot", "forum_posts", {"school_id": "x"}, [("hot_score", -1), ("id", -1)]),
+    ("get_forum_replies", "forum_replies", {"post_id": "x"}, [("created_at", 1), ("id", 1)]),
+    ("hot_ranker:dirty", "forum_posts", {"hot_dirty": True}, None),
+    ("get_bulletins", "bulletins", {"school_id": "x"}, [("created_at", -1), ("id", -1)]),
+    ("get_news", "news", {"school_id": "x"}, [("created_at", -1), ("id", -1)]),
+    ("get_galleries", "galleries", {"school_id": "x"}, [("created_at", -1), ("id", -1)]),
+    ("get_school_needs", "school_needs", {"school_id": "x"}, [("created_at", -1), ("id", -1)]),
+    ("export_users:mandal", "users", {"mandal_id": "x"}, [("created_at", 1), ("id", 1)]),
+    ("export_donations:school", "donations", {"school_id": "x"}, [("created_at", 1), ("id", 1)]),
+    ("export_alumni:mandal", "alumni", {"school_id": {"$in": ["x", "y"]}}, [("created_at", 1), ("id", 1)]),
+    ("get_notifications", "notifications", {"user_id": "x"}, [("created_at", -1), ("id", -1)]),
+    ("get_conversations", "conversations", {"members": "x"}, [("last_message_at", -1), ("id", -1)]),
+    ("get_chat_messages", "chat_messages", {"conversation_id": "x"}, [("created_at", -1), ("id", -1)]),
+    ("notify:school", "users", {"school_id": "x"}, None),
+    ("admin_stats:donations", "donations", {"payment_status": "completed"}, None),
+]
+
+# Slow-query logs name the registered index a filter would likely use
+command_metrics.indexes = index_registry(INDEXES)
+
+async def dedupe_alumni(database) -> int:
+    # Before the (school_id, user_id) index was unique, concurrent imports and
+    # profile creates could store a pair twice. Keep the most recently updated
+    # profile of each pair so the unique index can be built.
+    duplicates = database.alumni.aggregate([
+        {"$sort": {"updated_at": -1, "created_at": -1}},
+        {"$group": {"_id": {"school_id": "$school_id", "user_id": "$user_id"}, "ids": {"$push": "$id"}}},
+        {"$match": {"ids.1": {"$exists": True}}},
+    ], allowDiskUse=True)
+    removed = []
+    async for group in duplicates:
+        removed.extend((group["_id"]["school_id"], doc_id) for doc_id in group["ids"][1:])
+    if not removed:
+        return 0
+    await database.alumni.delete_many({"id": {"$in": [doc_id for _, doc_id in removed]}})
+    await stats.increment_many(database, [({"total_alumni": -1}, school_id, None) for school_id, _ in removed])
+    logging.getLogger(__name__).warning("Removed %d duplicate alumni profiles", len(removed))
+    return len(removed)
+
+async def ensure_indexes(database) -> None:
+    await dedupe_alumni(database)
+    # create_indexes is a no-op for indexes that already exist with the same spec
+    for collection, models in INDEXES.items():
+        await database[collection].create_indexes(models)
+    logging.getLogger(__name__).info("Ensured indexes on %d collections", len(INDEXES))
+
 # ==================== HELPER FUNCTIONS ====================
 
-def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+async def hash_password(password: str) -> str:
+    try:
+        return await password_hasher.hash(password)
+    except PasswordHasherBusy:
+        raise HTTPException(status_code=503, detail="Server busy, please retry", headers={"Retry-After": "1"})
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+async def verify_password(plain_password: str, hashed_password: str) -> tuple:
+    try:
+        return await password_hasher.verify_and_update(plain_password, hashed_password)
+    except PasswordHasherBusy:
+        raise HTTPException(status_code=503, detail="Server busy, please retry", headers={"Retry-After": "1"})
 
 def create_access_token(data: dict, expires_delta: timedelta = timedelta(days=7)):
     to_encode = data.copy()
-    expire = datetime.now(timezone.utc) + expires_delta
-    to_encode.update({"exp": expire})
+    now = datetime.now(timezone.utc)
+    to_encode.update({"exp": now + expires_delta, "iat": now})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> dict:
+def encode_cursor(value, doc_id: str) -> str:
+    if isinstance(value, datetime):
+        payload = {"d": value.isoformat(), "id": doc_id}
+    else:
+        payload = {"v": value, "id": doc_id}
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> tuple:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        value = datetime.fromisoformat(payload["d"]) if "d" in payload else payload["v"]
+        # Both end up in the query: anything but scalars could carry operators
+        if not isinstance(value, (str, int, float, bool, datetime, type(None))) or not isinstance(payload["id"], str):
+            raise ValueError("cursor fields must be scalars")
+        return value, payload["id"]
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+async def paginate(collection, query: dict, sort_key: str, cursor: Optional[str], limit: int,
+                   projection: Optional[dict] = None, direction: int = -1, model=None) -> dict:
+    # Seek past the last (sort_key, id) seen instead of skipping, so deep pages
+    # cost the same as the first one.
+    if cursor:
+        value, doc_id = decode_cursor(cursor)
+        op = "$lt" if direction < 0 else "$gt"
+        after = [{sort_key: value, "id": {op: doc_id}}]
+        # null sorts below every value but $lt/$gt never match it, so rows
+        # without the sort key are sought explicitly
+        if value is not None:
+            after.append({sort_key: {op: value}})
+            if direction < 0:
+                after.append({sort_key: None})
+        elif direction > 0:
+            after.append({sort_key: {"$ne": None}})
+        query = {"$and": [query, {"$or": after}]}
+    
+    if projection is None:
+        projection = fast_json.projection(model) if model else {"_id": 0}
+    # A sparse fieldset may leave out the sort key; fetch it for the cursor only
+    hidden = sort_key not in projection and any(value == 1 for value in projection.values())
+    if hidden:
+        projection = {**projection, sort_key: 1}
+    docs = await collection.find(query, projection) \
+        .sort([(sort_key, direction), ("id", direction)]) \
+        .limit(limit + 1) \
+        .to_list(limit + 1)
+    
+    next_cursor = None
+    if len(docs) > limit:
+        docs = docs[:limit]
+        next_cursor = encode_cursor(docs[-1].get(sort_key), docs[-1]["id"])
+    if hidden:
+        for doc in docs:
+            doc.pop(sort_key, None)
+    return {"items": docs, "next_cursor": next_cursor}
+
+def decode_token(token: str) -> dict:
     try:
-        token = credentials.credentials
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id = payload.get("sub")
-        if user_id is None:
-            raise HTTPException(status_code=401, detail="Invalid token")
-        user = await db.users.find_one({"id": user_id}, {"_id": 0})
-        if user is None:
-            raise HTTPException(status_code=401, detail="User not found")
-        return user
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=401, detail="Token expired")
-    except jwt.JWTError:
+    except jwt.InvalidTokenError:
+        raise HTTPException(status_code=401, detail="Invalid token")
+    if payload.get("sub") is None:
         raise HTTPException(status_code=401, detail="Invalid token")
+    return payload
+
+async def load_user(user_id: str) -> dict:
+    user = user_cache.get(user_id)
+    if user is None:
+        user = await db.users.find_one({"id": user_id}, {"_id": 0, "hashed_password": 0})
+        if user is None:
+            raise HTTPException(status_code=401, detail="User not found")
+        user_cache.set(user_id, user)
+    return user
+
+def render_page(model, page: dict):
+    if FAST_RESPONSES:
+        return fast_json.page_bytes(model, page)
+    return Page[model](**page)
+
+def page_response(model, page: dict):
+    # A page is serialized through the model it was paged with, which may be
+    # a sparse fieldset or the full model rather than the documented default
+    body = fast_json.page_bytes(model, page) if FAST_RESPONSES else Page[model](**page).model_dump_json()
+    return Response(content=body, media_type="application/json")
+
+def fieldset(model, summary=None):
+    """Dependency resolving ?fields= to the model a list route pages with.
+
+    Without ``fields`` that is ``summary``, the route's documented response
+    model, or else the full model; ``fields=*`` asks for the full model.
+    """
+    def dependency(fields: Optional[str] = Query(None, max_length=1000)):
+        try:
+            return fieldsets.view(model, fields, summary)
+        except fieldsets.UnknownFields as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
+    return dependency
+
+async def invalidate_overview(school_id: Optional[str]) -> None:
+    # Each school's overview is cached under its own namespace, so a write
+    # only drops the overview of the school it touched
+    if school_id:
+        await response_cache.invalidate(f"overview:{school_id}")
+
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> dict:
+    payload = decode_token(credentials.credentials)
+    return await load_user(payload["sub"])
+
+async def get_current_principal(credentials: HTTPAuthorizationCredentials = Depends(security)) -> dict:
+    # Lighter dependency for routes that only read id, role and approved
+    payload = decode_token(credentials.credentials)
+    issued_at = payload.get("iat")
+    if (
+        TOKEN_CLAIMS_TRUST_SECONDS > 0
+        and issued_at is not None
+        and "role" in payload
+        and datetime.now(timezone.utc).timestamp() - issued_at <= TOKEN_CLAIMS_TRUST_SECONDS
+    ):
+        return {"id": payload["sub"], "role": payload["role"], "approved": payload.get("approved", False)}
+    return await load_user(payload["sub"])
 
 # ==================== AUTH ROUTES ====================
 
@@ -273,14 +932,17 @@ async def register(user_create: UserCreate):
     
     # Create user
     user_dict = user_create.model_dump()
-    hashed_pwd = hash_password(user_dict.pop("password"))
-    user_dict["hashed_password"] = hashed_pwd
+    hashed_pwd = await hash_password(user_dict.pop("password"))
     
     user_obj = User(**user_dict)
     doc = user_obj.model_dump()
-    doc['created_at'] = doc['created_at'].isoformat()
+    doc['hashed_password'] = hashed_pwd
     
     await db.users.insert_one(doc)
+    await stats.increment(db, {
+        "total_users": 1,
+        "pending_approvals": int(user_obj.role == "alumni" and not user_obj.approved),
+    }, school_id=user_obj.school_id, mandal_id=user_obj.mandal_id)
     return user_obj
 
 @api_router.post("/auth/login", response_model=Token)
@@ -289,304 +951,807 @@ async def login(login_req: LoginRequest):
     if not user:
         raise HTTPException(status_code=401, detail="Invalid credentials")
     
-    if not verify_password(login_req.password, user.get("hashed_password", "")):
+    valid, new_hash = await verify_password(login_req.password, user.get("hashed_password", ""))
+    if not valid:
         raise HTTPException(status_code=401, detail="Invalid credentials")
+    if new_hash:
+        await db.users.update_one({"id": user["id"]}, {"$set": {"hashed_password": new_hash}})
     
     # Create token
-    access_token = create_access_token(data={"sub": user["id"]})
+    access_token = create_access_token(data={
+        "sub": user["id"],
+        "role": user.get("role"),
+        "approved": user.get("approved", False),
+    })
     
     # Remove sensitive data
     user.pop("hashed_password", None)
-    if isinstance(user.get('created_at'), str):
-        user['created_at'] = datetime.fromisoformat(user['created_at'])
     
     return {"access_token": access_token, "token_type": "bearer", "user": User(**user)}
 
 @api_router.get("/auth/me", response_model=User)
 async def get_me(current_user: dict = Depends(get_current_user)):
     current_user.pop("hashed_password", None)
-    if isinstance(current_user.get('created_at'), str):
-        current_user['created_at'] = datetime.fromisoformat(current_user['created_at'])
     return User(**current_user)
 
 # ==================== SCHOOL ROUTES ====================
 
 @api_router.post("/schools", response_model=School)
-async def create_school(school: SchoolCreate, current_user: dict = Depends(get_current_user)):
+async def create_school(school: SchoolCreate, current_user: dict = Depends(get_current_principal)):
     school_obj = School(**school.model_dump())
+    school_obj.updated_at = school_obj.created_at
     doc = school_obj.model_dump()
-    doc['created_at'] = doc['created_at'].isoformat()
     await db.schools.insert_one(doc)
+    await stats.increment(db, {"total_schools": 1}, school_id=school_obj.id, mandal_id=school_obj.mandal_id)
+    await response_cache.invalidate("schools")
+    search_index.add("school", doc)
     return school_obj
 
-@api_router.get("/schools", response_model=List[School])
-async def get_schools(mandal_id: Optional[str] = None, search: Optional[str] = None):
-    query = {}
-    if mandal_id:
-        query["mandal_id"] = mandal_id
-    if search:
-        query["name"] = {"$regex": search, "$options": "i"}
+@api_router.get("/schools", response_model=Page[SchoolSummary])
+async def get_schools(
+    request: Request,
+    mandal_id: Optional[str] = None,
+    search: Optional[str] = None,
+    view: type = Depends(fieldset(School, SchoolSummary)),
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+):
+    async def load():
+        query = {}
+        if mandal_id:
+            query["mandal_id"] = mandal_id
+        if search:
+            query["name"] = {"$regex": re.escape(search), "$options": "i"}
+    
+        page = await paginate(db.schools, query, "created_at", cursor, limit, model=view)
+        return render_page(view, page)
     
-    schools = await db.schools.find(query, {"_id": 0}).to_list(1000)
-    for school in schools:
-        if isinstance(school.get('created_at'), str):
-            school['created_at'] = datetime.fromisoformat(school['created_at'])
-    return schools
+    return await response_cache.respond(request, ["schools"], load, coalesce=True)
 
 @api_router.get("/schools/{school_id}", response_model=School)
-async def get_school(school_id: str):
-    school = await db.schools.find_one({"id": school_id}, {"_id": 0})
-    if not school:
-        raise HTTPException(status_code=404, detail="School not found")
-    if isinstance(school.get('created_at'), str):
-        school['created_at'] = datetime.fromisoformat(school['created_at'])
-    return School(**school)
+async def get_school(request: Request, school_id: str):
+    async def load():
+        school = await db.schools.find_one({"id": school_id}, {"_id": 0})
+        if not school:
+            raise HTTPException(status_code=404, detail="School not found")
+        return School(**school)
+    
+    return await response_cache.respond(request, ["schools"], load)
+
+@api_router.get("/schools/{school_id}/overview", response_model=SchoolOverview)
+async def get_school_overview(request: Request, school_id: str):
+    # One round trip for the school page: the sub-queries run concurrently,
+    # each with a projection down to what the cards render
+    async def load():
+        newest = [("created_at", DESCENDING), ("id", DESCENDING)]
+        school, counters, alumni, news, needs = await asyncio.gather(
+            db.schools.find_one({"id": school_id}, fast_json.projection(School)),
+            stats.get_counters(db, f"school:{school_id}"),
+            db.alumni.find({"school_id": school_id}, fast_json.projection(AlumniCard))
+            .sort(newest).limit(OVERVIEW_ITEMS).to_list(OVERVIEW_ITEMS),
+            db.news.find({"school_id": school_id}, fast_json.projection(NewsCard))
+            .sort(newest).limit(OVERVIEW_ITEMS).to_list(OVERVIEW_ITEMS),
+            db.school_needs.find({"school_id": school_id}, fast_json.projection(NeedSummary))
+            .sort(newest).limit(OVERVIEW_ITEMS).to_list(OVERVIEW_ITEMS),
+        )
+        if not school:
+            raise HTTPException(status_code=404, detail="School not found")
+        return SchoolOverview(
+            school=school,
+            counts=SchoolCounts(
+                alumni=counters["total_alumni"],
+                donations=counters["total_donations"],
+                donation_amount=counters["total_donation_amount"],
+            ),
+            alumni=alumni,
+            news=news,
+            needs=needs,
+        )
+    
+    return await response_cache.respond(request, ["schools", f"overview:{school_id}"], load)
 
 @api_router.put("/schools/{school_id}", response_model=School)
-async def update_school(school_id: str, school_update: SchoolCreate, current_user: dict = Depends(get_current_user)):
+async def update_school(school_id: str, school_update: SchoolCreate, current_user: dict = Depends(get_current_principal)):
     existing = await db.schools.find_one({"id": school_id}, {"_id": 0})
     if not existing:
         raise HTTPException(status_code=404, detail="School not found")
     
-    update_data = school_update.model_dump()
+    update_data = {**school_update.model_dump(), "updated_at": datetime.now(timezone.utc)}
     await db.schools.update_one({"id": school_id}, {"$set": update_data})
+    await response_cache.invalidate("schools")
+    if update_data["mandal_id"] != existing["mandal_id"]:
+        await stats.move_school(db, school_id, existing["mandal_id"], update_data["mandal_id"])
+        await sync_alumni_mandal(db, school_id, update_data["mandal_id"])
     
     updated_school = await db.schools.find_one({"id": school_id}, {"_id": 0})
-    if isinstance(updated_school.get('created_at'), str):
-        updated_school['created_at'] = datetime.fromisoformat(updated_school['created_at'])
+    search_index.add("school", updated_school)
     return School(**updated_school)
 
 # ==================== MANDAL ROUTES ====================
 
-@api_router.get("/mandals", response_model=List[Mandal])
-async def get_mandals():
-    mandals = await db.mandals.find({}, {"_id": 0}).to_list(100)
-    return mandals
+@api_router.get("/mandals", response_model=Page[Mandal])
+async def get_mandals(
+    request: Request,
+    view: type = Depends(fieldset(Mandal)),
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+):
+    async def load():
+        page = await paginate(db.mandals, {}, "name", cursor, limit, direction=1, model=view)
+        return render_page(view, page)
+    
+    return await response_cache.respond(request, ["mandals"], load)
 
 # ==================== ALUMNI ROUTES ====================
 
 @api_router.post("/alumni")
-async def create_alumni_profile(alumni_data: dict, current_user: dict = Depends(get_current_user)):
+async def create_alumni_profile(alumni_data: dict, current_user: dict = Depends(get_current_principal)):
     alumni_data["user_id"] = current_user["id"]
+    school = await db.schools.find_one({"id": alumni_data.get("school_id")}, {"_id": 0, "mandal_id": 1})
+    alumni_data["mandal_id"] = school.get("mandal_id") if school else None
     alumni_obj = Alumni(**alumni_data)
+    alumni_obj.updated_at = alumni_obj.created_at
     doc = alumni_obj.model_dump()
-    doc['created_at'] = doc['created_at'].isoformat()
-    await db.alumni.insert_one(doc)
+    try:
+        await db.alumni.insert_one(doc)
+    except DuplicateKeyError:
+        raise HTTPException(status_code=409, detail="Alumni profile already exists for this school")
+    await stats.increment(db, {"total_alumni": 1}, school_id=alumni_obj.school_id,
+                          mandal_id=alumni_obj.mandal_id)
+    await invalidate_overview(alumni_obj.school_id)
+    await response_cache.invalidate("alumni")
+    mentor_index.upsert(doc)
     return alumni_obj
 
-@api_router.get("/alumni")
-async def get_alumni(school_id: Optional[str] = None, batch_year: Optional[int] = None):
+@api_router.put("/alumni/{alumni_id}", response_model=Alumni)
+async def update_alumni_profile(alumni_id: str, alumni_update: AlumniUpdate, current_user: dict = Depends(get_current_principal)):
+    existing = await db.alumni.find_one({"id": alumni_id}, {"_id": 0})
+    if not existing:
+        raise HTTPException(status_code=404, detail="Alumni profile not found")
+    if existing["user_id"] != current_user["id"] and current_user.get("role") != "admin":
+        raise HTTPException(status_code=403, detail="Not authorized")
+    
+    update_data = {**alumni_update.model_dump(), "updated_at": datetime.now(timezone.utc)}
+    await db.alumni.update_one({"id": alumni_id}, {"$set": update_data})
+    await invalidate_overview(existing["school_id"])
+    await response_cache.invalidate("alumni")
+    
+    updated = {**existing, **update_data}
+    mentor_index.upsert(updated)
+    return Alumni(**updated)
+
+def alumni_filters(
+    school_id: Optional[str] = None,
+    mandal_id: Optional[str] = None,
+    batch_year: Optional[int] = None,
+    batch_from: Optional[int] = None,
+    batch_to: Optional[int] = None,
+    profession: Optional[str] = Query(None, max_length=100),
+    company: Optional[str] = Query(None, max_length=100),
+    willing_to_mentor: Optional[bool] = None,
+) -> dict:
     query = {}
     if school_id:
         query["school_id"] = school_id
+    if mandal_id:
+        query["mandal_id"] = mandal_id
     if batch_year:
         query["batch_year"] = batch_year
+    elif batch_from or batch_to:
+        query["batch_year"] = {}
+        if batch_from:
+            query["batch_year"]["$gte"] = batch_from
+        if batch_to:
+            query["batch_year"]["$lte"] = batch_to
+    if profession:
+        query["current_profession"] = {"$regex": re.escape(profession), "$options": "i"}
+    if company:
+        query["company"] = {"$regex": re.escape(company), "$options": "i"}
+    if willing_to_mentor is not None:
+        query["willing_to_mentor"] = willing_to_mentor
+    return query
+
+@api_router.get("/alumni", response_model=Page[Alumni])
+async def get_alumni(
+    query: dict = Depends(alumni_filters),
+    view: type = Depends(fieldset(Alumni)),
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+):
+    page = await paginate(db.alumni, query, "created_at", cursor, limit, model=view)
+    return page_response(view, page)
+
+@api_router.get("/alumni/facets", response_model=AlumniFacets)
+async def get_alumni_facets(request: Request, query: dict = Depends(alumni_filters)):
+    # Counts for the directory sidebar under the same filters as /alumni, in
+    # one aggregation; cached until an alumni profile is written
+    async def load():
+        def top(field: str, sort: dict, limit: int = FACET_LIMIT) -> list:
+            return [
+                {"$group": {"_id": f"${field}", "count": {"$sum": 1}}},
+                {"$match": {"_id": {"$ne": None}}},
+                {"$sort": sort},
+                {"$limit": limit},
+            ]
     
-    alumni = await db.alumni.find(query, {"_id": 0}).to_list(1000)
-    return alumni
+        pipeline = [
+            {"$match": query},
+            {"$facet": {
+                "total": [{"$count": "count"}],
+                "batch_years": top("batch_year", {"_id": -1}, limit=200),
+                "schools": top("school_id", {"count": -1, "_id": 1}),
+                "professions": top("current_profession", {"count": -1, "_id": 1}),
+            }},
+        ]
+        result = (await db.alumni.aggregate(pipeline).to_list(1))[0]
+        return AlumniFacets(
+            total=result["total"][0]["count"] if result["total"] else 0,
+            **{
+                facet: [FacetCount(value=row["_id"], count=row["count"]) for row in result[facet]]
+                for facet in ("batch_years", "schools", "professions")
+            },
+        )
+    
+    return await response_cache.respond(request, ["alumni"], load)
+
+async def sync_alumni_mandal(database, school_id: str, mandal_id: Optional[str]) -> int:
+    # alumni carry their school's mandal_id so the directory can filter on it
+    result = await database.alumni.update_many(
+        {"school_id": school_id, "mandal_id": {"$ne": mandal_id}},
+        {"$set": {"mandal_id": mandal_id, "updated_at": datetime.now(timezone.utc)}},
+    )
+    if result.modified_count:
+        await response_cache.invalidate("alumni")
+    return result.modified_count
 
 # ==================== EVENT ROUTES ====================
 
 @api_router.post("/events", response_model=Event)
-async def create_event(event: EventCreate, current_user: dict = Depends(get_current_user)):
+async def create_event(event: EventCreate, current_user: dict = Depends(get_current_principal)):
     event_dict = event.model_dump()
     event_dict["created_by"] = current_user["id"]
     event_obj = Event(**event_dict)
     doc = event_obj.model_dump()
-    doc['created_at'] = doc['created_at'].isoformat()
-    doc['event_date'] = doc['event_date'].isoformat()
     await db.events.insert_one(doc)
+    await response_cache.invalidate("events")
+    await notifier.publish(db, "event", event_obj.title, event_obj.id,
+                           school_id=event_obj.school_id, actor_id=current_user["id"],
+                           broadcast=current_user.get("role") == "admin")
     return event_obj
 
-@api_router.get("/events", response_model=List[Event])
-async def get_events(school_id: Optional[str] = None):
-    query = {}
-    if school_id:
-        query["school_id"] = school_id
+@api_router.get("/events", response_model=Page[Event])
+async def get_events(
+    request: Request,
+    school_id: Optional[str] = None,
+    view: type = Depends(fieldset(Event)),
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+):
+    async def load():
+        query = {}
+        if school_id:
+            query["school_id"] = school_id
+    
+        page = await paginate(db.events, query, "event_date", cursor, limit, model=view)
+        return render_page(view, page)
+    
+    return await response_cache.respond(request, ["events"], load, coalesce=True)
+
+@api_router.get("/events/mine", response_model=Page[Event])
+async def get_my_events(
+    current_user: dict = Depends(get_current_principal),
+    upcoming: bool = True,
+    view: type = Depends(fieldset(Event)),
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+):
+    # Soonest first over the user's RSVPs, then the events themselves by id
+    query = {"user_id": current_user["id"], "seated": True}
+    if upcoming:
+        query["event_date"] = {"$gte": datetime.now(timezone.utc)}
+    page = await paginate(db.event_rsvps, query, "event_date", cursor, limit, direction=1,
+                          projection={"_id": 0, "id": 1, "event_id": 1, "event_date": 1})
+    event_ids = [rsvp["event_id"] for rsvp in page["items"]]
+    events = {
+        event["id"]: event
+        async for event in db.events.find({"id": {"$in": event_ids}}, fast_json.projection(view))
+    }
+    page["items"] = [events[event_id] for event_id in event_ids if event_id in events]
+    return page_response(view, page)
+
+@api_router.post("/events/{event_id}/rsvp", response_model=EventRsvp)
+async def rsvp_event(event_id: str, current_user: dict = Depends(get_current_principal)):
+    event = await db.events.find_one({"id": event_id}, {"_id": 0, "event_date": 1})
+    if not event:
+        raise HTTPException(status_code=404, detail="Event not found")
+    
+    # The unique (event_id, user_id) index settles duplicates before any seat
+    # is taken, so a retried RSVP never counts twice
+    rsvp_obj = EventRsvp(event_id=event_id, user_id=current_user["id"], event_date=event["event_date"])
+    try:
+        await db.event_rsvps.insert_one(rsvp_obj.model_dump())
+    except DuplicateKeyError:
+        existing = await db.event_rsvps.find_one({"event_id": event_id, "user_id": current_user["id"]}, {"_id": 0})
+        if not existing or not existing.get("seated"):
+            # Gone: the concurrent attempt found the event full or was cancelled.
+            # Unseated: it is still racing for a seat and may yet lose it.
+            raise HTTPException(status_code=409, detail="Conflicting RSVP, please retry", headers={"Retry-After": "1"})
+        return EventRsvp(**existing)
     
-    events = await db.events.find(query, {"_id": 0}).sort("event_date", -1).to_list(100)
-    for event in events:
-        if isinstance(event.get('created_at'), str):
-            event['created_at'] = datetime.fromisoformat(event['created_at'])
-        if isinstance(event.get('event_date'), str):
-            event['event_date'] = datetime.fromisoformat(event['event_date'])
-    return events
+    # Take a seat only while rsvp_count < capacity, in one atomic update
+    seated = await db.events.find_one_and_update(
+        {"id": event_id, "$or": [{"capacity": None}, {"$expr": {"$lt": ["$rsvp_count", "$capacity"]}}]},
+        {"$inc": {"rsvp_count": 1}},
+        projection={"_id": 0, "id": 1},
+    )
+    if not seated:
+        await db.event_rsvps.delete_one({"id": rsvp_obj.id})
+        raise HTTPException(status_code=409, detail="Event is full")
+    marked = await db.event_rsvps.update_one({"id": rsvp_obj.id}, {"$set": {"seated": True}})
+    if not marked.matched_count:
+        # Cancelled while the seat was being taken; the cancel saw it unseated
+        await db.events.update_one({"id": event_id}, {"$inc": {"rsvp_count": -1}})
+        raise HTTPException(status_code=409, detail="RSVP was cancelled")
+    await response_cache.invalidate("events")
+    rsvp_obj.seated = True
+    return rsvp_obj
+
+@api_router.delete("/events/{event_id}/rsvp")
+async def cancel_rsvp(event_id: str, current_user: dict = Depends(get_current_principal)):
+    rsvp = await db.event_rsvps.find_one_and_delete(
+        {"event_id": event_id, "user_id": current_user["id"]}, projection={"_id": 0, "seated": 1},
+    )
+    if not rsvp:
+        raise HTTPException(status_code=404, detail="RSVP not found")
+    
+    # Only the request that removed a seated RSVP gives its seat back; an
+    # unseated one is handled by the RSVP still taking its seat
+    if rsvp["seated"]:
+        await db.events.update_one({"id": event_id}, {"$inc": {"rsvp_count": -1}})
+        await response_cache.invalidate("events")
+    return {"message": "RSVP cancelled"}
 
 # ==================== DONATION ROUTES ====================
 
+async def apply_to_need(need_id: str, amount: float) -> None:
+    # $inc keeps concurrent donations exact; the status filter lets exactly one
+    # of them flip the need to fulfilled once the target is reached
+    need = await db.school_needs.find_one_and_update(
+        {"id": need_id},
+        {"$inc": {"raised_amount": amount}},
+        projection={"_id": 0, "raised_amount": 1, "target_amount": 1, "status": 1},
+        return_document=ReturnDocument.AFTER,
+    )
+    if need and need["status"] == "active" and need.get("target_amount") is not None \
+            and need["raised_amount"] >= need["target_amount"]:
+        await db.school_needs.update_one(
+            {"id": need_id, "status": "active"},
+            {"$set": {"status": "fulfilled", "fulfilled_at": datetime.now(timezone.utc)}},
+        )
+
 @api_router.post("/donations", response_model=Donation)
-async def create_donation(donation: DonationCreate):
+async def create_donation(
+    donation: DonationCreate,
+    idempotency_key: Optional[str] = Header(None, max_length=200),
+):
+    if donation.need_id:
+        need = await db.school_needs.find_one({"id": donation.need_id}, {"_id": 0, "school_id": 1, "status": 1})
+        if not need:
+            raise HTTPException(status_code=404, detail="School need not found")
+        if need["status"] == "closed":
+            raise HTTPException(status_code=409, detail="School need is closed")
+        if donation.school_id and donation.school_id != need["school_id"]:
+            raise HTTPException(status_code=422, detail="need_id belongs to a different school")
+        donation.school_id = need["school_id"]
+    
     # In real implementation, integrate with Razorpay
     donation_obj = Donation(**donation.model_dump())
     doc = donation_obj.model_dump()
-    doc['created_at'] = doc['created_at'].isoformat()
     doc['payment_status'] = 'completed'  # Mocked as completed
     doc['transaction_id'] = f"TXN{uuid.uuid4().hex[:12].upper()}"
-    await db.donations.insert_one(doc)
+    if idempotency_key:
+        doc['idempotency_key'] = idempotency_key
+    try:
+        await db.donations.insert_one(doc)
+    except DuplicateKeyError:
+        # A retry: the unique index let only the first request through, and
+        # only that request applies the totals below
+        existing = await db.donations.find_one({"idempotency_key": idempotency_key}, {"_id": 0})
+        if existing is None:
+            raise
+        if (existing["amount"], existing.get("school_id"), existing.get("need_id")) != \
+                (doc["amount"], doc["school_id"], doc["need_id"]):
+            raise HTTPException(status_code=409, detail="Idempotency-Key was already used for a different donation")
+        return Donation(**existing)
+    
+    completed_amount = doc['amount'] if doc['payment_status'] == 'completed' else 0
+    if doc['need_id'] and completed_amount:
+        await apply_to_need(doc['need_id'], completed_amount)
+    mandal_id = await stats.mandal_for_school(db, doc['school_id'])
+    await stats.increment(db, {
+        "total_donations": 1,
+        "total_donation_amount": completed_amount,
+    }, school_id=doc['school_id'], mandal_id=mandal_id)
+    await analytics.record_donation(db, doc, mandal_id)
+    await invalidate_overview(doc['school_id'])
     return donation_obj
 
-@api_router.get("/donations", response_model=List[Donation])
-async def get_donations(school_id: Optional[str] = None):
+@api_router.get("/donations", response_model=Page[Donation])
+async def get_donations(
+    school_id: Optional[str] = None,
+    need_id: Optional[str] = None,
+    view: type = Depends(fieldset(Donation)),
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+):
     query = {}
     if school_id:
         query["school_id"] = school_id
+    if need_id:
+        query["need_id"] = need_id
     
-    donations = await db.donations.find(query, {"_id": 0}).sort("created_at", -1).to_list(100)
-    for donation in donations:
-        if isinstance(donation.get('created_at'), str):
-            donation['created_at'] = datetime.fromisoformat(donation['created_at'])
-    return donations
+    page = await paginate(db.donations, query, "created_at", cursor, limit, model=view)
+    return page_response(view, page)
 
 # ==================== FORUM ROUTES ====================
 
 @api_router.post("/forums/posts", response_model=ForumPost)
-async def create_forum_post(post: ForumPostCreate, current_user: dict = Depends(get_current_user)):
+async def create_forum_post(post: ForumPostCreate, current_user: dict = Depends(get_current_principal)):
     post_dict = post.model_dump()
     post_dict["author_id"] = current_user["id"]
     post_obj = ForumPost(**post_dict)
     doc = post_obj.model_dump()
-    doc['created_at'] = doc['created_at'].isoformat()
+    doc.update(hot_ranker.initial(post_obj.created_at))
+    post_obj.hot_score = doc["hot_score"]
     await db.forum_posts.insert_one(doc)
+    search_index.add("forum_post", doc)
     return post_obj
 
-@api_router.get("/forums/posts", response_model=List[ForumPost])
-async def get_forum_posts(school_id: Optional[str] = None, category: Optional[str] = None):
+@api_router.get("/forums/posts", response_model=Page[ForumPost])
+async def get_forum_posts(
+    school_id: Optional[str] = None,
+    category: Optional[str] = None,
+    sort: str = Query("new", pattern="^(new|hot)$"),
+    view: type = Depends(fieldset(ForumPost)),
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+):
     query = {}
     if school_id:
         query["school_id"] = school_id
     if category:
         query["category"] = category
     
-    posts = await db.forum_posts.find(query, {"_id": 0}).sort("created_at", -1).to_list(100)
-    for post in posts:
-        if isinstance(post.get('created_at'), str):
-            post['created_at'] = datetime.fromisoformat(post['created_at'])
-    return posts
+    # hot_score is indexed and kept current by hot_ranker, so both orders are index seeks
+    sort_key = "hot_score" if sort == "hot" else "created_at"
+    page = await paginate(db.forum_posts, query, sort_key, cursor, limit, model=view)
+    return page_response(view, page)
+
+@api_router.post("/forums/posts/{post_id}/replies", response_model=ForumReply)
+async def create_forum_reply(post_id: str, reply: ForumReplyCreate, current_user: dict = Depends(get_current_principal)):
+    if reply.parent_id:
+        parent = await db.forum_replies.find_one({"id": reply.parent_id}, {"_id": 0, "post_id": 1})
+        if not parent or parent["post_id"] != post_id:
+            raise HTTPException(status_code=422, detail="parent_id is not a reply in this thread")
+    
+    reply_obj = ForumReply(**reply.model_dump(), post_id=post_id, author_id=current_user["id"])
+    # Count first: a concurrent reply can never be lost, and a missing post stops here
+    post = await db.forum_posts.find_one_and_update(
+        {"id": post_id},
+        {"$inc": {"replies_count": 1}, "$max": {"last_reply_at": reply_obj.created_at}, "$set": {"hot_dirty": True}},
+        projection={"_id": 0, "id": 1},
+    )
+    if not post:
+        raise HTTPException(status_code=404, detail="Post not found")
+    try:
+        await db.forum_replies.insert_one(reply_obj.model_dump())
+    except Exception:
+        await db.forum_posts.update_one({"id": post_id}, {"$inc": {"replies_count": -1}})
+        raise
+    return reply_obj
+
+@api_router.get("/forums/posts/{post_id}/replies", response_model=Page[ForumReply])
+async def get_forum_replies(
+    post_id: str,
+    view: type = Depends(fieldset(ForumReply)),
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+):
+    # Oldest first, so a thread reads top to bottom
+    page = await paginate(db.forum_replies, {"post_id": post_id}, "created_at", cursor, limit,
+                          direction=1, model=view)
+    return page_response(view, page)
 
 # ==================== BULLETIN ROUTES ====================
 
 @api_router.post("/bulletins", response_model=Bulletin)
-async def create_bulletin(bulletin: BulletinCreate, current_user: dict = Depends(get_current_user)):
+async def create_bulletin(bulletin: BulletinCreate, current_user: dict = Depends(get_current_principal)):
     bulletin_dict = bulletin.model_dump()
     bulletin_dict["created_by"] = current_user["id"]
     bulletin_obj = Bulletin(**bulletin_dict)
     doc = bulletin_obj.model_dump()
-    doc['created_at'] = doc['created_at'].isoformat()
     await db.bulletins.insert_one(doc)
+    await response_cache.invalidate("bulletins")
+    search_index.add("bulletin", doc)
+    await notifier.publish(db, "bulletin", bulletin_obj.title, bulletin_obj.id,
+                           school_id=bulletin_obj.school_id, actor_id=current_user["id"],
+                           broadcast=current_user.get("role") == "admin")
     return bulletin_obj
 
-@api_router.get("/bulletins", response_model=List[Bulletin])
-async def get_bulletins(school_id: Optional[str] = None):
-    query = {}
-    if school_id:
-        query["school_id"] = school_id
+@api_router.get("/bulletins", response_model=Page[BulletinSummary])
+async def get_bulletins(
+    request: Request,
+    school_id: Optional[str] = None,
+    view: type = Depends(fieldset(Bulletin, BulletinSummary)),
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+):
+    async def load():
+        query = {}
+        if school_id:
+            query["school_id"] = school_id
     
-    bulletins = await db.bulletins.find(query, {"_id": 0}).sort("created_at", -1).to_list(50)
-    for bulletin in bulletins:
-        if isinstance(bulletin.get('created_at'), str):
-            bulletin['created_at'] = datetime.fromisoformat(bulletin['created_at'])
-    return bulletins
+        page = await paginate(db.bulletins, query, "created_at", cursor, limit, model=view)
+        return render_page(view, page)
+    
+    return await response_cache.respond(request, ["bulletins"], load, coalesce=True)
 
 # ==================== NEWS ROUTES ====================
 
 @api_router.post("/news", response_model=News)
-async def create_news(news: NewsCreate, current_user: dict = Depends(get_current_user)):
+async def create_news(news: NewsCreate, current_user: dict = Depends(get_current_principal)):
     news_dict = news.model_dump()
     news_dict["created_by"] = current_user["id"]
     news_obj = News(**news_dict)
     doc = news_obj.model_dump()
-    doc['created_at'] = doc['created_at'].isoformat()
     await db.news.insert_one(doc)
+    await response_cache.invalidate("news")
+    await invalidate_overview(news_obj.school_id)
+    search_index.add("news", doc)
+    await notifier.publish(db, "news", news_obj.title, news_obj.id,
+                           school_id=news_obj.school_id, actor_id=current_user["id"],
+                           broadcast=current_user.get("role") == "admin")
     return news_obj
 
-@api_router.get("/news", response_model=List[News])
-async def get_news(school_id: Optional[str] = None):
-    query = {}
-    if school_id:
-        query["school_id"] = school_id
+@api_router.get("/news", response_model=Page[NewsSummary])
+async def get_news(
+    request: Request,
+    school_id: Optional[str] = None,
+    view: type = Depends(fieldset(News, NewsSummary)),
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+):
+    async def load():
+        query = {}
+        if school_id:
+            query["school_id"] = school_id
+    
+        page = await paginate(db.news, query, "created_at", cursor, limit, model=view)
+        return render_page(view, page)
     
-    news_list = await db.news.find(query, {"_id": 0}).sort("created_at", -1).to_list(50)
-    for news_item in news_list:
-        if isinstance(news_item.get('created_at'), str):
-            news_item['created_at'] = datetime.fromisoformat(news_item['created_at'])
-    return news_list
+    return await response_cache.respond(request, ["news"], load)
 
 # ==================== GALLERY ROUTES ====================
 
 @api_router.post("/galleries", response_model=Gallery)
-async def create_gallery(gallery: GalleryCreate, current_user: dict = Depends(get_current_user)):
+async def create_gallery(gallery: GalleryCreate, current_user: dict = Depends(get_current_principal)):
     gallery_dict = gallery.model_dump()
     gallery_dict["created_by"] = current_user["id"]
     gallery_obj = Gallery(**gallery_dict)
     doc = gallery_obj.model_dump()
-    doc['created_at'] = doc['created_at'].isoformat()
     await db.galleries.insert_one(doc)
     return gallery_obj
 
-@api_router.get("/galleries", response_model=List[Gallery])
-async def get_galleries(school_id: Optional[str] = None):
+@api_router.get("/galleries", response_model=Page[GallerySummary])
+async def get_galleries(
+    school_id: Optional[str] = None,
+    view: type = Depends(fieldset(Gallery, GallerySummary)),
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+):
     query = {}
     if school_id:
         query["school_id"] = school_id
     
-    galleries = await db.galleries.find(query, {"_id": 0}).sort("created_at", -1).to_list(100)
-    for gallery in galleries:
-        if isinstance(gallery.get('created_at'), str):
-            gallery['created_at'] = datetime.fromisoformat(gallery['created_at'])
-    return galleries
+    page = await paginate(db.galleries, query, "created_at", cursor, limit, model=view)
+    return page_response(view, page)
+
+@api_router.post("/galleries/{gallery_id}/photos", response_model=Gallery)
+async def upload_gallery_photos(
+    gallery_id: str,
+    files: List[UploadFile] = File(...),
+    current_user: dict = Depends(get_current_principal),
+):
+    gallery = await db.galleries.find_one({"id": gallery_id}, {"_id": 0, "created_by": 1})
+    if not gallery:
+        raise HTTPException(status_code=404, detail="Gallery not found")
+    if gallery["created_by"] != current_user["id"] and current_user.get("role") not in ["admin", "meo"]:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    
+    photos = []
+    for upload in files:
+        try:
+            photos.append(GalleryPhoto(**await media_store.ingest(upload.file)).model_dump())
+        except InvalidImage as exc:
+            raise HTTPException(status_code=422, detail=f"{upload.filename}: {exc}")
+    # Renditions are deterministic per hash, so re-uploading a photo is a no-op
+    updated = await db.galleries.find_one_and_update(
+        {"id": gallery_id},
+        {"$addToSet": {"photos": {"$each": photos}}},
+        projection={"_id": 0},
+        return_document=ReturnDocument.AFTER,
+    )
+    return Gallery(**updated)
+
+@api_router.get("/media/{digest}/{name}")
+async def get_media(digest: str, name: str, request: Request):
+    return await media_store.serve(request, digest, name)
 
 # ==================== SCHOOL NEEDS ROUTES ====================
 
 @api_router.post("/school-needs", response_model=SchoolNeed)
-async def create_school_need(need: SchoolNeedCreate, current_user: dict = Depends(get_current_user)):
+async def create_school_need(need: SchoolNeedCreate, current_user: dict = Depends(get_current_principal)):
     need_obj = SchoolNeed(**need.model_dump())
     doc = need_obj.model_dump()
-    doc['created_at'] = doc['created_at'].isoformat()
     await db.school_needs.insert_one(doc)
+    await invalidate_overview(need_obj.school_id)
+    await notifier.publish(db, "school_need", need_obj.title, need_obj.id,
+                           school_id=need_obj.school_id, actor_id=current_user["id"])
     return need_obj
 
-@api_router.get("/school-needs", response_model=List[SchoolNeed])
-async def get_school_needs(school_id: Optional[str] = None, status: Optional[str] = None):
+@api_router.get("/school-needs", response_model=Page[SchoolNeed])
+async def get_school_needs(
+    school_id: Optional[str] = None,
+    status: Optional[str] = None,
+    view: type = Depends(fieldset(SchoolNeed)),
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+):
     query = {}
     if school_id:
         query["school_id"] = school_id
     if status:
         query["status"] = status
     
-    needs = await db.school_needs.find(query, {"_id": 0}).sort("created_at", -1).to_list(100)
-    for need in needs:
-        if isinstance(need.get('created_at'), str):
-            need['created_at'] = datetime.fromisoformat(need['created_at'])
-    return needs
+    page = await paginate(db.school_needs, query, "created_at", cursor, limit, model=view)
+    return page_response(view, page)
+
+# ==================== SEARCH ROUTES ====================
+
+@api_router.get("/search", response_model=SearchResults)
+async def search_content(
+    q: str = Query(..., min_length=1, max_length=200),
+    doc_type: Optional[str] = Query(None, alias="type", description="Comma-separated: " + ",".join(SEARCHABLE)),
+    school_id: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+):
+    types = doc_type.split(",") if doc_type else None
+    if types and not set(types) <= set(SEARCHABLE):
+        raise HTTPException(status_code=400, detail=f"type must be one of: {', '.join(SEARCHABLE)}")
+    
+    return {"items": search_index.search(q, types=types, school_id=school_id, limit=limit)}
 
 # ==================== ADMIN ROUTES ====================
 
 @api_router.get("/admin/stats")
-async def get_admin_stats(current_user: dict = Depends(get_current_user)):
+async def get_admin_stats(
+    current_user: dict = Depends(get_current_principal),
+    school_id: Optional[str] = None,
+    mandal_id: Optional[str] = None,
+):
     # Only admins can access
     if current_user.get("role") not in ["admin", "meo"]:
         raise HTTPException(status_code=403, detail="Not authorized")
     
-    total_schools = await db.schools.count_documents({})
-    total_users = await db.users.count_documents({})
-    total_alumni = await db.alumni.count_documents({})
-    total_donations = await db.donations.count_documents({})
+    # Counters are maintained by the write paths; see stats.py
+    if school_id:
+        return await stats.get_counters(db, f"school:{school_id}")
+    if mandal_id:
+        return await stats.get_counters(db, f"mandal:{mandal_id}")
+    return await stats.get_counters(db)
+
+@api_router.post("/admin/stats/reconcile")
+async def reconcile_admin_stats(current_user: dict = Depends(get_current_principal)):
+    if current_user.get("role") != "admin":
+        raise HTTPException(status_code=403, detail="Not authorized")
+    
+    rebuilt = await stats.reconcile_stats(db)
+    return {"message": f"Rebuilt {rebuilt} stats documents"}
+
+@api_router.get("/admin/analytics/donations", response_model=DonationAnalytics)
+async def get_donation_analytics(
+    current_user: dict = Depends(get_current_principal),
+    granularity: str = Query("day", pattern="^(day|month)$"),
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    school_id: Optional[str] = None,
+    mandal_id: Optional[str] = None,
+    purpose: Optional[str] = None,
+    window: int = Query(7, ge=1, le=90),
+):
+    if current_user.get("role") not in ["admin", "meo"]:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    
+    # Defaults to the last year; buckets are maintained by create_donation, see analytics.py
+    end = analytics.utc(end) if end else datetime.now(timezone.utc)
+    start = analytics.utc(start) if start else end - timedelta(days=365)
+    if start >= end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+    if analytics.periods(start, end, granularity)[1] > analytics.MAX_PERIODS[granularity]:
+        raise HTTPException(status_code=400, detail=f"At most {analytics.MAX_PERIODS[granularity]} {granularity} periods")
     
-    # Calculate total donation amount
-    donations = await db.donations.find({"payment_status": "completed"}, {"_id": 0}).to_list(10000)
-    total_amount = sum(d.get("amount", 0) for d in donations)
+    scope = stats.GLOBAL_KEY
+    if school_id:
+        scope = f"school:{school_id}"
+    elif mandal_id:
+        scope = f"mandal:{mandal_id}"
+    result = await analytics.series(db, scope, granularity, start, end, purpose=purpose, window=window)
+    return DonationAnalytics(
+        scope=scope,
+        granularity=granularity,
+        start=start,
+        end=end,
+        window=window,
+        totals=DonationTotals(count=result["total_count"], amount=result["total_amount"]),
+        by_purpose={name: DonationTotals(count=c, amount=a) for name, (c, a) in result["by_purpose"].items()},
+        series=[
+            DonationPoint(period=period, count=c, amount=a, moving_average=m)
+            for period, c, a, m in zip(result["periods"], result["counts"], result["amounts"], result["moving_average"])
+        ],
+    )
+
+@api_router.post("/admin/analytics/donations/rebuild")
+async def rebuild_donation_analytics(current_user: dict = Depends(get_current_principal)):
+    if current_user.get("role") != "admin":
+        raise HTTPException(status_code=403, detail="Not authorized")
+    
+    try:
+        rebuilt = await analytics.rebuild_buckets(db)
+    except analytics.UnmigratedTimestamps as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
+    return {"message": f"Rebuilt {rebuilt} donation buckets"}
+
+@api_router.get("/admin/runtime")
+async def get_runtime_stats(current_user: dict = Depends(get_current_principal)):
+    if current_user.get("role") not in ["admin", "meo"]:
+        raise HTTPException(status_code=403, detail="Not authorized")
     
     return {
-        "total_schools": total_schools,
-        "total_users": total_users,
-        "total_alumni": total_alumni,
-        "total_donations": total_donations,
-        "total_donation_amount": total_amount,
-        "pending_approvals": await db.users.count_documents({"approved": False, "role": "alumni"})
+        "user_cache": user_cache.stats(),
+        "password_hasher": password_hasher.stats(),
+        "response_cache": response_cache.stats(),
+        "notifier": notifier.stats(),
+        "chat": chat.stats(),
+        "mentor_index": {"mentors": len(mentor_index), "rows": mentor_index.size},
+        "media": media_store.stats(),
+        "hot_ranker": hot_ranker.stats(),
     }
 
-@api_router.get("/admin/users")
-async def get_all_users(current_user: dict = Depends(get_current_user), role: Optional[str] = None):
+@api_router.put("/admin/metrics")
+async def update_metrics_settings(settings: MetricsSettings, current_user: dict = Depends(get_current_principal)):
+    if current_user.get("role") != "admin":
+        raise HTTPException(status_code=403, detail="Not authorized")
+    
+    metrics_registry.enabled = settings.enabled
+    if settings.slow_query_ms is not None:
+        command_metrics.slow_ms = settings.slow_query_ms
+    return {"enabled": metrics_registry.enabled, "slow_query_ms": command_metrics.slow_ms}
+
+@api_router.get("/metrics")
+async def get_metrics(authorization: Optional[str] = Header(None)):
+    # Prometheus scrapes with a static bearer token when METRICS_TOKEN is set
+    if METRICS_TOKEN and not hmac.compare_digest(authorization or "", f"Bearer {METRICS_TOKEN}"):
+        raise HTTPException(status_code=401, detail="Invalid metrics token")
+    return Response(metrics_registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@api_router.get("/admin/users", response_model=Page[User])
+async def get_all_users(
+    current_user: dict = Depends(get_current_principal),
+    role: Optional[str] = None,
+    view: type = Depends(fieldset(User)),
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+):
     if current_user.get("role") not in ["admin", "meo"]:
         raise HTTPException(status_code=403, detail="Not authorized")
     
@@ -594,40 +1759,272 @@ async def get_all_users(current_user: dict = Depends(get_current_user), role: Op
     if role:
         query["role"] = role
     
-    users = await db.users.find(query, {"_id": 0, "hashed_password": 0}).to_list(1000)
-    return users
+    page = await paginate(db.users, query, "created_at", cursor, limit, model=view)
+    return page_response(view, page)
 
 @api_router.put("/admin/users/{user_id}/approve")
-async def approve_user(user_id: str, current_user: dict = Depends(get_current_user)):
+async def approve_user(user_id: str, current_user: dict = Depends(get_current_principal)):
     if current_user.get("role") not in ["admin", "meo"]:
         raise HTTPException(status_code=403, detail="Not authorized")
     
-    result = await db.users.update_one({"id": user_id}, {"$set": {"approved": True}})
-    if result.modified_count == 0:
-        raise HTTPException(status_code=404, detail="User not found")
+    # Only flip unapproved users so pending_approvals is decremented exactly once
+    user = await db.users.find_one_and_update(
+        {"id": user_id, "approved": False},
+        {"$set": {"approved": True}},
+        projection={"_id": 0, "role": 1, "school_id": 1, "mandal_id": 1},
+    )
+    if user is None:
+        # Approving twice is a no-op; only a user that does not exist is an error
+        if not await db.users.count_documents({"id": user_id}, limit=1):
+            raise HTTPException(status_code=404, detail="User not found")
+        return {"message": "User approved successfully"}
+    
+    user_cache.invalidate(user_id)
+    if user.get("role") == "alumni":
+        await stats.increment(db, {"pending_approvals": -1},
+                              school_id=user.get("school_id"), mandal_id=user.get("mandal_id"))
     
     return {"message": "User approved successfully"}
 
-# ==================== PLACEHOLDER ROUTES ====================
-
-@api_router.get("/chat/conversations")
-async def get_conversations(current_user: dict = Depends(get_current_user)):
-    # Placeholder for chat functionality
-    return {"message": "Chat feature - Coming soon", "conversations": []}
-
-@api_router.get("/mentors")
-async def get_mentors(school_id: Optional[str] = None):
-    # Placeholder for mentoring system
-    return {"message": "Mentoring feature - Coming soon", "mentors": []}
+EXPORTS = {
+    "users": ("users", User),
+    "donations": ("donations", Donation),
+    "alumni": ("alumni", Alumni),
+}
+
+@api_router.get("/admin/export/{kind}")
+async def export_records(
+    kind: str,
+    fmt: str = Query("csv", alias="format"),
+    school_id: Optional[str] = None,
+    mandal_id: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    current_user: dict = Depends(get_current_principal),
+):
+    if current_user.get("role") not in ["admin", "meo"]:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    if kind not in EXPORTS:
+        raise HTTPException(status_code=404, detail="Unknown export kind")
+    if fmt not in exports.FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {', '.join(exports.FORMATS)}")
+    
+    collection, model = EXPORTS[kind]
+    query = {}
+    if school_id:
+        query["school_id"] = school_id
+    elif mandal_id:
+        if kind == "users":
+            query["mandal_id"] = mandal_id
+        else:
+            # donations and alumni only carry school_id
+            school_ids = await db.schools.distinct("id", {"mandal_id": mandal_id})
+            query["school_id"] = {"$in": school_ids}
+    if created_from or created_to:
+        query["created_at"] = {}
+        if created_from:
+            query["created_at"]["$gte"] = created_from
+        if created_to:
+            query["created_at"]["$lt"] = created_to
+    
+    # Oldest first, walking the same (prefix, created_at, id) indexes as the
+    # list routes; the cursor fetches EXPORT_BATCH_SIZE documents per round trip
+    cursor = (
+        db[collection].find(query, fast_json.projection(model))
+        .sort([("created_at", ASCENDING), ("id", ASCENDING)])
+        .batch_size(exports.EXPORT_BATCH_SIZE)
+    )
+    filename = f"{kind}-{datetime.now(timezone.utc):%Y%m%d}.{fmt}"
+    return StreamingResponse(
+        exports.encode(cursor, list(model.model_fields), fmt),
+        media_type=exports.MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+async def after_school_import(database, written: list) -> None:
+    await stats.increment_many(database, [
+        ({"total_schools": 1}, doc["id"], doc["mandal_id"]) for doc, inserted, _ in written if inserted
+    ])
+    for doc, _, stored in written:
+        if stored and stored.get("mandal_id") != doc["mandal_id"]:
+            await stats.move_school(database, doc["id"], stored.get("mandal_id"), doc["mandal_id"])
+            await sync_alumni_mandal(database, doc["id"], doc["mandal_id"])
+        search_index.add("school", doc)
+    await response_cache.invalidate("schools")
+
+async def after_alumni_import(database, written: list) -> None:
+    await stats.increment_many(database, [
+        ({"total_alumni": 1}, doc["school_id"], None) for doc, inserted, _ in written if inserted
+    ])
+    school_ids = {doc["school_id"] for doc, _, _ in written}
+    async for school in database.schools.find({"id": {"$in": list(school_ids)}}, {"_id": 0, "id": 1, "mandal_id": 1}):
+        await sync_alumni_mandal(database, school["id"], school.get("mandal_id"))
+    for school_id in school_ids:
+        await invalidate_overview(school_id)
+    await response_cache.invalidate("alumni")
+    for doc, _, _ in written:
+        mentor_index.upsert(doc)
+
+IMPORTS = {
+    "schools": bulk_import.ImportKind("schools", SchoolImportRow, ("udise_code",), after_school_import),
+    "alumni": bulk_import.ImportKind("alumni", AlumniImportRow, ("school_id", "user_id"), after_alumni_import,
+                                     references=(("school_id", "schools"), ("user_id", "users"))),
+}
+
+@api_router.post("/admin/import/{kind}")
+async def import_records(
+    kind: str,
+    request: Request,
+    fmt: Optional[str] = Query(None, alias="format"),
+    current_user: dict = Depends(get_current_principal),
+):
+    if current_user.get("role") != "admin":
+        raise HTTPException(status_code=403, detail="Not authorized")
+    if kind not in IMPORTS:
+        raise HTTPException(status_code=404, detail="Unknown import kind")
+    
+    # The raw request body is streamed, e.g. curl --data-binary @schools.csv
+    if fmt is None:
+        fmt = "ndjson" if "json" in request.headers.get("content-type", "") else "csv"
+    if fmt not in bulk_import.FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {', '.join(bulk_import.FORMATS)}")
+    
+    return await bulk_import.import_rows(db, IMPORTS[kind], request.stream(), fmt)
+
+# ==================== NOTIFICATION ROUTES ====================
+
+@api_router.get("/notifications", response_model=Page[Notification])
+async def get_notifications(
+    current_user: dict = Depends(get_current_principal),
+    unread: bool = False,
+    view: type = Depends(fieldset(Notification)),
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+):
+    query = {"user_id": current_user["id"]}
+    if unread:
+        query["read"] = False
+    
+    page = await paginate(db.notifications, query, "created_at", cursor, limit, model=view)
+    return page_response(view, page)
+
+@api_router.get("/notifications/unread-count")
+async def get_unread_count(current_user: dict = Depends(get_current_principal)):
+    return {"unread": await notifier.unread_count(db, current_user["id"])}
+
+@api_router.post("/notifications/read-all")
+async def mark_all_notifications_read(current_user: dict = Depends(get_current_principal)):
+    marked = await notifier.mark_all_read(db, current_user["id"])
+    return {"message": f"Marked {marked} notifications as read"}
+
+@api_router.post("/notifications/{notification_id}/read")
+async def mark_notification_read(notification_id: str, current_user: dict = Depends(get_current_principal)):
+    if not await notifier.mark_read(db, current_user["id"], notification_id):
+        # Already read is fine; only a notification this user never got is an error
+        if not await db.notifications.count_documents({"id": notification_id, "user_id": current_user["id"]}, limit=1):
+            raise HTTPException(status_code=404, detail="Notification not found")
+    return {"message": "Notification marked as read"}
+
+# ==================== CHAT ROUTES ====================
+
+@api_router.post("/chat/conversations", response_model=Conversation)
+async def create_conversation(conversation: ConversationCreate, current_user: dict = Depends(get_current_principal)):
+    members = sorted(set(conversation.member_ids) | {current_user["id"]})
+    if len(members) < 2:
+        raise HTTPException(status_code=400, detail="A conversation needs at least one other member")
+    if await db.users.count_documents({"id": {"$in": members}}) != len(members):
+        raise HTTPException(status_code=400, detail="Unknown member")
+    
+    conversation_obj = Conversation(
+        type="direct" if len(members) == 2 and not conversation.title else "group",
+        title=conversation.title,
+        members=members,
+        created_by=current_user["id"],
+    )
+    doc = conversation_obj.model_dump()
+    if conversation_obj.type == "direct":
+        # One direct conversation per pair; creating it again returns the existing one
+        doc["direct_key"] = ":".join(members)
+        existing = await db.conversations.find_one({"direct_key": doc["direct_key"]}, {"_id": 0})
+        if existing:
+            return Conversation(**existing)
+    try:
+        await db.conversations.insert_one(doc)
+    except DuplicateKeyError:
+        # A concurrent create for the same pair won the insert; hand back its conversation
+        existing = await db.conversations.find_one({"direct_key": doc["direct_key"]}, {"_id": 0})
+        return Conversation(**existing)
+    return conversation_obj
+
+@api_router.get("/chat/conversations", response_model=Page[Conversation])
+async def get_conversations(
+    current_user: dict = Depends(get_current_principal),
+    view: type = Depends(fieldset(Conversation)),
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+):
+    # Most recently active first
+    page = await paginate(db.conversations, {"members": current_user["id"]}, "last_message_at", cursor, limit,
+                          model=view)
+    return page_response(view, page)
+
+@api_router.get("/chat/conversations/{conversation_id}/messages", response_model=Page[ChatMessage])
+async def get_chat_messages(
+    conversation_id: str,
+    current_user: dict = Depends(get_current_principal),
+    view: type = Depends(fieldset(ChatMessage)),
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+):
+    members = await chat.members(conversation_id)
+    if members is None or current_user["id"] not in members:
+        raise HTTPException(status_code=404, detail="Conversation not found")
+    
+    # Newest first; messages are persisted in batches, see chat.py
+    page = await paginate(db.chat_messages, {"conversation_id": conversation_id}, "created_at", cursor, limit,
+                          model=view)
+    return page_response(view, page)
+
+@api_router.websocket("/chat/ws")
+async def chat_socket(websocket: WebSocket, token: str):
+    # Browsers cannot set headers on a WebSocket, so the JWT comes as ?token=
+    try:
+        user = await load_user(decode_token(token)["sub"])
+    except HTTPException:
+        await websocket.close(code=4401)
+        return
+    
+    await websocket.accept()
+    await chat.serve(websocket, user["id"])
+
+# ==================== MENTOR ROUTES ====================
+
+@api_router.get("/mentors", response_model=MentorMatches)
+async def get_mentors(
+    school_id: Optional[str] = None,
+    mandal_id: Optional[str] = None,
+    interests: Optional[str] = Query(None, description="Comma-separated fields of interest"),
+    batch_year: Optional[int] = None,
+    limit: int = Query(10, ge=1, le=50),
+    current_user: dict = Depends(get_current_user),
+):
+    # Defaults to the requester's own profile; never suggests the requester
+    items = mentor_index.match(
+        school_id=school_id or current_user.get("school_id"),
+        mandal_id=mandal_id or current_user.get("mandal_id"),
+        interests=interests.split(",") if interests else (),
+        batch_year=batch_year or current_user.get("batch_year"),
+        exclude_user_id=current_user["id"],
+        limit=limit,
+    )
+    return {"items": items}
 
-@api_router.get("/notifications")
-async def get_notifications(current_user: dict = Depends(get_current_user)):
-    # Placeholder for notifications
-    return {"message": "Notification system - Coming soon", "notifications": []}
 
 # Include the router
 app.include_router(api_router)
 
+app.add_middleware(MetricsMiddleware, registry=metrics_registry)
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
@@ -642,6 +2039,96 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Long-running tasks started at startup, cancelled at shutdown
+background_tasks = set()
+
+@app.on_event("startup")
+async def create_indexes():
+    await ensure_indexes(db)
+    # Seed the counters once for databases that predate the stats collection
+    if await db.stats.count_documents({"_id": stats.GLOBAL_KEY}, limit=1) == 0:
+        await stats.reconcile_stats(db)
+    # Donation buckets are not seeded here: several workers rebuilding at once
+    # would delete each other's buckets. See POST /admin/analytics/donations/rebuild.
+    if await db.donation_buckets.count_documents({}, limit=1) == 0:
+        logger.warning("donation_buckets is empty; rebuild it via POST /api/admin/analytics/donations/rebuild")
+
+@app.on_event("startup")
+async def backfill_alumni_mandals():
+    # Profiles written before alumni carried mandal_id; a no-op once they all do
+    async def backfill():
+        updated = 0
+        async for school in db.schools.find({}, {"_id": 0, "id": 1, "mandal_id": 1}):
+            updated += await sync_alumni_mandal(db, school["id"], school.get("mandal_id"))
+        if updated:
+            logger.info("Set mandal_id on %d alumni profiles", updated)
+    
+    background_tasks.add(asyncio.create_task(backfill()))
+
+@app.on_event("startup")
+async def build_search_index():
+    indexed = await search_index.rebuild(db)
+    logger.info("Indexed %d documents for search", indexed)
+    if SEARCH_REFRESH_SECONDS > 0:
+        background_tasks.add(asyncio.create_task(refresh_search_index()))
+
+async def refresh_search_index():
+    while True:
+        await asyncio.sleep(SEARCH_REFRESH_SECONDS)
+        try:
+            await search_index.refresh(db)
+        except Exception:
+            logger.exception("Search index refresh failed")
+
+@app.on_event("startup")
+async def build_mentor_index():
+    indexed = await mentor_index.rebuild(db)
+    logger.info("Indexed %d mentors", indexed)
+    if MENTOR_REFRESH_SECONDS > 0:
+        background_tasks.add(asyncio.create_task(refresh_mentor_index()))
+
+async def refresh_mentor_index():
+    while True:
+        await asyncio.sleep(MENTOR_REFRESH_SECONDS)
+        try:
+            await mentor_index.refresh(db)
+        except Exception:
+            logger.exception("Mentor index refresh failed")
+
+@app.on_event("startup")
+async def start_hot_ranker():
+    scored = await hot_ranker.score_unscored(db)
+    if scored:
+        logger.info("Scored %d forum posts from before hot ranking", scored)
+    if HOT_SCORE_SECONDS > 0:
+        background_tasks.add(asyncio.create_task(run_hot_ranker()))
+
+async def run_hot_ranker():
+    while True:
+        try:
+            await hot_ranker.run_once(db)
+        except Exception:
+            logger.exception("Forum hot score update failed")
+        await asyncio.sleep(HOT_SCORE_SECONDS)
+
+@app.on_event("startup")
+async def start_media_store():
+    media_store.start()
+
+@app.on_event("startup")
+async def start_notifier():
+    notifier.start()
+
+@app.on_event("startup")
+async def start_chat():
+    await chat.start(db, MongoBroker(db) if CHAT_BROKER == 'mongo' else MemoryBroker())
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    await notifier.stop()
+    await chat.stop()
+    for task in background_tasks:
+        task.cancel()
     client.close()
+    password_hasher.shutdown()
+    media_store.stop()
@@ -0,0 +1,62 @@
+"""Request coalescing for hot read endpoints.
+
+``SingleFlight.do(key, fn)`` runs ``fn`` once for any number of concurrent
+callers with the same key; they all await the one task and share its result.
+A result is also handed to callers arriving up to ``window`` seconds after it
+completed, which catches herds that trickle in just after the first query
+returns. Failures are shared with the callers already waiting but never kept.
+
+The shared task is shielded, so a caller that disconnects does not cancel the
+work the others are waiting for.
+"""
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+class SingleFlight:
+    def __init__(self, window: float = 0.0, enabled: bool = True):
+        self.window = window
+        self.enabled = enabled
+        self._in_flight: Dict[Hashable, asyncio.Task] = {}
+        self._recent: Dict[Hashable, Tuple[float, Any]] = {}  # key -> (expires, result)
+        self.calls = 0
+        self.executions = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        self.calls += 1
+        if not self.enabled:
+            self.executions += 1
+            return await fn()
+
+        if self.window > 0:
+            recent = self._recent.get(key)
+            if recent is not None:
+                if recent[0] > time.monotonic():
+                    return recent[1]
+                del self._recent[key]
+
+        task = self._in_flight.get(key)
+        if task is None:
+            self.executions += 1
+            task = asyncio.ensure_future(fn())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable, task: asyncio.Task) -> None:
+        self._in_flight.pop(key, None)
+        if self.window > 0 and not task.cancelled() and task.exception() is None:
+            now = time.monotonic()
+            if len(self._recent) > 1000:
+                self._recent = {k: v for k, v in self._recent.items() if v[0] > now}
+            self._recent[key] = (now + self.window, task.result())
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "window_seconds": self.window,
+            "calls": self.calls,
+            "executions": self.executions,
+            "collapsed": self.calls - self.executions,
+            "in_flight": len(self._in_flight),
+        }
@@ -0,0 +1,169 @@
+"""Incrementally maintained counters behind /api/admin/stats.
+
+Every write path bumps the global, per-school and per-mandal documents in the
+``stats`` collection with an atomic ``$inc``, so the dashboard read is a single
+document fetch. ``reconcile_stats`` rebuilds all of them from the source
+collections with aggregation pipelines.
+"""
+import asyncio
+import os
+from collections import defaultdict
+from typing import Optional
+from pymongo import ReplaceOne, UpdateOne
+
+GLOBAL_KEY = "global"
+
+COUNTER_FIELDS = (
+    "total_schools",
+    "total_users",
+    "total_alumni",
+    "total_donations",
+    "total_donation_amount",
+    "pending_approvals",
+)
+
+def scope_keys(school_id: Optional[str] = None, mandal_id: Optional[str] = None) -> list:
+    keys = [GLOBAL_KEY]
+    if school_id:
+        keys.append(f"school:{school_id}")
+    if mandal_id:
+        keys.append(f"mandal:{mandal_id}")
+    return keys
+
+async def mandal_for_school(db, school_id: Optional[str]) -> Optional[str]:
+    if not school_id:
+        return None
+    school = await db.schools.find_one({"id": school_id}, {"_id": 0, "mandal_id": 1})
+    return school.get("mandal_id") if school else None
+
+async def increment(db, deltas: dict, school_id: Optional[str] = None, mandal_id: Optional[str] = None) -> None:
+    deltas = {field: value for field, value in deltas.items() if value}
+    if not deltas:
+        return
+    if school_id and not mandal_id:
+        mandal_id = await mandal_for_school(db, school_id)
+
+    ops = [
+        UpdateOne({"_id": key}, {"$inc": deltas}, upsert=True)
+        for key in scope_keys(school_id, mandal_id)
+    ]
+    await db.stats.bulk_write(ops, ordered=False)
+
+async def increment_many(db, entries: list) -> None:
+    # Batched increment() for bulk writers: entries are (deltas, school_id,
+    # mandal_id) tuples, merged per stats document into one bulk_write.
+    missing = list({school_id for _, school_id, mandal_id in entries if school_id and not mandal_id})
+    mandals = {}
+    if missing:
+        async for school in db.schools.find({"id": {"$in": missing}}, {"_id": 0, "id": 1, "mandal_id": 1}):
+            mandals[school["id"]] = school.get("mandal_id")
+
+    totals = defaultdict(lambda: defaultdict(int))
+    for deltas, school_id, mandal_id in entries:
+        for key in scope_keys(school_id, mandal_id or mandals.get(school_id)):
+            for field, value in deltas.items():
+                totals[key][field] += value
+
+    ops = [UpdateOne({"_id": key}, {"$inc": dict(deltas)}, upsert=True) for key, deltas in totals.items()]
+    if ops:
+        await db.stats.bulk_write(ops, ordered=False)
+
+# A school's own rows count toward its mandal; users with a mandal_id of their own do not move with it
+SCHOOL_FIELDS = ("total_schools", "total_alumni", "total_donations", "total_donation_amount")
+
+async def move_school(db, school_id: str, from_mandal: Optional[str], to_mandal: Optional[str]) -> None:
+    # Shifts what a school contributed from one mandal's counters to the other's.
+    # Writes racing the move can land on either side; reconcile_stats fixes those.
+    doc = await db.stats.find_one({"_id": f"school:{school_id}"}) or {}
+    moved = {field: doc.get(field, 0) for field in SCHOOL_FIELDS}
+    async for row in db.users.aggregate([
+        {"$match": {"school_id": school_id, "mandal_id": None}},
+        {"$group": {
+            "_id": None,
+            "users": {"$sum": 1},
+            "pending": {"$sum": {"$cond": [
+                {"$and": [{"$eq": ["$role", "alumni"]}, {"$ne": ["$approved", True]}]}, 1, 0,
+            ]}},
+        }},
+    ]):
+        moved["total_users"], moved["pending_approvals"] = row["users"], row["pending"]
+    moved = {field: value for field, value in moved.items() if value}
+    if not moved:
+        return
+    # Both entries touch the global document too, and cancel out there
+    await increment_many(db, [
+        ({field: -value for field, value in moved.items()}, None, from_mandal),
+        (moved, None, to_mandal),
+    ])
+
+async def get_counters(db, key: str = GLOBAL_KEY) -> dict:
+    doc = await db.stats.find_one({"_id": key}) or {}
+    return {field: doc.get(field, 0) for field in COUNTER_FIELDS}
+
+async def reconcile_stats(db) -> int:
+    # Writes that land while this runs can be lost or double counted, so run
+    # it at startup or during a quiet period.
+    counters = defaultdict(lambda: dict.fromkeys(COUNTER_FIELDS, 0))
+    school_mandals = {}
+
+    async for row in db.schools.aggregate([
+        {"$group": {"_id": {"id": "$id", "mandal_id": "$mandal_id"}}},
+    ]):
+        school_mandals[row["_id"]["id"]] = row["_id"].get("mandal_id")
+
+    for school_id, mandal_id in school_mandals.items():
+        for key in scope_keys(school_id, mandal_id):
+            counters[key]["total_schools"] += 1
+
+    async for row in db.users.aggregate([
+        {"$group": {
+            "_id": {"school_id": "$school_id", "mandal_id": "$mandal_id"},
+            "users": {"$sum": 1},
+            "pending": {"$sum": {"$cond": [
+                {"$and": [{"$eq": ["$role", "alumni"]}, {"$ne": ["$approved", True]}]}, 1, 0,
+            ]}},
+        }},
+    ]):
+        school_id = row["_id"].get("school_id")
+        mandal_id = row["_id"].get("mandal_id") or school_mandals.get(school_id)
+        for key in scope_keys(school_id, mandal_id):
+            counters[key]["total_users"] += row["users"]
+            counters[key]["pending_approvals"] += row["pending"]
+
+    async for row in db.alumni.aggregate([
+        {"$group": {"_id": "$school_id", "alumni": {"$sum": 1}}},
+    ]):
+        for key in scope_keys(row["_id"], school_mandals.get(row["_id"])):
+            counters[key]["total_alumni"] += row["alumni"]
+
+    async for row in db.donations.aggregate([
+        {"$group": {
+            "_id": "$school_id",
+            "donations": {"$sum": 1},
+            "amount": {"$sum": {"$cond": [{"$eq": ["$payment_status", "completed"]}, "$amount", 0]}},
+        }},
+    ]):
+        for key in scope_keys(row["_id"], school_mandals.get(row["_id"])):
+            counters[key]["total_donations"] += row["donations"]
+            counters[key]["total_donation_amount"] += row["amount"]
+
+    counters[GLOBAL_KEY]  # always materialise the global document
+    ops = [ReplaceOne({"_id": key}, {"_id": key, **values}, upsert=True) for key, values in counters.items()]
+    await db.stats.bulk_write(ops, ordered=False)
+    await db.stats.delete_many({"_id": {"$nin": list(counters)}})
+    return len(counters)
+
+if __name__ == "__main__":
+    from motor.motor_asyncio import AsyncIOMotorClient
+    from dotenv import load_dotenv
+    from pathlib import Path
+
+    load_dotenv(Path(__file__).parent / '.env')
+
+    async def main():
+        client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+        rebuilt = await reconcile_stats(client[os.environ['DB_NAME']])
+        print(f"✓ Rebuilt {rebuilt} stats documents")
+        client.close()
+
+    asyncio.run(main())
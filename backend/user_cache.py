@@ -0,0 +1,56 @@
+"""Bounded LRU + TTL cache of user documents for get_current_user.
+
+The cache is per process: an invalidation on one worker does not reach the
+others, so the TTL is the upper bound on how stale a user document can be.
+"""
+import time
+from collections import OrderedDict
+from typing import Optional
+
+class UserCache:
+    def __init__(self, max_size: int = 10000, ttl: float = 60.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, user_id: str) -> Optional[dict]:
+        entry = self._entries.get(user_id)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[user_id]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(user_id)
+        self.hits += 1
+        # Handlers mutate the user dict they are given, so hand out copies
+        return dict(entry[1])
+
+    def set(self, user_id: str, user: dict) -> None:
+        if self.max_size <= 0 or self.ttl <= 0:
+            return
+        self._entries[user_id] = (time.monotonic() + self.ttl, dict(user))
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, user_id: str) -> None:
+        self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
@@ -11,6 +11,7 @@ const SchoolDetails = () => {
   const { id } = useParams();
   const [school, setSchool] = useState(null);
   const [alumni, setAlumni] = useState([]);
+  const [alumniCount, setAlumniCount] = useState(0);
   const [news, setNews] = useState([]);
   const [needs, setNeeds] = useState([]);
   const [loading, setLoading] = useState(true);
@@ -70,16 +71,12 @@ const SchoolDetails = () => {
 
   const fetchSchoolData = async () => {
     try {
-      const [schoolRes, alumniRes, newsRes, needsRes] = await Promise.all([
-        axios.get(`${API}/schools/${id}`),
-        axios.get(`${API}/alumni?school_id=${id}`),
-        axios.get(`${API}/news?school_id=${id}`),
-        axios.get(`${API}/school-needs?school_id=${id}`)
-      ]);
-      setSchool(schoolRes.data);
-      setAlumni(alumniRes.data);
-      setNews(newsRes.data);
-      setNeeds(needsRes.data);
+      const { data } = await axios.get(`${API}/schools/${id}/overview`);
+      setSchool(data.school);
+      setAlumniCount(data.counts.alumni);
+      setAlumni(data.alumni);
+      setNews(data.news);
+      setNeeds(data.needs);
     } catch (error) {
       toast.error('Error loading school data');
     } finally {
@@ -155,7 +152,7 @@ const SchoolDetails = () => {
             <TabsTrigger value="about" className="data-[state=active]:bg-crimson data-[state=active]:text-white rounded-xl">About</TabsTrigger>
             <TabsTrigger value="hm-note" className="data-[state=active]:bg-crimson data-[state=active]:text-white rounded-xl">HM Note</TabsTrigger>
             <TabsTrigger value="facilities" className="data-[state=active]:bg-crimson data-[state=active]:text-white rounded-xl">Facilities</TabsTrigger>
-            <TabsTrigger value="alumni" className="data-[state=active]:bg-crimson data-[state=active]:text-white rounded-xl">Alumni ({alumni.length})</TabsTrigger>
+            <TabsTrigger value="alumni" className="data-[state=active]:bg-crimson data-[state=active]:text-white rounded-xl">Alumni ({alumniCount})</TabsTrigger>
             <TabsTrigger value="news" className="data-[state=active]:bg-crimson data-[state=active]:text-white rounded-xl">News</TabsTrigger>
             <TabsTrigger value="needs" className="data-[state=active]:bg-crimson data-[state=active]:text-white rounded-xl">Support Needs</TabsTrigger>
           </TabsList>
@@ -201,7 +198,7 @@ const SchoolDetails = () => {
 
           <TabsContent value="alumni">
             <div className="glass-card p-12 rounded-3xl">
-              <h2 className="text-3xl font-bold mb-8" style={{fontFamily: 'Libre Baskerville', color: 'var(--ivory)'}}>Alumni Network ({alumni.length})</h2>
+              <h2 className="text-3xl font-bold mb-8" style={{fontFamily: 'Libre Baskerville', color: 'var(--ivory)'}}>Alumni Network ({alumniCount})</h2>
               {alumni.length > 0 ? (
                 <div className="grid md:grid-cols-3 gap-6">
                   {alumni.map((alum) => (
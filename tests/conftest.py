@@ -0,0 +1,49 @@
+"""Fixtures running the app in process on mongomock-motor.
+
+    python -m pytest -q tests
+"""
+import os
+import sys
+from pathlib import Path
+
+import httpx
+import pytest
+
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "tests")
+# backend/ is a flat set of modules, imported by name like server.py does
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "backend"))
+
+# Listed in requirements.txt; a missing driver fails the run instead of skipping every test
+import mongomock_motor  # noqa: E402,F401
+
+import server  # noqa: E402
+from benchmarks.datagen import in_process_database  # noqa: E402
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+@pytest.fixture
+async def db(monkeypatch):
+    # A fresh in-memory database per test, swapped in where the routes look it up
+    database = in_process_database()
+    monkeypatch.setattr(server, "db", database)
+    await server.ensure_indexes(database)
+    # Cached pages are keyed by URL and would outlive the database they came from
+    monkeypatch.setattr(server.response_cache, "enabled", False)
+    return database
+
+@pytest.fixture
+async def client(db):
+    transport = httpx.ASGITransport(app=server.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=None) as client:
+        yield client
+
+@pytest.fixture
+async def admin_headers(db):
+    # Tokens are checked against the users collection
+    await db.users.insert_one(server.User(id="user-admin", email="admin@example.org", name="Admin", role="admin",
+                                          approved=True).model_dump())
+    token = server.create_access_token({"sub": "user-admin", "role": "admin", "approved": True})
+    return {"Authorization": f"Bearer {token}"}
@@ -0,0 +1,63 @@
+import random
+from collections import Counter
+
+import pytest
+
+import server
+
+pytestmark = pytest.mark.anyio
+
+PROFESSIONS = ["Teacher", "Doctor", "Engineer", "Farmer", None]
+SCHOOLS = {"school-1": "mandal-1", "school-2": "mandal-1", "school-3": "mandal-2", "school-4": "mandal-2"}
+
+@pytest.fixture
+async def alumni(db) -> list:
+    rng = random.Random(3)
+    docs = []
+    for i in range(120):
+        school_id = rng.choice(list(SCHOOLS))
+        docs.append(server.Alumni(
+            user_id=f"user-{i}", school_id=school_id, mandal_id=SCHOOLS[school_id],
+            batch_year=rng.randint(1995, 2005), current_profession=rng.choice(PROFESSIONS),
+            willing_to_mentor=i % 3 == 0,
+        ).model_dump())
+    await db.alumni.insert_many([dict(doc) for doc in docs])
+    return docs
+
+def expected(docs: list, limit: int = server.FACET_LIMIT) -> dict:
+    def ranked(field: str) -> list:
+        counts = Counter(doc[field] for doc in docs if doc[field] is not None)
+        # most common first, ties by value
+        return [{"value": value, "count": count}
+                for value, count in sorted(counts.items(), key=lambda item: (-item[1], item[0]))[:limit]]
+
+    years = Counter(doc["batch_year"] for doc in docs)
+    return {
+        "total": len(docs),
+        "batch_years": [{"value": year, "count": years[year]} for year in sorted(years, reverse=True)],
+        "schools": ranked("school_id"),
+        "professions": ranked("current_profession"),
+    }
+
+async def test_facets_count_and_order_every_alumnus(client, alumni):
+    response = await client.get("/api/alumni/facets")
+    assert response.json() == expected(alumni)
+
+async def test_facets_follow_the_directory_filters(client, alumni):
+    response = await client.get("/api/alumni/facets", params={"mandal_id": "mandal-2", "willing_to_mentor": "true",
+                                                              "batch_from": 1998, "batch_to": 2003})
+    matching = [doc for doc in alumni if doc["mandal_id"] == "mandal-2" and doc["willing_to_mentor"]
+                and 1998 <= doc["batch_year"] <= 2003]
+    assert response.json() == expected(matching)
+
+async def test_facets_keep_the_top_values(client, alumni, monkeypatch):
+    monkeypatch.setattr(server, "FACET_LIMIT", 2)
+    data = (await client.get("/api/alumni/facets")).json()
+    full = expected(alumni, limit=2)
+    assert (data["schools"], data["professions"]) == (full["schools"], full["professions"])
+    assert len(data["batch_years"]) == 11  # years have their own, larger limit
+
+async def test_facets_of_no_alumni(client, db):
+    assert (await client.get("/api/alumni/facets")).json() == {
+        "total": 0, "batch_years": [], "schools": [], "professions": [],
+    }
@@ -0,0 +1,143 @@
+import random
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import analytics
+import stats
+
+pytestmark = pytest.mark.anyio
+
+UTC = timezone.utc
+SCHOOL_MANDALS = {"school-1": "mandal-1", "school-2": "mandal-1", "school-3": "mandal-2"}
+PURPOSES = ["books", "meals", None]
+
+def shift(period: datetime, granularity: str, steps: int) -> datetime:
+    if granularity == "day":
+        return period + timedelta(days=steps)
+    months = period.year * 12 + period.month - 1 + steps
+    return period.replace(year=months // 12, month=months % 12 + 1)
+
+def naive_series(donations, scope, granularity, start, end, window, purpose=None) -> dict:
+    # One period at a time in plain Python, the way the NumPy version must agree with
+    first = analytics.bucket_start(start, granularity)
+    periods = []
+    while shift(first, granularity, len(periods)) < end:
+        periods.append(shift(first, granularity, len(periods)))
+    slots = [shift(first, granularity, -k) for k in range(window - 1, 0, -1)] + periods
+    counts, amounts, by_purpose = {p: 0 for p in slots}, {p: 0.0 for p in slots}, {}
+    for doc in donations:
+        name = doc["purpose"] or analytics.UNSPECIFIED
+        school_id = doc["school_id"]
+        if doc["payment_status"] != "completed" or (purpose and name != purpose):
+            continue
+        if scope not in stats.scope_keys(school_id, SCHOOL_MANDALS.get(school_id)):
+            continue
+        period = analytics.bucket_start(doc["created_at"], granularity)
+        if period in counts:
+            counts[period] += 1
+            amounts[period] += doc["amount"]
+            if period >= first:
+                total = by_purpose.setdefault(name, [0, 0.0])
+                total[0] += 1
+                total[1] += doc["amount"]
+    amount_list = [amounts[p] for p in slots]
+    return {
+        "periods": [p.date() for p in periods],
+        "counts": [counts[p] for p in periods],
+        "amounts": [amounts[p] for p in periods],
+        "moving_average": [sum(amount_list[i:i + window]) / window for i in range(len(periods))],
+        "total_count": sum(counts[p] for p in periods),
+        "total_amount": sum(amounts[p] for p in periods),
+        "by_purpose": {name: tuple(total) for name, total in by_purpose.items()},
+    }
+
+def assert_matches(result: dict, expected: dict) -> None:
+    for field in ("periods", "counts", "total_count"):
+        assert result[field] == expected[field], field
+    for field in ("amounts", "moving_average"):
+        assert result[field] == pytest.approx(expected[field], abs=0.01), field
+    assert result["total_amount"] == pytest.approx(expected["total_amount"], abs=0.01)
+    assert result["by_purpose"].keys() == expected["by_purpose"].keys()
+    for name, (count, amount) in expected["by_purpose"].items():
+        assert result["by_purpose"][name][0] == count
+        assert result["by_purpose"][name][1] == pytest.approx(amount, abs=0.01)
+
+def donation(i: int, created_at: datetime, school_id: str = "school-1", purpose=None, status="completed") -> dict:
+    return {"id": f"donation-{i:05d}", "school_id": school_id, "purpose": purpose, "amount": 100.25 + i,
+            "payment_status": status, "created_at": created_at}
+
+def dataset() -> list:
+    rng = random.Random(7)
+    base = datetime(2024, 12, 1, tzinfo=UTC)
+    docs = [
+        donation(i, base + timedelta(seconds=rng.randrange(150 * 86400)), rng.choice(list(SCHOOL_MANDALS)),
+                 rng.choice(PURPOSES), "completed" if i % 5 else "pending")
+        for i in range(200)
+    ]
+    edges = [
+        datetime(2025, 3, 1, tzinfo=UTC),  # first instant of a day and a month
+        datetime(2025, 2, 28, 23, 59, 59, 999000, tzinfo=UTC),  # last millisecond before it
+        datetime(2025, 3, 15, tzinfo=UTC),  # exactly the end of the daily range: excluded
+        datetime(2025, 2, 4, tzinfo=UTC),  # first lookback day of the daily range
+        datetime(2025, 2, 3, 23, 59, 59, tzinfo=UTC),  # just before the lookback
+        datetime(2025, 2, 10, 0, 0, tzinfo=UTC),  # the start's day, before the start's time of day
+        # 02:00 IST on 1 March is still 28 February in UTC
+        datetime(2025, 3, 1, 2, 0, tzinfo=timezone(timedelta(hours=5, minutes=30))),
+    ]
+    docs += [donation(1000 + i, at, "school-2", "books") for i, at in enumerate(edges)]
+    return docs
+
+@pytest.fixture
+async def donations(db) -> list:
+    docs = dataset()
+    await db.schools.insert_many([{"id": school_id, "mandal_id": mandal_id, "udise_code": school_id}
+                                  for school_id, mandal_id in SCHOOL_MANDALS.items()])
+    await db.donations.insert_many([dict(doc) for doc in docs])
+    return docs
+
+RANGES = [
+    ("day", datetime(2025, 2, 10, 12, 0, tzinfo=UTC), datetime(2025, 3, 15, tzinfo=UTC), 7),
+    ("day", datetime(2025, 2, 27, tzinfo=UTC), datetime(2025, 3, 2, 6, 0, tzinfo=UTC), 1),
+    ("month", datetime(2024, 12, 15, tzinfo=UTC), datetime(2025, 4, 1, tzinfo=UTC), 3),
+]
+SCOPES = [stats.GLOBAL_KEY, "school:school-2", "mandal:mandal-1", "mandal:mandal-2"]
+
+@pytest.mark.parametrize("path", ["recorded", "rebuilt"])
+async def test_series_matches_a_naive_sum(db, donations, path):
+    if path == "recorded":
+        for doc in donations:
+            await analytics.record_donation(db, doc, SCHOOL_MANDALS[doc["school_id"]])
+    else:
+        await analytics.rebuild_buckets(db)
+
+    for granularity, start, end, window in RANGES:
+        for scope in SCOPES:
+            result = await analytics.series(db, scope, granularity, start, end, window=window)
+            assert_matches(result, naive_series(donations, scope, granularity, start, end, window))
+        result = await analytics.series(db, stats.GLOBAL_KEY, granularity, start, end, purpose="books", window=window)
+        assert_matches(result, naive_series(donations, stats.GLOBAL_KEY, granularity, start, end, window, "books"))
+
+async def test_period_edges(db, donations):
+    await analytics.rebuild_buckets(db)
+    result = await analytics.series(db, "school:school-2", "day", datetime(2025, 2, 28, tzinfo=UTC),
+                                    datetime(2025, 3, 1, 12, 0, tzinfo=UTC), purpose="books", window=1)
+    books = [doc for doc in donations if doc["school_id"] == "school-2" and doc["purpose"] == "books"
+             and doc["payment_status"] == "completed"]
+    days = [datetime(2025, 2, 28, tzinfo=UTC), datetime(2025, 3, 1, tzinfo=UTC)]
+    on = [sum(1 for doc in books if analytics.bucket_start(doc["created_at"], "day") == day) for day in days]
+    assert result["periods"] == [day.date() for day in days]
+    # the last millisecond of 28 February and 02:00 IST on 1 March land on the 28th
+    assert result["counts"] == on and on[0] >= 2 and on[1] >= 1
+
+async def test_empty_range(db, donations):
+    await analytics.rebuild_buckets(db)
+    start, end = datetime(2030, 1, 1, tzinfo=UTC), datetime(2030, 1, 11, tzinfo=UTC)
+    result = await analytics.series(db, stats.GLOBAL_KEY, "day", start, end, window=7)
+    assert result["counts"] == [0] * 10 and result["moving_average"] == [0.0] * 10
+    assert (result["total_count"], result["total_amount"], result["by_purpose"]) == (0, 0.0, {})
+
+    # a range that ends where its only period starts has no periods at all
+    boundary = datetime(2025, 3, 1, tzinfo=UTC)
+    result = await analytics.series(db, stats.GLOBAL_KEY, "month", boundary, boundary, window=3)
+    assert (result["periods"], result["counts"], result["moving_average"]) == ([], [], [])
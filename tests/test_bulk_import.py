@@ -0,0 +1,82 @@
+import pytest
+from fastapi import HTTPException
+
+import bulk_import
+import server
+
+pytestmark = pytest.mark.anyio
+
+async def chunks(text: str):
+    yield text.encode()
+
+async def run(kind: str, text: str) -> dict:
+    return await bulk_import.import_rows(server.db, server.IMPORTS[kind], chunks(text), "csv")
+
+async def test_reimport_with_fewer_columns_keeps_other_fields(db):
+    full = (
+        "udise_code,name,mandal_id,hm_note,address,facilities,contact_email\n"
+        'U001,ZPHS Kondapur,mandal-1,Call before visits,"Main Road, Kondapur",Library;Lab,hm@example.org\n'
+    )
+    report = await run("schools", full)
+    assert (report["inserted"], report["failed"]) == (1, 0)
+
+    report = await run("schools", "udise_code,name,mandal_id\nU001,ZPHS Kondapur (Girls),mandal-1\n")
+    assert (report["inserted"], report["updated"]) == (0, 1)
+
+    school = await db.schools.find_one({"udise_code": "U001"})
+    assert school["name"] == "ZPHS Kondapur (Girls)"
+    assert school["hm_note"] == "Call before visits"
+    assert school["address"] == "Main Road, Kondapur"
+    assert school["facilities"] == ["Library", "Lab"]
+    assert school["contact_email"] == "hm@example.org"
+
+async def seed_references(db) -> None:
+    await db.schools.insert_one(server.School(id="school-1", name="ZPHS Kondapur", mandal_id="mandal-1").model_dump())
+    await db.users.insert_one(server.User(id="user-1", email="user1@example.org", name="Asha").model_dump())
+
+async def test_new_rows_get_model_defaults(db):
+    await seed_references(db)
+    report = await run("alumni", "user_id,school_id,batch_year\nuser-1,school-1,2004\n")
+    assert report["inserted"] == 1
+
+    alumni = await db.alumni.find_one({"user_id": "user-1"})
+    assert alumni["achievements"] == []
+    assert alumni["willing_to_mentor"] is False
+    assert alumni["id"] and alumni["created_at"]
+
+async def test_alumni_reimport_keeps_mentoring_and_achievements(db):
+    await seed_references(db)
+    await run("alumni", "user_id,school_id,batch_year,achievements,willing_to_mentor\n"
+                        "user-1,school-1,2004,State rank;Gold medal,true\n")
+    await run("alumni", "user_id,school_id,batch_year,company\nuser-1,school-1,2004,Infosys\n")
+
+    alumni = await db.alumni.find_one({"user_id": "user-1"})
+    assert alumni["company"] == "Infosys"
+    assert alumni["achievements"] == ["State rank", "Gold medal"]
+    assert alumni["willing_to_mentor"] is True
+    # on_batch sees the merged document, so the mentor stays indexed
+    assert server.mentor_index.docs[server.mentor_index.rows[alumni["id"]]]["company"] == "Infosys"
+
+async def test_alumni_rows_must_reference_existing_school_and_user(db):
+    await seed_references(db)
+    report = await run("alumni", "user_id,school_id,batch_year\n"
+                                 "user-1,school-1,2004\nuser-2,school-1,2005\nuser-1,school-9,2006\n")
+    assert (report["inserted"], report["failed"]) == (1, 2)
+    assert sorted(error["line"] for error in report["errors"]) == [3, 4]
+    assert await db.alumni.count_documents({}) == 1
+
+async def test_alumni_pair_is_unique(db):
+    await seed_references(db)
+    await run("alumni", "user_id,school_id,batch_year\nuser-1,school-1,2004\n")
+    with pytest.raises(HTTPException) as raised:
+        await server.create_alumni_profile({"school_id": "school-1", "batch_year": 2004},
+                                           current_user={"id": "user-1", "role": "alumni"})
+    assert raised.value.status_code == 409
+
+async def test_duplicate_alumni_are_removed_before_indexing(db):
+    await db.alumni.drop_indexes()
+    older, newer = (server.Alumni(user_id="user-1", school_id="school-1", batch_year=year) for year in (2004, 2005))
+    newer.updated_at = newer.created_at
+    await db.alumni.insert_many([older.model_dump(), newer.model_dump()])
+    await server.ensure_indexes(db)
+    assert [doc["id"] async for doc in db.alumni.find()] == [newer.id]
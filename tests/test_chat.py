@@ -0,0 +1,147 @@
+import asyncio
+import json
+from datetime import datetime, timezone
+
+import pytest
+from bson import ObjectId
+from pymongo.errors import AutoReconnect
+
+import server
+from chat import ChatService, MemoryBroker, MessageBuffer
+
+pytestmark = pytest.mark.anyio
+
+def message(conversation_id: str = "conversation-1") -> dict:
+    return {"id": str(ObjectId()), "conversation_id": conversation_id, "sender_id": "user-1", "body": "hello",
+            "created_at": datetime.now(timezone.utc)}
+
+class FlakyMessages:
+    """chat_messages that fails its first ``failures`` writes, storing the first ``partial`` docs of each."""
+
+    def __init__(self, collection, failures: int, partial: int = 0):
+        self.collection = collection
+        self.failures = failures
+        self.partial = partial
+
+    async def insert_many(self, docs, ordered=True):
+        if self.failures:
+            self.failures -= 1
+            for doc in docs[:self.partial]:
+                if not await self.collection.count_documents({"id": doc["id"]}):
+                    await self.collection.insert_one(doc)
+            raise AutoReconnect("connection reset")
+        return await self.collection.insert_many(docs, ordered=ordered)
+
+class FlakyDb:
+    def __init__(self, db, failures: int, partial: int = 0):
+        self.chat_messages = FlakyMessages(db.chat_messages, failures, partial)
+        self.conversations = db.conversations
+
+async def test_failed_flush_requeues_the_batch(db):
+    buffer = MessageBuffer(flush_seconds=0.01)
+    flaky = FlakyDb(db, failures=2, partial=1)
+    sent = [message() for _ in range(3)]
+    for doc in sent:
+        await buffer.add(flaky, doc)
+
+    await buffer.flush(flaky)
+    assert len(buffer.pending) == 3 and buffer.failed == 0
+    await buffer.flush(flaky)  # still backing off: no write attempted
+    assert flaky.chat_messages.failures == 1
+    later = message()
+    await buffer.add(flaky, later)
+
+    for _ in range(3):
+        await buffer.flush(flaky, force=True)
+    stored = await db.chat_messages.find({}, {"_id": 0, "id": 1}).to_list(None)
+    assert sorted(doc["id"] for doc in stored) == sorted(doc["id"] for doc in sent + [later])
+    assert (buffer.pending, buffer.failed, buffer.flushed, buffer.attempts) == ([], 0, 4, {})
+
+async def test_flush_drops_a_message_only_after_max_attempts(db):
+    buffer = MessageBuffer(max_attempts=3)
+    flaky = FlakyDb(db, failures=3)
+    await buffer.add(flaky, message())
+    for _ in range(3):
+        await buffer.flush(flaky, force=True)
+    assert (buffer.pending, buffer.failed, buffer.retried) == ([], 1, 2)
+
+class RacingDb:
+    """A database whose first direct-pair lookup misses: a concurrent create inserts the pair right after it."""
+
+    def __init__(self, db):
+        self.db = db
+        self.conversations = RacingConversations(db.conversations)
+
+    def __getattr__(self, name):
+        return getattr(self.db, name)
+
+class RacingConversations:
+    def __init__(self, collection):
+        self.collection = collection
+        self.raced = False
+
+    def __getattr__(self, name):
+        return getattr(self.collection, name)
+
+    async def find_one(self, query, *args, **kwargs):
+        if "direct_key" in query and not self.raced:
+            self.raced = True
+            await self.collection.insert_one(
+                server.Conversation(type="direct", members=query["direct_key"].split(":"), created_by="user-2")
+                .model_dump() | {"direct_key": query["direct_key"]}
+            )
+            return None
+        return await self.collection.find_one(query, *args, **kwargs)
+
+async def test_concurrent_direct_conversation_create_returns_the_existing_one(db, monkeypatch):
+    await db.users.insert_many([server.User(id=f"user-{i}", email=f"user{i}@example.org", name=f"User {i}",
+                                            approved=True).model_dump() for i in (1, 2)])
+    monkeypatch.setattr(server, "db", RacingDb(db))
+    created = await server.create_conversation(server.ConversationCreate(member_ids=["user-2"]),
+                                               current_user={"id": "user-1"})
+    stored = await db.conversations.find({}, {"_id": 0}).to_list(None)
+    assert [conversation["id"] for conversation in stored] == [created.id]
+    assert stored[0]["created_by"] == "user-2"
+
+class FakeSocket:
+    def __init__(self):
+        self.incoming = asyncio.Queue()
+        self.sent = []
+
+    async def receive(self) -> dict:
+        return await self.incoming.get()
+
+    async def send_text(self, text: str) -> None:
+        self.sent.append(json.loads(text))
+
+    async def close(self, code: int = 1000) -> None:
+        pass
+
+    async def replies(self, count: int) -> list:
+        while len(self.sent) < count:
+            await asyncio.sleep(0.01)
+        return self.sent
+
+async def test_socket_rejects_binary_frames_and_stores_the_checked_conversation_id(db):
+    await db.conversations.insert_one({"id": "123", "type": "direct", "members": ["user-1", "user-2"]})
+    service = ChatService()
+    await service.start(db, MemoryBroker())
+    socket = FakeSocket()
+    serving = asyncio.create_task(service.serve(socket, "user-1"))
+
+    socket.incoming.put_nowait({"type": "websocket.receive", "bytes": b"\x00\x01"})
+    socket.incoming.put_nowait({"type": "websocket.receive", "text": '{"type": "ping"}'})
+    assert await socket.replies(2) == [
+        {"type": "error", "detail": "Only text frames are accepted"}, {"type": "pong"},
+    ]
+
+    # a numeric id is checked as "123" and must be stored as "123"
+    socket.incoming.put_nowait({"type": "websocket.receive",
+                                "text": '{"type": "send", "conversation_id": 123, "body": "hello"}'})
+    message = (await socket.replies(3))[2]["message"]
+    assert message["conversation_id"] == "123"
+
+    socket.incoming.put_nowait({"type": "websocket.disconnect", "code": 1000})
+    await asyncio.wait_for(serving, 1)
+    await service.stop()
+    assert await db.chat_messages.distinct("conversation_id") == ["123"]
@@ -0,0 +1,63 @@
+import asyncio
+import random
+
+import pytest
+
+import server
+import stats
+
+pytestmark = pytest.mark.anyio
+
+SCHOOL_ID = "school-1"
+NEED_ID = "need-1"
+
+async def create_need(db, target: float) -> None:
+    await db.school_needs.insert_one(server.SchoolNeed(
+        id=NEED_ID, school_id=SCHOOL_ID, title="Library books", description="", category="books",
+        target_amount=target,
+    ).model_dump())
+
+async def donate(client, amount: float, key: str = None):
+    headers = {"Idempotency-Key": key} if key else {}
+    return await client.post("/api/donations", headers=headers, json={
+        "donor_name": "Lakshmi", "donor_email": "lakshmi@example.org", "amount": amount, "need_id": NEED_ID,
+    })
+
+async def test_parallel_donations_with_retries_total_exactly(db, client):
+    rng = random.Random(7)
+    # whole rupees, so float sums are exact in any order
+    amounts = [rng.randint(100, 5000) for _ in range(300)]
+    await create_need(db, target=sum(amounts) / 2)
+    requests = [(f"key-{i}", amount) for i, amount in enumerate(amounts)]
+    requests += rng.sample(requests, 60)  # retries racing their originals
+    rng.shuffle(requests)
+
+    responses = await asyncio.gather(*(donate(client, amount, key) for key, amount in requests))
+
+    assert {response.status_code for response in responses} == {200}
+    assert len({response.json()["id"] for response in responses}) == len(amounts)
+    assert await db.donations.count_documents({"need_id": NEED_ID}) == len(amounts)
+    need = await db.school_needs.find_one({"id": NEED_ID})
+    assert need["raised_amount"] == sum(amounts)
+    assert need["status"] == "fulfilled"
+    counters = await stats.get_counters(db, f"school:{SCHOOL_ID}")
+    assert counters["total_donations"] == len(amounts)
+    assert counters["total_donation_amount"] == sum(amounts)
+
+async def test_need_stays_active_below_target(db, client):
+    await create_need(db, target=1000)
+    await donate(client, 400)
+    await donate(client, 500)
+
+    need = await db.school_needs.find_one({"id": NEED_ID})
+    assert (need["raised_amount"], need["status"]) == (900, "active")
+    assert (await donate(client, 100)).status_code == 200
+    assert (await db.school_needs.find_one({"id": NEED_ID}))["status"] == "fulfilled"
+
+async def test_replayed_key_returns_the_first_donation(db, client):
+    await create_need(db, target=1000)
+    first = await donate(client, 250, key="retry-1")
+    again = await donate(client, 250, key="retry-1")
+
+    assert first.json()["id"] == again.json()["id"]
+    assert (await db.school_needs.find_one({"id": NEED_ID}))["raised_amount"] == 250
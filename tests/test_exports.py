@@ -0,0 +1,101 @@
+import asyncio
+import csv
+import io
+import json
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import bulk_import
+import exports
+import server
+
+pytestmark = pytest.mark.anyio
+
+async def docs(items):
+    for item in items:
+        yield item
+
+async def export_csv(items, fields) -> list:
+    body = b"".join([chunk async for chunk in exports.encode(docs(items), fields, "csv")])
+    return list(csv.reader(io.StringIO(body.decode())))
+
+async def test_formula_cells_are_quoted():
+    rows = await export_csv([
+        {"donor_name": '=HYPERLINK("http://evil.example","Click")', "amount": -5.0, "purpose": "@SUM(A1)"},
+        {"donor_name": "+91 98480 22338", "amount": 500.0, "purpose": ["-scholarship", "books"]},
+        {"donor_name": "Lakshmi", "amount": 100.0, "purpose": "books"},
+    ], ["donor_name", "amount", "purpose"])
+
+    assert rows[1] == ['\'=HYPERLINK("http://evil.example","Click")', "-5.0", "'@SUM(A1)"]
+    assert rows[2] == ["'+91 98480 22338", "500.0", "'-scholarship;books"]
+    assert rows[3] == ["Lakshmi", "100.0", "books"]
+
+async def test_quoted_cells_import_back_unchanged():
+    rows = await export_csv([{"name": "=Kondapur", "facilities": ["-Lab", "Library"]}], ["name", "facilities"])
+    text = "\n".join(",".join(f'"{cell}"' for cell in row) for row in rows)
+
+    parsed = [row async for _, row in bulk_import.records(docs([text.encode()]), "csv")]
+    assert parsed == [{"name": "=Kondapur", "facilities": "-Lab;Library"}]
+
+@pytest.fixture(autouse=True)
+def small_batches(monkeypatch):
+    # several batches per export without thousands of rows
+    monkeypatch.setattr(exports, "EXPORT_BATCH_SIZE", 100)
+
+def donation(i: int) -> dict:
+    return {
+        "id": f"donation-{i:06d}", "donor_name": f"Donor {i}", "donor_email": f"donor{i}@example.org",
+        "amount": 100.0 + i, "school_id": f"school-{i % 3}", "payment_status": "completed",
+        "created_at": datetime(2025, 1, 1, tzinfo=timezone.utc) + timedelta(minutes=i),
+    }
+
+async def peak_traced_bytes(rows: int) -> int:
+    async def source():
+        for i in range(rows):
+            yield donation(i)
+
+    tracemalloc.start()
+    async for _ in exports.encode(source(), list(server.Donation.model_fields), "csv"):
+        pass
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+async def test_encoder_memory_stays_flat_as_rows_grow():
+    small = await peak_traced_bytes(5 * exports.EXPORT_BATCH_SIZE)
+    large = await peak_traced_bytes(50 * exports.EXPORT_BATCH_SIZE)
+    assert large < small * 1.5
+
+async def test_export_is_complete_and_filtered(db, client, admin_headers):
+    # more rows than the old to_list(100) returned, over several batches
+    await db.donations.insert_many([donation(i) for i in range(450)])
+
+    response = await client.get("/api/admin/export/donations", headers=admin_headers)
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert len(rows) == 450
+    assert [row["id"] for row in rows] == sorted(row["id"] for row in rows)  # oldest first
+
+    response = await client.get("/api/admin/export/donations", headers=admin_headers, params={
+        "format": "ndjson", "school_id": "school-1", "created_from": "2025-01-01T05:00:00Z",
+    })
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    expected = [i for i in range(450) if i % 3 == 1 and i >= 300]
+    assert [line["id"] for line in lines] == [f"donation-{i:06d}" for i in expected]
+
+async def test_export_during_an_import_sees_each_row_once(db, client, admin_headers):
+    # imported alumni must name an existing school and user
+    await db.schools.insert_one({"id": "school-1"})
+    await db.users.insert_many([{"id": f"user-{i}", "email": f"user{i}@example.org"} for i in range(600)])
+    text = "user_id,school_id,batch_year\n" + "".join(f"user-{i},school-1,{1990 + i % 30}\n" for i in range(600))
+    exported, report = await asyncio.gather(
+        client.get("/api/admin/export/alumni", headers=admin_headers),
+        bulk_import.import_rows(db, server.IMPORTS["alumni"], docs([text.encode()]), "csv", batch_size=100),
+    )
+    assert report["inserted"] == 600
+
+    ids = [row["id"] for row in csv.DictReader(io.StringIO(exported.text))]
+    assert len(ids) == len(set(ids))
+    after = await client.get("/api/admin/export/alumni", headers=admin_headers)
+    assert len(list(csv.DictReader(io.StringIO(after.text)))) == 600
@@ -0,0 +1,99 @@
+from datetime import datetime, timezone
+
+import orjson
+import pytest
+
+import fast_json
+import server
+
+pytestmark = pytest.mark.anyio
+
+AT = datetime(2025, 3, 4, 5, 6, 7, 123000, tzinfo=timezone.utc)
+
+# One full document per paged model, as the write routes store them
+DOCS = [
+    server.School(name="ZPHS Kondapur", mandal_id="mandal-1", udise_code="28150100101", facilities=["Library"],
+                  created_at=AT, updated_at=AT),
+    server.Mandal(name="Amalapuram"),
+    server.Alumni(user_id="user-1", school_id="school-1", batch_year=2001, achievements=["State rank"],
+                  created_at=AT),
+    server.Event(title="Reunion", description="Batch of 2001", event_date=AT, capacity=40, created_by="user-1"),
+    server.Donation(donor_name="Ravi", donor_email="ravi@example.org", amount=2500, created_at=AT),
+    server.ForumPost(title="Library books", content="Which ones?", author_id="user-1", last_reply_at=AT,
+                     hot_score=1.5),
+    server.ForumReply(post_id="post-1", content="Telugu classics", author_id="user-2"),
+    server.Bulletin(title="Holiday", content="Closed on Monday", created_by="user-1"),
+    server.News(title="Sports day", content="Long report", image_url="https://x/1.jpg", created_by="user-1"),
+    server.Gallery(title="Annual day", school_id="school-1", images=["https://x/1.jpg"], created_by="user-1",
+                   photos=[server.GalleryPhoto(hash="abc", width=800, height=600, variants=[
+                       server.ImageVariant(name="thumb.webp", width=200, height=150, format="webp", bytes=4096)])]),
+    server.SchoolNeed(school_id="school-1", title="Benches", description="For 40 students", category="furniture",
+                      target_amount=50000, raised_amount=1200.5),
+    server.Conversation(members=["user-1", "user-2"], created_by="user-1"),
+    server.ChatMessage(id="message-1", conversation_id="conversation-1", sender_id="user-1", body="Hello",
+                       created_at=AT),
+    server.Notification(id="notification-1", user_id="user-1", type="news", title="Sports day", ref_id="news-1",
+                        created_at=AT),
+    server.User(email="ravi@example.org", name="Ravi", created_at=AT),
+]
+
+SUMMARIES = [
+    (server.SchoolSummary, DOCS[0]), (server.BulletinSummary, DOCS[7]), (server.NewsSummary, DOCS[8]),
+    (server.GallerySummary, DOCS[9]), (server.NewsCard, DOCS[8]), (server.AlumniCard, DOCS[2]),
+    (server.NeedSummary, DOCS[10]),
+]
+
+def both(model, docs: list, next_cursor=None) -> tuple:
+    page = {"items": docs, "next_cursor": next_cursor}
+    slow = server.Page[model](**page).model_dump(mode="json")
+    fast = orjson.loads(fast_json.page_bytes(model, {"items": [dict(doc) for doc in docs], "next_cursor": next_cursor}))
+    return fast, slow
+
+async def stored(db, model, doc: dict) -> dict:
+    # Round-trip through the database so dates come back the way the routes read them
+    await db.parity.delete_many({})
+    await db.parity.insert_one(dict(doc))
+    return await db.parity.find_one({}, fast_json.projection(model))
+
+@pytest.mark.parametrize("document", DOCS, ids=lambda document: type(document).__name__)
+async def test_full_documents_encode_like_the_model(db, document):
+    model = type(document)
+    fast, slow = both(model, [await stored(db, model, document.model_dump())], next_cursor="abc")
+    assert fast == slow
+
+@pytest.mark.parametrize("model,document", SUMMARIES, ids=lambda value: getattr(value, "__name__", ""))
+async def test_summary_views_encode_like_the_model(db, model, document):
+    fast, slow = both(model, [await stored(db, model, document.model_dump())])
+    assert fast == slow
+    assert set(fast["items"][0]) == set(model.model_fields)
+
+@pytest.mark.parametrize("document", DOCS, ids=lambda document: type(document).__name__)
+async def test_older_documents_get_the_model_defaults(db, document):
+    # Written before the optional fields existed: required fields plus the id and timestamps every insert sets
+    model = type(document)
+    doc = {name: value for name, value in document.model_dump().items()
+           if model.model_fields[name].is_required() or model.model_fields[name].default_factory}
+    fast, slow = both(model, [await stored(db, model, doc)])
+    assert fast == slow
+    assert set(fast["items"][0]) == set(model.model_fields)
+
+async def test_utc_dates_end_in_z(db):
+    doc = await stored(db, server.ChatMessage, DOCS[12].model_dump())
+    fast, slow = both(server.ChatMessage, [doc])
+    assert fast["items"][0]["created_at"] == slow["items"][0]["created_at"] == "2025-03-04T05:06:07.123000Z"
+
+async def test_defaults_are_not_shared_between_documents(db):
+    fast = fast_json.complete(server.Alumni, {"user_id": "user-1"})
+    fast["achievements"].append("State rank")
+    assert fast_json.complete(server.Alumni, {"user_id": "user-2"})["achievements"] == []
+
+async def test_list_routes_return_the_same_body_either_way(db, client, monkeypatch):
+    for document in DOCS[:2] + DOCS[7:9]:
+        await db[{"School": "schools", "Mandal": "mandals", "Bulletin": "bulletins", "News": "news"}[
+            type(document).__name__]].insert_one(document.model_dump())
+    for path in ["/api/schools", "/api/schools?fields=*", "/api/mandals", "/api/bulletins", "/api/news?fields=*"]:
+        monkeypatch.setattr(server, "FAST_RESPONSES", False)
+        slow = (await client.get(path)).json()
+        monkeypatch.setattr(server, "FAST_RESPONSES", True)
+        fast = (await client.get(path)).json()
+        assert fast == slow and fast["items"], path
@@ -0,0 +1,32 @@
+import pytest
+
+import server
+
+pytestmark = pytest.mark.anyio
+
+async def test_default_views_are_the_documented_summaries(client):
+    schema = (await client.get("/openapi.json")).json()
+    for path, summary in [("/api/schools", "SchoolSummary"), ("/api/news", "NewsSummary"),
+                          ("/api/bulletins", "BulletinSummary"), ("/api/galleries", "GallerySummary")]:
+        page = schema["paths"][path]["get"]["responses"]["200"]["content"]["application/json"]["schema"]["$ref"]
+        items = schema["components"]["schemas"][page.rsplit("/", 1)[1]]["properties"]["items"]["items"]["$ref"]
+        assert items.endswith(f"/{summary}")
+    assert "content" not in schema["components"]["schemas"]["NewsSummary"]["properties"]
+
+async def test_list_pages_follow_the_requested_fieldset(db, client):
+    await db.news.insert_one(server.News(title="Sports day", content="Long report", created_by="user-1").model_dump())
+    await db.galleries.insert_one(server.Gallery(title="Annual day", school_id="school-1", images=["https://x/1.jpg"],
+                                                 created_by="user-1").model_dump())
+
+    item = (await client.get("/api/news")).json()["items"][0]
+    assert set(item) == set(server.NewsSummary.model_fields)
+    assert (await client.get("/api/news", params={"fields": "*"})).json()["items"][0]["content"] == "Long report"
+    assert set((await client.get("/api/news", params={"fields": "title"})).json()["items"][0]) == {"id", "title"}
+
+    assert "images" not in (await client.get("/api/galleries")).json()["items"][0]
+    gallery = (await client.get("/api/galleries", params={"fields": "*"})).json()["items"][0]
+    assert gallery["images"] == ["https://x/1.jpg"]
+
+async def test_unknown_fields_are_rejected(client):
+    response = await client.get("/api/news", params={"fields": "title,secret"})
+    assert response.status_code == 400
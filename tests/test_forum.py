@@ -0,0 +1,108 @@
+import math
+
+import pytest
+
+import server
+from forum import HotRanker, activity_score, combine
+
+pytestmark = pytest.mark.anyio
+
+async def create_post(db) -> server.ForumPost:
+    post = await server.create_forum_post(server.ForumPostCreate(title="Library hours", content="When?"),
+                                          current_user={"id": "user-1"})
+    # mongomock's $max cannot compare against the stored null, MongoDB's can
+    await db.forum_posts.update_one({"id": post.id}, {"$unset": {"last_reply_at": ""}})
+    return post
+
+async def reply(post_id: str, content: str = "Mornings") -> server.ForumReply:
+    return await server.create_forum_reply(post_id, server.ForumReplyCreate(content=content),
+                                           current_user={"id": "user-2"})
+
+async def expected_score(db, post: server.ForumPost, ranker: HotRanker) -> float:
+    score = activity_score(post.created_at, ranker.half_life_hours)
+    async for doc in db.forum_replies.find({"post_id": post.id}):
+        score = combine(score, activity_score(doc["created_at"], ranker.half_life_hours))
+    return score
+
+async def stored(db, post_id: str) -> dict:
+    return await db.forum_posts.find_one({"id": post_id}, {"_id": 0})
+
+async def test_replies_are_folded_into_the_score(db):
+    ranker = HotRanker()
+    post = await create_post(db)
+    for i in range(3):
+        await reply(post.id, f"reply {i}")
+    assert await ranker.run_once(db) == 1
+    doc = await stored(db, post.id)
+    assert math.isclose(doc["hot_score"], await expected_score(db, post, ranker))
+    assert (doc["hot_replies"], doc.get("hot_dirty")) == (3, None)
+    assert await ranker.run_once(db) == 0
+
+async def test_reply_written_behind_the_watermark_is_counted(db):
+    ranker = HotRanker()
+    post = await create_post(db)
+    # A slow reply is timestamped and counted first, but written after a faster one and a scoring pass
+    slow = server.ForumReply(post_id=post.id, content="slow", author_id="user-3")
+    await db.forum_posts.update_one(
+        {"id": post.id},
+        {"$inc": {"replies_count": 1}, "$max": {"last_reply_at": slow.created_at}, "$set": {"hot_dirty": True}},
+    )
+    fast = await reply(post.id, "fast")
+    assert slow.created_at < fast.created_at
+    await ranker.run_once(db)
+    assert (await stored(db, post.id))["hot_dirty"] is True
+
+    await db.forum_replies.insert_one(slow.model_dump())
+    await ranker.run_once(db)
+    doc = await stored(db, post.id)
+    assert math.isclose(doc["hot_score"], await expected_score(db, post, ranker))
+    assert (doc["hot_replies"], doc.get("hot_dirty")) == (2, None)
+
+async def test_posts_scored_before_replies_were_counted_are_rescored(db):
+    ranker = HotRanker()
+    post = await create_post(db)
+    await reply(post.id)
+    await ranker.run_once(db)
+    await db.forum_posts.update_one({"id": post.id}, {"$unset": {"hot_replies": ""}, "$set": {"hot_dirty": True}})
+    await ranker.run_once(db)
+    doc = await stored(db, post.id)
+    assert math.isclose(doc["hot_score"], await expected_score(db, post, ranker))
+    assert doc["hot_replies"] == 1
+
+async def test_drifted_replies_count_is_reconciled(db):
+    ranker = HotRanker(max_mismatches=3)
+    post = await create_post(db)
+    await reply(post.id)
+    # a doubled $inc: the count says two replies, one is stored
+    await db.forum_posts.update_one({"id": post.id}, {"$inc": {"replies_count": 1}})
+    for _ in range(2):
+        await ranker.run_once(db)
+        assert (await stored(db, post.id))["hot_dirty"] is True
+    await ranker.run_once(db)
+    doc = await stored(db, post.id)
+    assert (doc["replies_count"], doc["hot_replies"]) == (1, 1)
+    assert (doc.get("hot_dirty"), doc.get("hot_mismatches")) == (None, None)
+    assert await ranker.run_once(db) == 0
+
+async def hot_pages(client) -> list:
+    seen, cursor = [], None
+    while True:
+        params = {"sort": "hot", "limit": 2, **({"cursor": cursor} if cursor else {})}
+        page = (await client.get("/api/forums/posts", params=params)).json()
+        seen += [post["id"] for post in page["items"]]
+        if not (cursor := page["next_cursor"]):
+            return seen
+
+async def test_hot_paging_reaches_posts_without_a_score(db, client):
+    for _ in range(3):
+        await create_post(db)
+    # posts from before hot ranking carry no hot_score at all
+    legacy = [server.ForumPost(title=f"Old thread {i}", content="…", author_id="user-1") for i in range(3)]
+    await db.forum_posts.insert_many([post.model_dump(exclude={"hot_score"}) for post in legacy])
+
+    seen = await hot_pages(client)
+    assert len(seen) == len(set(seen)) == 6
+    assert seen[3:] == sorted((post.id for post in legacy), reverse=True)
+
+    assert await HotRanker().score_unscored(db) == 3
+    assert sorted(await hot_pages(client)) == sorted(seen)
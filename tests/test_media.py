@@ -0,0 +1,36 @@
+import pytest
+from PIL import Image
+
+import media
+
+def test_derive_writes_renditions_no_wider_than_the_original(tmp_path):
+    original = tmp_path / "original"
+    Image.new("RGB", (600, 400), "teal").save(original, "PNG")
+
+    meta = media._derive(str(original), str(tmp_path))
+    assert (meta["width"], meta["height"]) == (600, 400)
+    assert {variant["width"] for variant in meta["variants"]} == {160, 480, 600}
+
+def test_images_over_the_pixel_limit_are_refused_before_decoding(tmp_path):
+    # 64 MP, between MAX_PIXELS and the 2x where Pillow itself would raise
+    original = tmp_path / "original"
+    Image.new("1", (8000, 8000)).save(original, "PNG")
+
+    with pytest.raises(media.InvalidImage, match="pixels"):
+        media._derive(str(original), str(tmp_path))
+
+@pytest.mark.parametrize("content", [b"not an image", b"\x89PNG\r\n\x1a\n" + b"\x00" * 40, b"GIF89a\x01"])
+def test_malformed_files_are_invalid_images(tmp_path, content):
+    original = tmp_path / "original"
+    original.write_bytes(content)
+
+    with pytest.raises(media.InvalidImage):
+        media._derive(str(original), str(tmp_path))
+
+def test_truncated_image_is_an_invalid_image(tmp_path):
+    original = tmp_path / "original"
+    Image.new("RGB", (300, 200), "teal").save(original, "JPEG")
+    original.write_bytes(original.read_bytes()[:200])
+
+    with pytest.raises(media.InvalidImage):
+        media._derive(str(original), str(tmp_path))
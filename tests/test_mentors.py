@@ -0,0 +1,28 @@
+import pytest
+
+import server
+from mentors import MentorIndex
+
+pytestmark = pytest.mark.anyio
+
+async def test_refresh_picks_up_profiles_changed_on_other_workers(db):
+    # the routes update only this worker's index; other_worker learns from refresh
+    await db.schools.insert_one(server.School(id="school-1", name="ZPHS Kondapur", mandal_id="mandal-1").model_dump())
+    await server.create_alumni_profile(
+        {"school_id": "school-1", "batch_year": 2004, "company": "Infosys", "willing_to_mentor": True},
+        current_user={"id": "user-1", "role": "alumni"},
+    )
+    other_worker = MentorIndex()
+    await other_worker.rebuild(db)
+    assert [m["company"] for m in other_worker.match(school_id="school-1")] == ["Infosys"]
+
+    alumni = await db.alumni.find_one({"user_id": "user-1"})
+    update = server.AlumniUpdate(batch_year=2004, company="Wipro", willing_to_mentor=True)
+    await server.update_alumni_profile(alumni["id"], update, current_user={"id": "user-1", "role": "alumni"})
+    await other_worker.refresh(db)
+    assert [m["company"] for m in other_worker.match(school_id="school-1")] == ["Wipro"]
+
+    update = server.AlumniUpdate(batch_year=2004, company="Wipro", willing_to_mentor=False)
+    await server.update_alumni_profile(alumni["id"], update, current_user={"id": "user-1", "role": "alumni"})
+    await other_worker.refresh(db)
+    assert other_worker.match(school_id="school-1") == []
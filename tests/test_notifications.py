@@ -0,0 +1,60 @@
+import pytest
+
+import server
+from notifications import Notifier
+
+pytestmark = pytest.mark.anyio
+
+@pytest.fixture
+async def notifier(db, monkeypatch):
+    # Not started, so publish fans out inline
+    notifier = Notifier(batch_size=3)
+    monkeypatch.setattr(server, "notifier", notifier)
+    await db.users.insert_many([
+        server.User(id=f"user-{i}", email=f"user{i}@example.org", name=f"User {i}",
+                    school_id="school-1" if i < 7 else "school-2", mandal_id="mandal-1").model_dump()
+        for i in range(10)
+    ])
+    return notifier
+
+async def bulletin(school_id=None, role="teacher", author="user-0") -> server.Bulletin:
+    return await server.create_bulletin(server.BulletinCreate(title="Exam timetable", content="Out now",
+                                                              school_id=school_id),
+                                        current_user={"id": author, "role": role})
+
+async def recipients(db) -> list:
+    return sorted(await db.notifications.distinct("user_id"))
+
+async def test_school_audience_in_batches(db, notifier):
+    await bulletin("school-1")
+    # the author is skipped; six members in batches of three
+    assert await recipients(db) == [f"user-{i}" for i in range(1, 7)]
+    assert (notifier.delivered, notifier.batches) == (6, 2)
+
+async def test_no_school_is_not_a_broadcast_for_non_admins(db, notifier):
+    await bulletin(None)
+    assert await db.notifications.count_documents({}) == 0
+    assert await notifier.fan_out(db, {"school_id": None, "mandal_id": None, "actor_id": None}) == 0
+
+async def test_admin_broadcast_reaches_everyone(db, notifier):
+    await bulletin(None, role="admin", author="user-9")
+    assert await recipients(db) == [f"user-{i}" for i in range(9)]
+    assert (notifier.delivered, notifier.batches) == (9, 3)
+
+async def test_unread_counts_and_mark_read(db, notifier):
+    for _ in range(3):
+        await bulletin("school-1")
+    assert await notifier.unread_count(db, "user-1") == 3
+    assert await notifier.unread_count(db, "user-0") == 0  # the author
+    assert await notifier.unread_count(db, "user-8") == 0  # another school
+
+    first = await db.notifications.find_one({"user_id": "user-1"})
+    assert await notifier.mark_read(db, "user-1", first["id"]) is True
+    assert await notifier.mark_read(db, "user-1", first["id"]) is False  # repeats do not decrement again
+    assert await notifier.mark_read(db, "user-2", first["id"]) is False  # not theirs
+    assert await notifier.unread_count(db, "user-1") == 2
+    assert await notifier.unread_count(db, "user-2") == 3
+
+    assert await notifier.mark_all_read(db, "user-1") == 2
+    assert await notifier.unread_count(db, "user-1") == 0
+    assert await db.notification_counters.find_one({"_id": "user-1"}) == {"_id": "user-1", "unread": 0}
@@ -0,0 +1,56 @@
+import base64
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException
+
+import server
+
+def news(i: int, at: datetime) -> dict:
+    return server.News(id=f"news-{i:04d}", title=f"Notice {i}", content="", created_by="user-1",
+                       created_at=at).model_dump()
+
+def raw_cursor(payload) -> str:
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+@pytest.mark.parametrize("value", ["Kondapur", 42, 2.5, True, None, datetime(2024, 6, 1, tzinfo=timezone.utc)])
+def test_cursor_round_trip(value):
+    assert server.decode_cursor(server.encode_cursor(value, "school-1")) == (value, "school-1")
+
+@pytest.mark.parametrize("payload", [
+    {"v": {"$ne": None}, "id": "school-1"},
+    {"v": ["a", "b"], "id": "school-1"},
+    {"v": "a", "id": {"$gt": ""}},
+    {"v": "a", "id": 7},
+    {"v": "a"},
+    ["a", "school-1"],
+])
+def test_crafted_cursors_are_rejected(payload):
+    with pytest.raises(HTTPException) as raised:
+        server.decode_cursor(raw_cursor(payload))
+    assert raised.value.status_code == 400
+
+def test_garbage_cursor_is_rejected():
+    with pytest.raises(HTTPException):
+        server.decode_cursor("not a cursor!")
+
+@pytest.mark.anyio
+async def test_keyset_pages_stay_stable_while_documents_are_inserted(db, client):
+    base = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    # groups of five share a timestamp, so pages also split ties on id
+    await db.news.insert_many([news(i, base + timedelta(minutes=i // 5)) for i in range(95)])
+
+    seen, cursor, inserted = [], None, 95
+    while True:
+        params = {"limit": 20, "fields": "id", **({"cursor": cursor} if cursor else {})}
+        page = (await client.get("/api/news", params=params)).json()
+        seen += [item["id"] for item in page["items"]]
+        # newer items land at the head and must not shift the pages behind it
+        await db.news.insert_one(news(inserted, datetime.now(timezone.utc)))
+        inserted += 1
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+
+    assert seen == [f"news-{i:04d}" for i in reversed(range(95))]
@@ -0,0 +1,74 @@
+import pytest
+
+import server
+from response_cache import MemoryCacheBackend, MongoCacheBackend, ResponseCache
+
+pytestmark = pytest.mark.anyio
+
+@pytest.fixture(params=["memory", "mongo"])
+def cache(request, db, monkeypatch):
+    backend = MemoryCacheBackend() if request.param == "memory" else MongoCacheBackend(db)
+    cache = ResponseCache(backend)
+    monkeypatch.setattr(server, "response_cache", cache)
+    return cache
+
+async def create_school(client, headers, name: str) -> None:
+    # mongomock ignores the partial filter on udise_code, so every school needs its own
+    response = await client.post("/api/schools", headers=headers,
+                                 json={"name": name, "mandal_id": "mandal-1", "udise_code": name})
+    assert response.status_code == 200
+
+async def test_repeated_reads_are_served_from_the_cache(cache, client, admin_headers):
+    await create_school(client, admin_headers, "ZPHS Kondapur")
+    first = await client.get("/api/schools")
+    second = await client.get("/api/schools")
+    assert (cache.misses, cache.hits) == (1, 1)
+    assert second.content == first.content
+    assert second.headers["etag"] == first.headers["etag"]
+    assert second.headers["cache-control"] == "no-cache"
+
+async def test_matching_if_none_match_is_not_modified(cache, client, admin_headers):
+    await create_school(client, admin_headers, "ZPHS Kondapur")
+    etag = (await client.get("/api/schools")).headers["etag"]
+
+    response = await client.get("/api/schools", headers={"If-None-Match": f'"stale", {etag}'})
+    assert (response.status_code, response.content, response.headers["etag"]) == (304, b"", etag)
+    assert (await client.get("/api/schools", headers={"If-None-Match": "*"})).status_code == 304
+    assert (await client.get("/api/schools", headers={"If-None-Match": '"stale"'})).status_code == 200
+    assert cache.not_modified == 2
+
+async def test_key_ignores_query_parameter_order(cache, client, admin_headers):
+    await create_school(client, admin_headers, "ZPHS Kondapur")
+    first = await client.get("/api/schools?mandal_id=mandal-1&limit=5")
+    second = await client.get("/api/schools?limit=5&mandal_id=mandal-1")
+    assert (cache.misses, cache.hits) == (1, 1)
+    assert second.headers["etag"] == first.headers["etag"]
+
+    await client.get("/api/schools?limit=6&mandal_id=mandal-1")
+    assert cache.misses == 2
+
+async def test_write_to_the_namespace_invalidates_cached_lists(cache, client, admin_headers):
+    await create_school(client, admin_headers, "ZPHS Kondapur")
+    before = await client.get("/api/schools")
+    assert [school["name"] for school in before.json()["items"]] == ["ZPHS Kondapur"]
+
+    await create_school(client, admin_headers, "ZPHS Madhapur")
+    after = await client.get("/api/schools", headers={"If-None-Match": before.headers["etag"]})
+    assert after.status_code == 200
+    assert after.headers["etag"] != before.headers["etag"]
+    assert sorted(school["name"] for school in after.json()["items"]) == ["ZPHS Kondapur", "ZPHS Madhapur"]
+    assert (cache.misses, cache.hits) == (2, 0)
+
+async def test_invalidation_only_touches_its_namespace(cache, client, admin_headers):
+    await client.get("/api/mandals")
+    await create_school(client, admin_headers, "ZPHS Kondapur")
+    await client.get("/api/mandals")
+    assert (cache.misses, cache.hits) == (1, 1)
+
+async def test_generations_are_shared_through_mongo(db):
+    # Two workers on one database: a write on one invalidates the other's entries
+    first, second = MongoCacheBackend(db), MongoCacheBackend(db)
+    await first.set("/api/schools?#0", ('"etag"', b"[]"), ttl=60)
+    assert await second.get("/api/schools?#0") == ('"etag"', b"[]")
+    await first.bump("schools")
+    assert await second.generations(["schools", "events"]) == [1, 0]
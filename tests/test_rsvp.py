@@ -0,0 +1,89 @@
+import asyncio
+import random
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException
+
+import server
+
+pytestmark = pytest.mark.anyio
+
+EVENT_ID = "event-1"
+
+async def create_event(db, capacity=None) -> None:
+    await db.events.insert_one(server.Event(
+        id=EVENT_ID, title="District science fair", description="Exhibits", created_by="user-admin",
+        event_date=datetime.now(timezone.utc) + timedelta(days=7), capacity=capacity,
+    ).model_dump())
+
+async def test_duplicate_of_an_unseated_rsvp_is_a_conflict(db):
+    await create_event(db, capacity=10)
+    # another request for the same user inserted its RSVP and is still taking a seat
+    pending = server.EventRsvp(event_id=EVENT_ID, user_id="user-1", event_date=datetime.now(timezone.utc))
+    await db.event_rsvps.insert_one(pending.model_dump())
+
+    with pytest.raises(HTTPException) as raised:
+        await server.rsvp_event(EVENT_ID, current_user={"id": "user-1"})
+    assert raised.value.status_code == 409
+
+    await db.event_rsvps.update_one({"id": pending.id}, {"$set": {"seated": True}})
+    rsvp = await server.rsvp_event(EVENT_ID, current_user={"id": "user-1"})
+    assert (rsvp.id, rsvp.seated) == (pending.id, True)
+
+async def users(db, count: int) -> dict:
+    # Tokens are checked against the users collection
+    await db.users.insert_many([
+        server.User(id=f"user-{i}", email=f"user{i}@example.org", name=f"User {i}", approved=True).model_dump()
+        for i in range(count)
+    ])
+    return {
+        i: {"Authorization": "Bearer " + server.create_access_token(
+            {"sub": f"user-{i}", "role": "student", "approved": True})}
+        for i in range(count)
+    }
+
+async def seated_count(db) -> tuple:
+    event = await db.events.find_one({"id": EVENT_ID})
+    return event["rsvp_count"], await db.event_rsvps.count_documents({"event_id": EVENT_ID, "seated": True})
+
+async def test_parallel_rsvps_never_overbook(db, client):
+    await create_event(db, capacity=50)
+    headers = await users(db, 200)
+    rng = random.Random(3)
+    attempts = list(range(120)) + rng.sample(range(120), 30)  # some users click twice
+    rng.shuffle(attempts)
+
+    responses = await asyncio.gather(*(
+        client.post(f"/api/events/{EVENT_ID}/rsvp", headers=headers[user]) for user in attempts
+    ))
+
+    seated_users = {user for user, response in zip(attempts, responses) if response.status_code == 200}
+    assert {response.status_code for response in responses} <= {200, 409}
+    assert len(seated_users) == 50
+    assert await seated_count(db) == (50, 50)
+    assert await db.event_rsvps.count_documents({"event_id": EVENT_ID, "seated": {"$ne": True}}) == 0
+
+async def test_cancellations_racing_new_rsvps_keep_the_count_exact(db, client):
+    await create_event(db, capacity=40)
+    headers = await users(db, 100)
+    await asyncio.gather(*(client.post(f"/api/events/{EVENT_ID}/rsvp", headers=headers[i]) for i in range(40)))
+
+    churn = [("DELETE", i) for i in range(0, 40, 2)] + [("POST", i) for i in range(40, 100)]
+    random.Random(5).shuffle(churn)
+    await asyncio.gather(*(
+        client.request(method, f"/api/events/{EVENT_ID}/rsvp", headers=headers[user]) for method, user in churn
+    ))
+
+    count, seated = await seated_count(db)
+    assert count == seated <= 40
+    assert await db.event_rsvps.count_documents({"event_id": EVENT_ID, "seated": {"$ne": True}}) == 0
+
+async def test_unlimited_event_seats_everyone(db, client):
+    await create_event(db)
+    headers = await users(db, 30)
+    await asyncio.gather(*(client.post(f"/api/events/{EVENT_ID}/rsvp", headers=headers[i]) for i in range(30)))
+
+    assert await seated_count(db) == (30, 30)
+    mine = await client.get("/api/events/mine", headers=headers[0])
+    assert [item["id"] for item in mine.json()["items"]] == [EVENT_ID]
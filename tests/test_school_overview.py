@@ -0,0 +1,68 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import server
+import stats
+
+pytestmark = pytest.mark.anyio
+
+SCHOOL_ID = "school-1"
+BASE = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+# What frontend/src/pages/SchoolDetails.js renders from each card
+RENDERED = {
+    "alumni": {"id", "batch_year", "current_profession"},
+    "news": {"id", "title", "content", "created_at"},
+    "needs": {"id", "title", "description", "category", "target_amount"},
+}
+
+@pytest.fixture
+async def school(db):
+    school = server.School(id=SCHOOL_ID, name="ZPHS Kondapur", mandal_id="mandal-1", hm_note="Visits on Saturdays",
+                           facilities=["Library"], address="Main Road", contact_email="hm@example.org")
+    await db.schools.insert_one(school.model_dump())
+    at = [BASE + timedelta(days=i) for i in range(8)]
+    await db.alumni.insert_many([
+        server.Alumni(user_id=f"user-{i}", school_id=SCHOOL_ID, batch_year=2000 + i, current_profession="Teacher",
+                      achievements=["State rank"], created_at=at[i]).model_dump()
+        for i in range(8)
+    ] + [server.Alumni(user_id="user-x", school_id="school-2", batch_year=1999).model_dump()])
+    await db.news.insert_many([
+        server.News(title=f"Annual day {i}", content="Photos inside", school_id=SCHOOL_ID, created_by="user-admin",
+                    created_at=at[i]).model_dump()
+        for i in range(2)
+    ])
+    await db.school_needs.insert_one(server.SchoolNeed(
+        school_id=SCHOOL_ID, title="Library books", description="200 books", category="Learning",
+        target_amount=50000, created_at=at[0],
+    ).model_dump())
+    await stats.increment(db, {"total_alumni": 8, "total_donations": 2, "total_donation_amount": 1500.0},
+                          school_id=SCHOOL_ID, mandal_id="mandal-1")
+    return school
+
+async def test_overview_combines_school_counts_and_cards(client, school):
+    response = await client.get(f"/api/schools/{SCHOOL_ID}/overview")
+    assert response.status_code == 200
+    data = response.json()
+
+    assert data["school"]["name"] == "ZPHS Kondapur"
+    assert data["school"]["hm_note"] == "Visits on Saturdays"
+    assert data["counts"] == {"alumni": 8, "donations": 2, "donation_amount": 1500.0}
+    # the newest OVERVIEW_ITEMS of this school only
+    assert [alumnus["batch_year"] for alumnus in data["alumni"]] == [2007, 2006, 2005, 2004, 2003, 2002]
+    assert [item["title"] for item in data["news"]] == ["Annual day 1", "Annual day 0"]
+    assert data["needs"][0]["target_amount"] == 50000
+    assert data["news"][0]["created_at"] == "2025-01-02T00:00:00Z"
+
+async def test_overview_cards_carry_exactly_the_card_fields(client, school):
+    data = (await client.get(f"/api/schools/{SCHOOL_ID}/overview")).json()
+    cards = {"alumni": server.AlumniCard, "news": server.NewsCard, "needs": server.NeedSummary}
+    for name, model in cards.items():
+        assert data[name], name
+        for card in data[name]:
+            assert set(card) == set(model.model_fields), name
+            assert RENDERED[name] <= set(card), name
+
+async def test_overview_of_unknown_school_is_not_found(client, db):
+    assert (await client.get("/api/schools/school-9/overview")).status_code == 404
@@ -0,0 +1,33 @@
+import pytest
+
+import server
+from search import SearchIndex
+
+pytestmark = pytest.mark.anyio
+
+async def test_refresh_picks_up_schools_edited_on_other_workers(db):
+    school = await server.create_school(
+        server.SchoolCreate(name="ZPHS Kondapur", mandal_id="mandal-1"), current_user={"id": "user-admin"},
+    )
+    other_worker = SearchIndex()
+    await other_worker.rebuild(db)
+    assert [hit["id"] for hit in other_worker.search("kondapur")] == [school.id]
+
+    await server.update_school(
+        school.id, server.SchoolCreate(name="ZPHS Madhapur", mandal_id="mandal-1"), current_user={"id": "user-admin"},
+    )
+    await other_worker.refresh(db)
+    assert other_worker.search("kondapur") == []
+    assert [hit["id"] for hit in other_worker.search("madhapur")] == [school.id]
+
+async def test_refresh_without_new_terms_keeps_the_term_list_sorted(db):
+    await server.create_school(
+        server.SchoolCreate(name="ZPHS Kondapur", mandal_id="mandal-1"), current_user={"id": "user-admin"},
+    )
+    index = SearchIndex()
+    await index.rebuild(db)
+    index.search("warmup")
+    assert not index.terms_stale
+
+    await index.refresh(db)
+    assert not index.terms_stale
@@ -0,0 +1,83 @@
+import asyncio
+
+import pytest
+
+import server
+from response_cache import MemoryCacheBackend, ResponseCache
+from single_flight import SingleFlight
+
+pytestmark = pytest.mark.anyio
+
+class CountingLoader:
+    def __init__(self, delay: float = 0.02, fail: bool = False):
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("query failed")
+        return {"call": self.calls}
+
+async def test_concurrent_identical_calls_run_once():
+    flight, load = SingleFlight(), CountingLoader()
+    results = await asyncio.gather(*(flight.do("schools", load) for _ in range(20)))
+    assert load.calls == 1
+    assert all(result is results[0] for result in results)
+    assert flight.stats()["collapsed"] == 19 and flight.stats()["in_flight"] == 0
+
+    await flight.do("schools", load)  # no window: a later call runs again
+    assert load.calls == 2
+
+async def test_different_keys_do_not_share():
+    flight, load = SingleFlight(), CountingLoader()
+    await asyncio.gather(flight.do("schools?page=1", load), flight.do("schools?page=2", load))
+    assert load.calls == 2
+
+async def test_results_are_reused_until_the_window_expires():
+    flight, load = SingleFlight(window=0.05), CountingLoader(delay=0)
+    assert await flight.do("schools", load) == await flight.do("schools", load) == {"call": 1}
+    await asyncio.sleep(0.06)
+    assert await flight.do("schools", load) == {"call": 2}
+
+async def test_failures_are_shared_but_not_kept():
+    flight, load = SingleFlight(window=10), CountingLoader(fail=True)
+    results = await asyncio.gather(*(flight.do("schools", load) for _ in range(5)), return_exceptions=True)
+    assert load.calls == 1 and all(isinstance(result, RuntimeError) for result in results)
+    with pytest.raises(RuntimeError):
+        await flight.do("schools", load)
+    assert load.calls == 2
+
+async def test_a_cancelled_caller_does_not_cancel_the_shared_call():
+    flight, load = SingleFlight(), CountingLoader(delay=0.05)
+    first = asyncio.create_task(flight.do("schools", load))
+    second = asyncio.create_task(flight.do("schools", load))
+    await asyncio.sleep(0.01)
+    first.cancel()
+    assert await second == {"call": 1}
+
+async def test_disabled_runs_every_call():
+    flight, load = SingleFlight(enabled=False), CountingLoader()
+    await asyncio.gather(*(flight.do("schools", load) for _ in range(3)))
+    assert load.calls == 3
+
+async def test_concurrent_list_requests_share_one_query(db, client, monkeypatch):
+    # response cache off, so every request would otherwise reach the database
+    coalescer = SingleFlight()
+    monkeypatch.setattr(server, "response_cache", ResponseCache(MemoryCacheBackend(), enabled=False,
+                                                                coalescer=coalescer))
+    paginate, queries = server.paginate, []
+
+    async def counting_paginate(*args, **kwargs):
+        queries.append(args[0].name)
+        await asyncio.sleep(0.02)  # keep the first query in flight while the rest arrive
+        return await paginate(*args, **kwargs)
+
+    monkeypatch.setattr(server, "paginate", counting_paginate)
+    responses = await asyncio.gather(*(client.get("/api/schools?limit=5") for _ in range(10)))
+    assert {response.status_code for response in responses} == {200}
+    assert len({response.content for response in responses}) == 1
+    assert queries == ["schools"]
+    assert coalescer.stats()["collapsed"] == 9
@@ -0,0 +1,78 @@
+import pytest
+from fastapi import HTTPException
+
+import bulk_import
+import server
+import stats
+
+pytestmark = pytest.mark.anyio
+
+ADMIN = {"id": "user-admin", "role": "admin"}
+SCOPES = [stats.GLOBAL_KEY, "mandal:mandal-1", "mandal:mandal-2", "mandal:mandal-3"]
+
+async def chunks(text: str):
+    yield text.encode()
+
+async def run(db, kind: str, text: str) -> dict:
+    return await bulk_import.import_rows(db, server.IMPORTS[kind], chunks(text), "csv")
+
+async def populate(db) -> str:
+    await run(db, "schools", "udise_code,name,mandal_id\nU001,ZPHS Kondapur,mandal-1\n")
+    school = await db.schools.find_one({"udise_code": "U001"})
+    await server.create_donation(server.DonationCreate(donor_name="Asha", donor_email="asha@example.org", amount=500,
+                                                       school_id=school["id"]), idempotency_key=None)
+    await db.users.insert_many([
+        server.User(id="user-1", email="user1@example.org", name="Pending alumnus", role="alumni",
+                    school_id=school["id"]).model_dump(),
+        # A user with a mandal of their own stays counted there when the school moves
+        server.User(id="user-2", email="user2@example.org", name="Teacher", role="teacher", school_id=school["id"],
+                    mandal_id="mandal-3", approved=True).model_dump(),
+    ])
+    await run(db, "alumni", f"user_id,school_id,batch_year\nuser-1,{school['id']},2004\n")
+    await stats.reconcile_stats(db)
+    return school["id"]
+
+async def counters(db) -> dict:
+    return {scope: await stats.get_counters(db, scope) for scope in SCOPES}
+
+async def assert_reconciled(db) -> None:
+    moved = await counters(db)
+    await stats.reconcile_stats(db)
+    assert moved == await counters(db)
+
+async def test_school_update_moves_mandal_counters(db):
+    school_id = await populate(db)
+    await server.update_school(school_id, server.SchoolCreate(name="ZPHS Kondapur", mandal_id="mandal-2",
+                                                              udise_code="U001"), current_user=ADMIN)
+    assert (await stats.get_counters(db, "mandal:mandal-2"))["total_donation_amount"] == 500
+    await assert_reconciled(db)
+
+async def test_school_import_moves_mandal_counters(db):
+    await populate(db)
+    await run(db, "schools", "udise_code,name,mandal_id\nU001,ZPHS Kondapur,mandal-2\n")
+    assert (await stats.get_counters(db, "mandal:mandal-2"))["total_schools"] == 1
+    assert await db.alumni.count_documents({"mandal_id": "mandal-2"}) == 1
+    await assert_reconciled(db)
+
+async def test_approving_twice_is_a_no_op(db):
+    await populate(db)
+    for _ in range(2):
+        assert await server.approve_user("user-1", current_user=ADMIN) == {"message": "User approved successfully"}
+    assert (await stats.get_counters(db))["pending_approvals"] == 0
+    with pytest.raises(HTTPException) as raised:
+        await server.approve_user("user-missing", current_user=ADMIN)
+    assert raised.value.status_code == 404
+
+async def test_new_alumni_profile_counts_in_the_school_mandal(db, monkeypatch):
+    school_id = await populate(db)
+    before = await counters(db)
+
+    async def lookup(db, school_id):
+        raise AssertionError("the route already read the school's mandal")
+
+    monkeypatch.setattr(stats, "mandal_for_school", lookup)
+    await server.create_alumni_profile({"school_id": school_id, "batch_year": 2006}, current_user={"id": "user-2"})
+    after = await counters(db)
+    assert after[stats.GLOBAL_KEY]["total_alumni"] == before[stats.GLOBAL_KEY]["total_alumni"] + 1
+    assert after["mandal:mandal-1"]["total_alumni"] == before["mandal:mandal-1"]["total_alumni"] + 1
+    await assert_reconciled(db)